@@ -0,0 +1,130 @@
+"""
+Compile Benchmark
+Per-batch CPU latency of graph-built models with and without compilation
+
+Usage:
+    python benchmark_compile.py [--batch-size 64] [--iters 200] [--modes fx script inductor]
+"""
+
+import argparse
+import json
+import time
+import torch
+import torch.nn as nn
+from model_builder import ModelBuilder
+from model_compiler import compile_model, COMPILE_MODES
+
+
+def create_benchmark_graph(hidden: int = 256, depth: int = 6):
+    """MLP with residual blocks on MNIST-shaped input"""
+    def node(node_id, node_type, **params):
+        return {'id': node_id, 'type': node_type, 'data': {'params': params}}
+
+    nodes = [
+        node('input1', 'input', shape=[1, 1, 28, 28]),
+        node('flatten1', 'flatten'),
+        node('stem', 'linear', in_features=784, out_features=hidden),
+        node('stem_act', 'relu'),
+    ]
+    edges = [
+        {'source': 'input1', 'target': 'flatten1'},
+        {'source': 'flatten1', 'target': 'stem'},
+        {'source': 'stem', 'target': 'stem_act'},
+    ]
+
+    prev = 'stem_act'
+    for i in range(depth):
+        fc, act, add = f'fc{i}', f'act{i}', f'add{i}'
+        nodes += [
+            node(fc, 'linear', in_features=hidden, out_features=hidden),
+            node(act, 'gelu'),
+            node(add, 'add'),
+        ]
+        edges += [
+            {'source': prev, 'target': fc},
+            {'source': fc, 'target': act},
+            {'source': act, 'target': add},
+            {'source': prev, 'target': add},
+        ]
+        prev = add
+
+    nodes.append(node('head', 'linear', in_features=hidden, out_features=10))
+    edges.append({'source': prev, 'target': 'head'})
+    return {'nodes': nodes, 'edges': edges}
+
+
+def time_per_batch(fn, iters: int, warmup: int = 10) -> float:
+    """Median wall time of fn() in milliseconds"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iters):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def benchmark(batch_size: int = 64, iters: int = 200, modes=None):
+    modes = modes or ['fx', 'script']
+    torch.manual_seed(0)
+    model = ModelBuilder().build_model(create_benchmark_graph())
+    data = torch.randn(batch_size, 1, 28, 28)
+    target = torch.randint(0, 10, (batch_size,))
+    criterion = nn.CrossEntropyLoss()
+
+    variants = [('eager', model, None)]
+    for mode in modes:
+        compiled, info = compile_model(model, mode=mode, example_input=data)
+        variants.append((mode, compiled, info))
+
+    results = []
+    for name, net, info in variants:
+        def train_step():
+            net.zero_grad(set_to_none=True)
+            criterion(net(data), target).backward()
+
+        def forward():
+            with torch.no_grad():
+                net(data)
+
+        net.train()
+        train_ms = time_per_batch(train_step, iters)
+        net.eval()
+        forward_ms = time_per_batch(forward, iters)
+        results.append({
+            'variant': name,
+            'train_step_ms': round(train_ms, 4),
+            'forward_ms': round(forward_ms, 4),
+            'fallback': info['fallback'] if info else None
+        })
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--iters', type=int, default=200)
+    parser.add_argument('--modes', nargs='+', default=['fx', 'script'], choices=COMPILE_MODES)
+    parser.add_argument('--json', action='store_true', help='Print raw JSON results')
+    args = parser.parse_args()
+
+    results = benchmark(args.batch_size, args.iters, args.modes)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    eager = results[0]
+    print(f"{'variant':<10} {'train step ms':>14} {'forward ms':>12} {'speedup':>8}")
+    for r in results:
+        speedup = eager['train_step_ms'] / r['train_step_ms']
+        print(f"{r['variant']:<10} {r['train_step_ms']:>14.3f} {r['forward_ms']:>12.3f} {speedup:>7.2f}x")
+        if r['fallback']:
+            print(f"  fallback: {r['fallback']}")
+
+
+if __name__ == '__main__':
+    main()
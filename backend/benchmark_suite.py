@@ -0,0 +1,253 @@
+"""
+Backend Benchmark Suite
+Offline CPU benchmarks of the backend hot paths, with baseline comparison
+
+Every case runs on synthetic data: validation at 10/1k/50k nodes, code
+generation, model build (cold and from graph_cache), one training epoch
+and evaluation throughput on MNIST-shaped tensors, and event
+serialization in both transports. Results are JSON; with --baseline the
+run is compared metric by metric and exits with status 1 when any metric
+is more than --threshold worse.
+
+Usage:
+    python benchmark_suite.py [--quick] [--only validate_1k train_epoch] [--save results.json]
+    python benchmark_suite.py --baseline results.json [--threshold 0.2]
+"""
+
+import argparse
+import io
+import json
+import platform
+import sys
+import torch
+import torch.nn as nn
+import torch.optim as optim
+import graph_cache
+from graph_parser import GraphParser
+from code_generator import CodeGenerator
+from model_builder import ModelBuilder
+from tensor_data import TensorBatchLoader
+from training_engine import TrainingEngine
+from event_channel import EventChannel
+from benchmark_validation import create_chain_graph
+from benchmark_compile import create_benchmark_graph
+from benchmark_training import create_small_graph, best_of
+
+
+def _validate_case(num_nodes: int):
+    def run(options):
+        graph = create_chain_graph(num_nodes)
+        repeats = 1 if num_nodes > 10000 else options['repeats']
+        ms = best_of(lambda: GraphParser().validate(graph), repeats)
+        return ms, 'ms'
+    return run
+
+
+def bench_codegen(options):
+    """Code generation for a 1k-node chain, cache cleared every run"""
+    graph = create_chain_graph(1000)
+
+    def generate():
+        graph_cache.clear_cache()
+        CodeGenerator().generate(graph)
+    return best_of(generate, options['repeats']), 'ms'
+
+
+def bench_model_build(options):
+    """Uncached build of the residual MLP"""
+    graph = create_benchmark_graph()
+
+    def build():
+        graph_cache.clear_cache()
+        ModelBuilder().build_model(graph)
+    return best_of(build, options['repeats']), 'ms'
+
+
+def bench_model_build_cached(options):
+    """Rebuild of the residual MLP from its cached template"""
+    graph = create_benchmark_graph()
+    builder = ModelBuilder()
+    builder.build_model(graph)
+    return best_of(lambda: builder.build_model(graph), options['repeats']), 'ms'
+
+
+def _training_setup(options):
+    torch.manual_seed(0)
+    engine = TrainingEngine()
+    samples = options['samples']
+    data = torch.randn(samples, 1, 28, 28)
+    targets = torch.randint(0, 10, (samples,))
+    loader = TensorBatchLoader(data, targets, batch_size=options['batch_size'],
+                               shuffle=True, device=engine.device)
+    model = ModelBuilder().build_model(create_small_graph()).to(engine.device)
+    return engine, model, loader
+
+
+def bench_train_epoch(options):
+    """One TrainingEngine epoch over synthetic MNIST-shaped tensors"""
+    engine, model, loader = _training_setup(options)
+    optimizer = optim.Adam(model.parameters(), lr=1e-3)
+    criterion = nn.CrossEntropyLoss()
+    ms = best_of(lambda: engine._train_epoch(model, loader, optimizer, criterion), options['repeats'])
+    return options['samples'] / (ms / 1000), 'samples/s'
+
+
+def bench_eval_throughput(options):
+    """TrainingEngine evaluation over the same tensors"""
+    engine, model, loader = _training_setup(options)
+    criterion = nn.CrossEntropyLoss()
+    ms = best_of(lambda: engine._evaluate(model, loader, criterion), options['repeats'])
+    return options['samples'] / (ms / 1000), 'samples/s'
+
+
+def _events_case(encoding: str):
+    def run(options):
+        count = options['events']
+
+        def serialize():
+            stream = io.BytesIO() if encoding == 'binary' else io.StringIO()
+            # Long window: the calling thread does all the encoding
+            channel = EventChannel(stream, encoding=encoding, flush_interval=60)
+            for i in range(count):
+                channel.send('batch_end', {'job_id': 'job-1', 'batch': i,
+                                           'total_batches': count, 'loss': 1.0 / (i + 1)})
+                if i % 100 == 99:
+                    channel.send('epoch_end', {'job_id': 'job-1', 'epoch': i // 100,
+                                               'loss': 0.5, 'accuracy': 0.9})
+            channel.close()
+        ms = best_of(serialize, options['repeats'])
+        return count / (ms / 1000), 'events/s'
+    return run
+
+
+# name -> fn(options) returning (value, unit); ms is lower-is-better,
+# rates are higher-is-better
+CASES = {
+    'validate_10': _validate_case(10),
+    'validate_1k': _validate_case(1000),
+    'validate_50k': _validate_case(50000),
+    'codegen': bench_codegen,
+    'model_build': bench_model_build,
+    'model_build_cached': bench_model_build_cached,
+    'train_epoch': bench_train_epoch,
+    'eval_throughput': bench_eval_throughput,
+    'events_json': _events_case('json'),
+    'events_binary': _events_case('binary'),
+}
+
+DEFAULT_OPTIONS = {'repeats': 3, 'samples': 20000, 'batch_size': 64, 'events': 50000}
+QUICK_OPTIONS = {'repeats': 1, 'samples': 2000, 'batch_size': 64, 'events': 5000}
+
+
+def run_suite(names=None, options=None):
+    """
+    Run the selected cases
+
+    Returns:
+        {'meta': {...}, 'results': {name: {'value', 'unit', 'higher_is_better'}}}
+    """
+    options = {**DEFAULT_OPTIONS, **(options or {})}
+    results = {}
+    for name in names or CASES:
+        value, unit = CASES[name](options)
+        results[name] = {
+            'value': round(value, 3),
+            'unit': unit,
+            'higher_is_better': unit != 'ms'
+        }
+    graph_cache.clear_cache()
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'torch': torch.__version__,
+            'platform': platform.platform(),
+            'threads': torch.get_num_threads(),
+            'options': options
+        },
+        'results': results
+    }
+
+
+def compare_results(current, baseline, threshold: float = 0.2):
+    """
+    Compare a run against a baseline run
+
+    change is the relative improvement (positive = faster) and a metric
+    regresses when change < -threshold. Metrics missing on either side
+    are skipped.
+
+    Returns:
+        (rows, regressions) - rows of {'name', 'unit', 'baseline',
+        'current', 'change', 'regressed'} and the names that regressed
+    """
+    rows = []
+    for name, result in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None or base['unit'] != result['unit'] or not base['value']:
+            continue
+        if result['higher_is_better']:
+            change = result['value'] / base['value'] - 1
+        else:
+            change = base['value'] / result['value'] - 1 if result['value'] else 0.0
+        rows.append({
+            'name': name,
+            'unit': result['unit'],
+            'baseline': base['value'],
+            'current': result['value'],
+            'change': round(change, 4),
+            'regressed': change < -threshold
+        })
+    return rows, [row['name'] for row in rows if row['regressed']]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--only', nargs='+', choices=list(CASES), help='Run only these cases')
+    parser.add_argument('--quick', action='store_true', help='Small sizes and a single repeat')
+    parser.add_argument('--repeats', type=int)
+    parser.add_argument('--samples', type=int, help='Synthetic samples for train/eval')
+    parser.add_argument('--save', help='Write results JSON to this path')
+    parser.add_argument('--baseline', help='Compare against a saved results JSON')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed relative slowdown before a metric counts as regressed')
+    parser.add_argument('--json', action='store_true', help='Print raw JSON results')
+    args = parser.parse_args(argv)
+
+    options = dict(QUICK_OPTIONS if args.quick else DEFAULT_OPTIONS)
+    if args.repeats:
+        options['repeats'] = args.repeats
+    if args.samples:
+        options['samples'] = args.samples
+
+    results = run_suite(args.only, options)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    comparison = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            comparison = compare_results(results, json.load(f), args.threshold)
+
+    if args.json:
+        output = dict(results)
+        if comparison:
+            output['comparison'] = {'rows': comparison[0], 'regressions': comparison[1]}
+        print(json.dumps(output, indent=2))
+    elif comparison:
+        rows, _ = comparison
+        for row in rows:
+            flag = '  REGRESSED' if row['regressed'] else ''
+            print(f"{row['name']:<20} {row['baseline']:>14.2f} -> {row['current']:>14.2f} "
+                  f"{row['unit']:<10} {row['change']:+7.1%}{flag}")
+    else:
+        for name, result in results['results'].items():
+            print(f"{name:<20} {result['value']:>14.2f} {result['unit']}")
+
+    if comparison and comparison[1]:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
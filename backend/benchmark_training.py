@@ -0,0 +1,134 @@
+"""
+Training Loop Benchmark
+Per-epoch time of TrainingEngine's loop vs. a per-batch .item() loop
+
+Small models make per-batch host syncs dominate, so the gap shows up
+clearly on CPU-only builds.
+
+Usage:
+    python benchmark_training.py [--samples 60000] [--batch-size 64] [--repeats 3]
+"""
+
+import argparse
+import json
+import time
+import torch
+import torch.nn as nn
+import torch.optim as optim
+from model_builder import ModelBuilder
+from tensor_data import TensorBatchLoader
+from training_engine import TrainingEngine
+
+
+def create_small_graph():
+    """Tiny MLP where loop overhead outweighs compute"""
+    def node(node_id, node_type, **params):
+        return {'id': node_id, 'type': node_type, 'data': {'params': params}}
+
+    return {
+        'nodes': [
+            node('input1', 'input', shape=[1, 1, 28, 28]),
+            node('flatten1', 'flatten'),
+            node('linear1', 'linear', in_features=784, out_features=32),
+            node('relu1', 'relu'),
+            node('linear2', 'linear', in_features=32, out_features=10),
+        ],
+        'edges': [
+            {'source': 'input1', 'target': 'flatten1'},
+            {'source': 'flatten1', 'target': 'linear1'},
+            {'source': 'linear1', 'target': 'relu1'},
+            {'source': 'relu1', 'target': 'linear2'},
+        ]
+    }
+
+
+def synced_train_epoch(model, loader, optimizer, criterion, device):
+    """Reference loop that materializes the loss on every batch"""
+    model.train()
+    total_loss = 0.0
+    for data, target in loader:
+        data, target = data.to(device), target.to(device)
+        optimizer.zero_grad()
+        loss = criterion(model(data), target)
+        loss.backward()
+        optimizer.step()
+        total_loss += loss.item()
+    return total_loss / len(loader)
+
+
+def synced_evaluate(model, loader, criterion, device):
+    """Reference evaluation with two .item() calls per batch"""
+    model.eval()
+    test_loss, correct, total = 0.0, 0, 0
+    with torch.no_grad():
+        for data, target in loader:
+            data, target = data.to(device), target.to(device)
+            output = model(data)
+            test_loss += criterion(output, target).item()
+            pred = output.argmax(dim=1, keepdim=True)
+            correct += pred.eq(target.view_as(pred)).sum().item()
+            total += target.size(0)
+    return test_loss / len(loader), correct / total
+
+
+def best_of(fn, repeats: int) -> float:
+    """Fastest of repeats runs in milliseconds"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def benchmark(samples: int = 60000, batch_size: int = 64, repeats: int = 3):
+    torch.manual_seed(0)
+    engine = TrainingEngine()
+    device = engine.device
+    data = torch.randn(samples, 1, 28, 28)
+    targets = torch.randint(0, 10, (samples,))
+    loader = TensorBatchLoader(data, targets, batch_size=batch_size, shuffle=True, device=device)
+
+    model = ModelBuilder().build_model(create_small_graph()).to(device)
+    optimizer = optim.Adam(model.parameters(), lr=1e-3)
+    criterion = nn.CrossEntropyLoss()
+
+    results = {
+        'device': device.type,
+        'samples': samples,
+        'batch_size': batch_size,
+        'train_epoch_ms': {
+            'synced': best_of(lambda: synced_train_epoch(model, loader, optimizer, criterion, device), repeats),
+            'engine': best_of(lambda: engine._train_epoch(model, loader, optimizer, criterion), repeats)
+        },
+        'evaluate_ms': {
+            'synced': best_of(lambda: synced_evaluate(model, loader, criterion, device), repeats),
+            'engine': best_of(lambda: engine._evaluate(model, loader, criterion), repeats)
+        }
+    }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--samples', type=int, default=60000)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--json', action='store_true', help='Print raw JSON results')
+    args = parser.parse_args()
+
+    results = benchmark(args.samples, args.batch_size, args.repeats)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"device={results['device']} samples={results['samples']} batch_size={results['batch_size']}")
+    for phase in ('train_epoch_ms', 'evaluate_ms'):
+        synced = results[phase]['synced']
+        engine = results[phase]['engine']
+        print(f"{phase:<16} synced {synced:9.1f}  engine {engine:9.1f}  speedup {synced / engine:5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
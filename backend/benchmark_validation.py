@@ -0,0 +1,95 @@
+"""
+Graph Validation Benchmark
+GraphParser.validate time as the graph grows
+
+Reports milliseconds and microseconds per node for each size, plus the
+log-log slope between the smallest and largest size (1.0 = linear).
+
+Usage:
+    python benchmark_validation.py [--sizes 1000 5000 20000 50000] [--repeats 3]
+"""
+
+import argparse
+import json
+import math
+import time
+from graph_parser import GraphParser
+
+
+def create_chain_graph(num_nodes: int):
+    """input -> flatten -> alternating linear/relu until num_nodes"""
+    def node(node_id, node_type, **params):
+        return {'id': node_id, 'type': node_type, 'data': {'params': params}}
+
+    nodes = [node('input1', 'input', shape=[1, 16]), node('flatten1', 'flatten')]
+    edges = [{'source': 'input1', 'target': 'flatten1'}]
+    prev = 'flatten1'
+    for i in range(num_nodes - 2):
+        if i % 2 == 0:
+            nodes.append(node(f'n{i}', 'linear', in_features=16, out_features=16))
+        else:
+            nodes.append(node(f'n{i}', 'relu'))
+        edges.append({'source': prev, 'target': f'n{i}'})
+        prev = f'n{i}'
+    return {'nodes': nodes, 'edges': edges}
+
+
+def create_tree_graph(num_nodes: int):
+    """Fan-out tree: every node feeds two children (wide, shallow)"""
+    def node(node_id, node_type, **params):
+        return {'id': node_id, 'type': node_type, 'data': {'params': params}}
+
+    nodes = [node('n0', 'input', shape=[1, 16])]
+    edges = []
+    for i in range(1, num_nodes):
+        nodes.append(node(f'n{i}', 'relu'))
+        edges.append({'source': f'n{(i - 1) // 2}', 'target': f'n{i}'})
+    return {'nodes': nodes, 'edges': edges}
+
+
+def time_validate(graph, repeats: int) -> float:
+    """Fastest of repeats validate calls in milliseconds"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = GraphParser().validate(graph)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    assert result['valid'], result['errors'][:3]
+    return best
+
+
+def benchmark(sizes=(1000, 5000, 20000, 50000), repeats: int = 3):
+    results = {}
+    for name, create in (('chain', create_chain_graph), ('tree', create_tree_graph)):
+        rows = []
+        for n in sizes:
+            ms = time_validate(create(n), repeats)
+            rows.append({'nodes': n, 'ms': round(ms, 2), 'us_per_node': round(ms * 1000 / n, 2)})
+        first, last = rows[0], rows[-1]
+        slope = (math.log(last['ms'] / first['ms']) / math.log(last['nodes'] / first['nodes'])
+                 if last['nodes'] > first['nodes'] else None)
+        results[name] = {'rows': rows, 'scaling_exponent': round(slope, 2) if slope else None}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 20000, 50000])
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--json', action='store_true', help='Print raw JSON results')
+    args = parser.parse_args()
+
+    results = benchmark(args.sizes, args.repeats)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for name, result in results.items():
+        print(f"{name} (scaling exponent {result['scaling_exponent']})")
+        for row in result['rows']:
+            print(f"  {row['nodes']:>7} nodes  {row['ms']:9.1f} ms  {row['us_per_node']:6.2f} us/node")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Checkpoint Manager
+Training checkpoints written from a background thread, with retention
+
+The training thread only takes a snapshot (CPU copies of the model and
+optimizer state, RNG state and loader position); serialization and disk
+I/O happen on the writer thread. If snapshots arrive faster than the disk
+takes them, an unwritten snapshot is replaced by the newer one. Files are
+written to a temporary name and renamed, so a crash never leaves a
+truncated checkpoint, and only the newest keep_last of each run are kept;
+files left by other runs in the same directory are never deleted.
+"""
+
+import glob
+import os
+import threading
+import time
+import torch
+from typing import Dict, List, Any
+
+
+DEFAULT_CHECKPOINT_DIR = os.path.join('.', 'checkpoints')
+
+
+def snapshot(obj):
+    """Copy of a (nested) state dict with every tensor cloned to the CPU"""
+    if isinstance(obj, torch.Tensor):
+        return obj.detach().to('cpu', copy=True)
+    if isinstance(obj, dict):
+        return {key: snapshot(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(snapshot(value) for value in obj)
+    return obj
+
+
+def rng_state() -> Dict[str, Any]:
+    """Torch RNG state of this process (CPU and, if present, CUDA)"""
+    return {
+        'torch': torch.get_rng_state(),
+        'cuda': torch.cuda.get_rng_state_all() if torch.cuda.is_available() else None
+    }
+
+
+def set_rng_state(state: Dict[str, Any]):
+    torch.set_rng_state(state['torch'])
+    if state.get('cuda') is not None and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(state['cuda'])
+
+
+def checkpoint_dir(config: Dict[str, Any]) -> str:
+    """Directory config['checkpoint'] writes to"""
+    options = config.get('checkpoint')
+    if isinstance(options, dict):
+        return options.get('dir', DEFAULT_CHECKPOINT_DIR)
+    return DEFAULT_CHECKPOINT_DIR
+
+
+def checkpoint_name(epoch: int, batch: int) -> str:
+    """File name for the position (epoch to run, batches already done in it)"""
+    return f'ckpt-e{epoch:04d}-b{batch:07d}.pt'
+
+
+def list_checkpoints(directory: str) -> List[str]:
+    """Checkpoint paths in a directory, oldest written first"""
+    paths = glob.glob(os.path.join(directory, 'ckpt-e*-b*.pt'))
+    return sorted(paths, key=lambda path: (os.path.getmtime(path), path))
+
+
+def find_checkpoint(resume, directory: str = DEFAULT_CHECKPOINT_DIR) -> str:
+    """
+    Checkpoint path for a resume value
+
+    resume is true (most recently written checkpoint in directory), a
+    checkpoint file, or a directory to take the most recent one from.
+    """
+    if isinstance(resume, str) and os.path.isfile(resume):
+        return resume
+    search = resume if isinstance(resume, str) else directory
+    found = list_checkpoints(search)
+    if not found:
+        raise FileNotFoundError(f'No checkpoint found in {search}')
+    return found[-1]
+
+
+def load_checkpoint(path: str) -> Dict[str, Any]:
+    return torch.load(path, map_location='cpu')
+
+
+class CheckpointManager:
+    """
+    Background checkpoint writer for one training run
+
+    save() hands over an already snapshotted state and returns at once;
+    flush() waits until everything handed over is on disk.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CHECKPOINT_DIR, keep_last: int = 3):
+        if keep_last < 1:
+            raise ValueError(f'keep_last must be at least 1, got {keep_last}')
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.keep_last = keep_last
+        self.written: List[str] = []
+        self._kept: List[str] = []  # this run's files still on disk, oldest first
+        self.dropped = 0
+        self.write_time = 0.0
+        self.error = None
+        self._pending = None
+        self._writing = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='checkpoint-writer', daemon=True)
+        self._thread.start()
+
+    def save(self, state: Dict[str, Any]):
+        """Queue a snapshot for writing (replaces one not yet written)"""
+        with self._cond:
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = state
+            self._cond.notify_all()
+
+    def flush(self):
+        """Block until queued snapshots are written"""
+        with self._cond:
+            while self._pending is not None or self._writing:
+                self._cond.wait()
+
+    def close(self):
+        """Write what is queued, then stop the writer thread"""
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def info(self) -> Dict[str, Any]:
+        """Summary for training events"""
+        return {
+            'directory': self.directory,
+            'latest': self.written[-1] if self.written else None,
+            'written': len(self.written),
+            'dropped': self.dropped,
+            'write_time': round(self.write_time, 4),
+            'error': self.error
+        }
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                state, self._pending = self._pending, None
+                self._writing = True
+            try:
+                self._write(state)
+            except Exception as e:
+                # A failed write must not take the training run down with it
+                self.error = str(e)
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+
+    def _write(self, state: Dict[str, Any]):
+        start = time.perf_counter()
+        path = os.path.join(self.directory, checkpoint_name(state['epoch'], state['batch']))
+        tmp_path = path + '.tmp'
+        torch.save(state, tmp_path)
+        os.replace(tmp_path, path)
+        self.written.append(path)
+        # Retention only ever touches this run's files
+        if path in self._kept:
+            self._kept.remove(path)
+        self._kept.append(path)
+        for old in self._kept[:-self.keep_last]:
+            os.remove(old)
+        del self._kept[:-self.keep_last]
+        self.write_time += time.perf_counter() - start
@@ -6,6 +6,7 @@ Converts graph JSON to clean, readable PyTorch code
 from typing import Dict, List, Any
 from schema import NodeType
 from graph_parser import GraphParser
+import graph_cache
 
 
 class CodeGenerator:
@@ -16,11 +17,19 @@ class CodeGenerator:
         """
         Generate PyTorch model code from graph
         
+        Layer names come from type counters, not node ids, so the code is
+        cached by the canonical graph digest alone.
+        
         Returns:
             Python code as string
         """
+        digest = graph_cache.graph_key(graph_data).digest
+        code = graph_cache.lookup('code', digest)
+        if code is not None:
+            return code
+        
         # Validate graph first
-        validation = self.parser.validate(graph_data)
+        validation = self.parser.validate(graph_data, use_cache=True)
         if not validation['valid']:
             raise ValueError(f"Invalid graph: {validation['errors']}")
         
@@ -31,7 +40,9 @@ class CodeGenerator:
         imports = self._generate_imports()
         class_def = self._generate_class_definition(execution_order)
         
-        return f"{imports}\n\n{class_def}"
+        code = f"{imports}\n\n{class_def}"
+        graph_cache.store('code', digest, code)
+        return code
     
     def _generate_imports(self) -> str:
         """Generate import statements"""
@@ -90,11 +101,14 @@ import torch.nn.functional as F"""
                 k = params['kernel_size']
                 s = params.get('stride', 1)
                 p = params.get('padding', 0)
+                d = params.get('dilation', 1)
                 
-                if s == 1 and p == 0:
+                if s == 1 and p == 0 and d == 1:
                     lines.append(f"        self.{layer_name} = nn.Conv2d({in_c}, {out_c}, kernel_size={k})")
+                elif d == 1:
+                    lines.append(f"        self.{layer_name} = nn.Conv2d({in_c}, {out_c}, kernel_size={k}, stride={s}, padding={p!r})")
                 else:
-                    lines.append(f"        self.{layer_name} = nn.Conv2d({in_c}, {out_c}, kernel_size={k}, stride={s}, padding={p})")
+                    lines.append(f"        self.{layer_name} = nn.Conv2d({in_c}, {out_c}, kernel_size={k}, stride={s}, padding={p!r}, dilation={d})")
             
             elif node_type == NodeType.BATCHNORM:
                 num_f = params['num_features']
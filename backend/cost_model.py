@@ -0,0 +1,247 @@
+"""
+Static Cost Model
+Parameter counts, MACs/FLOPs and memory estimates from inferred shapes
+
+Costs are computed per sample from the shapes GraphParser infers (the
+Input node's first dimension is the batch and is divided out), then
+scaled to the requested batch size and dtype. Nothing here touches
+torch, so a model can be sized before it is built.
+"""
+
+import math
+from typing import Dict, List, Any, Optional
+from schema import NodeType
+
+
+DTYPE_BYTES = {
+    'float64': 8,
+    'float32': 4,
+    'float16': 2,
+    'bfloat16': 2,
+}
+
+# Rough FLOPs per output element for element-wise layers
+ELEMENTWISE_FLOPS = {
+    NodeType.RELU: 1,
+    NodeType.LEAKYRELU: 2,
+    NodeType.SIGMOID: 4,
+    NodeType.TANH: 4,
+    NodeType.GELU: 8,
+    NodeType.ELU: 4,
+    NodeType.SILU: 5,
+    NodeType.SOFTMAX: 5,
+    NodeType.DROPOUT: 1,
+    NodeType.BATCHNORM: 5,
+    NodeType.LAYERNORM: 5,
+    NodeType.GROUPNORM: 5,
+    NodeType.INSTANCENORM: 5,
+}
+
+# Layers whose output is a view of their input (no new activation memory)
+VIEW_TYPES = {NodeType.OUTPUT, NodeType.FLATTEN, NodeType.RESHAPE}
+
+RECURRENT_GATES = {NodeType.LSTM: 4, NodeType.GRU: 3, NodeType.RNN: 1}
+
+
+def _prod(values) -> int:
+    return math.prod(values) if values else 1
+
+
+def _kernel_elems(params: Dict[str, Any], spatial_dims: int) -> int:
+    kernel = params.get('kernel_size', 0)
+    if isinstance(kernel, (list, tuple)):
+        return _prod(kernel)
+    return kernel ** spatial_dims
+
+
+def _conv_params(spatial_dims: int):
+    def count(params: Dict[str, Any]) -> int:
+        in_c = params.get('in_channels', 0)
+        out_c = params.get('out_channels', 0)
+        return in_c * out_c * _kernel_elems(params, spatial_dims) + out_c  # weights + bias
+    return count
+
+
+def _linear_params(params: Dict[str, Any]) -> int:
+    in_f = params.get('in_features', 0)
+    out_f = params.get('out_features', 0)
+    return in_f * out_f + out_f  # weights + bias
+
+
+def _recurrent_params(gates: int):
+    def count(params: Dict[str, Any]) -> int:
+        hidden = params.get('hidden_size', 0)
+        directions = 2 if params.get('bidirectional', False) else 1
+        total = 0
+        for layer in range(params.get('num_layers', 1)):
+            layer_input = params.get('input_size', 0) if layer == 0 else hidden * directions
+            # weight_ih + weight_hh + bias_ih + bias_hh, per direction
+            total += directions * gates * hidden * (layer_input + hidden + 2)
+        return total
+    return count
+
+
+def _layernorm_params(params: Dict[str, Any]) -> int:
+    normalized = params.get('normalized_shape', 0)
+    if isinstance(normalized, (list, tuple)):
+        normalized = _prod(normalized)
+    return normalized * 2  # gamma + beta
+
+
+def _attention_params(params: Dict[str, Any]) -> int:
+    embed = params.get('embed_dim', 0)
+    return 4 * embed * embed + 4 * embed  # q/k/v in-projection + out-projection
+
+
+# Node types with trainable parameters; everything else contributes 0
+PARAM_COUNTERS = {
+    NodeType.CONV1D: _conv_params(1),
+    NodeType.CONV2D: _conv_params(2),
+    NodeType.CONV3D: _conv_params(3),
+    NodeType.CONVTRANSPOSE2D: _conv_params(2),
+    NodeType.LINEAR: _linear_params,
+    NodeType.LSTM: _recurrent_params(4),
+    NodeType.GRU: _recurrent_params(3),
+    NodeType.RNN: _recurrent_params(1),
+    NodeType.BATCHNORM: lambda p: p.get('num_features', 0) * 2,  # gamma + beta
+    NodeType.LAYERNORM: _layernorm_params,
+    NodeType.GROUPNORM: lambda p: p.get('num_channels', 0) * 2,
+    NodeType.EMBEDDING: lambda p: p.get('num_embeddings', 0) * p.get('embedding_dim', 0),
+    NodeType.MULTIHEADATTENTION: _attention_params,
+}
+
+
+def count_node_params(node_type: NodeType, params: Dict[str, Any]) -> int:
+    """Trainable parameters contributed by one node"""
+    counter = PARAM_COUNTERS.get(node_type)
+    return counter(params) if counter else 0
+
+
+def node_cost(
+    node_type: NodeType,
+    params: Dict[str, Any],
+    input_shapes: List[List[int]],
+    output_shape: List[int]
+) -> Dict[str, int]:
+    """
+    Per-sample cost of one node
+
+    Returns:
+        {'params', 'macs', 'flops', 'activation_elems'} - activation_elems
+        is the size of the output tensor the node allocates
+    """
+    out_elems = _prod(output_shape[1:])
+    in_elems = _prod(input_shapes[0][1:]) if input_shapes else 0
+    macs = 0
+    flops = 0
+
+    if node_type == NodeType.LINEAR:
+        macs = out_elems * params['in_features']
+        flops = out_elems  # bias
+    elif node_type in (NodeType.CONV1D, NodeType.CONV2D, NodeType.CONV3D):
+        spatial_dims = len(output_shape) - 2
+        macs = out_elems * params['in_channels'] * _kernel_elems(params, spatial_dims)
+        flops = out_elems
+    elif node_type == NodeType.CONVTRANSPOSE2D:
+        # Every input element is scattered through the whole kernel
+        macs = in_elems * params['out_channels'] * _kernel_elems(params, 2)
+        flops = out_elems
+    elif node_type in RECURRENT_GATES:
+        gates = RECURRENT_GATES[node_type]
+        seq_len = input_shapes[0][1]
+        hidden = params['hidden_size']
+        directions = 2 if params.get('bidirectional', False) else 1
+        for layer in range(params.get('num_layers', 1)):
+            layer_input = params['input_size'] if layer == 0 else hidden * directions
+            macs += directions * seq_len * gates * hidden * (layer_input + hidden)
+        flops = out_elems * gates * 4  # gate non-linearities and updates
+    elif node_type == NodeType.MULTIHEADATTENTION:
+        seq_len, embed = input_shapes[0][1], params['embed_dim']
+        # q/k/v/out projections, then scores and the weighted sum
+        macs = 4 * seq_len * embed * embed + 2 * seq_len * seq_len * embed
+        flops = 5 * params['num_heads'] * seq_len * seq_len  # softmax
+    elif node_type in (NodeType.MAXPOOL2D, NodeType.AVGPOOL2D):
+        flops = out_elems * _kernel_elems(params, 2)
+    elif node_type == NodeType.ADAPTIVEAVGPOOL2D:
+        flops = in_elems
+    elif node_type in (NodeType.ADD, NodeType.MULTIPLY):
+        flops = out_elems * (len(input_shapes) - 1)
+    else:
+        flops = out_elems * ELEMENTWISE_FLOPS.get(node_type, 0)
+
+    return {
+        'params': count_node_params(node_type, params),
+        'macs': macs,
+        'flops': 2 * macs + flops,
+        'activation_elems': 0 if node_type in VIEW_TYPES else out_elems
+    }
+
+
+def summarize_costs(
+    node_costs: Dict[str, Dict[str, int]],
+    node_shapes: Dict[str, List[int]],
+    batch_size: int,
+    dtype: str = 'float32',
+    memory_limit_mb: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Scale per-sample node costs to a batch and add memory estimates
+
+    Memory model for one training step:
+        param_bytes       weights
+        activation_bytes  forward outputs, all kept alive for backward
+        gradient_bytes    one gradient per weight
+        backward_bytes    saved activations + weight gradients + the
+                          gradient of the largest activation and of its
+                          input, which backward holds at the same time
+    """
+    if dtype not in DTYPE_BYTES:
+        raise ValueError(f'Unknown dtype: {dtype}')
+    itemsize = DTYPE_BYTES[dtype]
+
+    nodes = {}
+    totals = {'params': 0, 'macs': 0, 'flops': 0, 'activation_elems': 0}
+    peak_elems = 0
+    for node_id, cost in node_costs.items():
+        nodes[node_id] = {
+            'output_shape': [batch_size, *node_shapes[node_id][1:]],
+            'params': cost['params'],
+            'macs': cost['macs'] * batch_size,
+            'flops': cost['flops'] * batch_size,
+            'param_bytes': cost['params'] * itemsize,
+            'activation_bytes': cost['activation_elems'] * batch_size * itemsize
+        }
+        for key in totals:
+            totals[key] += cost[key]
+        peak_elems = max(peak_elems, cost['activation_elems'])
+
+    param_bytes = totals['params'] * itemsize
+    activation_bytes = totals['activation_elems'] * batch_size * itemsize
+    backward_bytes = activation_bytes + param_bytes + 2 * peak_elems * batch_size * itemsize
+
+    report = {
+        'batch_size': batch_size,
+        'dtype': dtype,
+        'total': {
+            'params': totals['params'],
+            'macs': totals['macs'] * batch_size,
+            'flops': totals['flops'] * batch_size,
+            'param_bytes': param_bytes,
+            'activation_bytes': activation_bytes,
+            'gradient_bytes': param_bytes,
+            'backward_bytes': backward_bytes,
+            'training_bytes': param_bytes + backward_bytes
+        },
+        'nodes': nodes
+    }
+
+    if memory_limit_mb is not None:
+        # Batch-independent bytes vs. what every extra sample adds
+        fixed = 2 * param_bytes
+        per_sample = (totals['activation_elems'] + 2 * peak_elems) * itemsize
+        budget = memory_limit_mb * 1024 ** 2 - fixed
+        report['memory_limit_mb'] = memory_limit_mb
+        report['max_batch_size'] = max(0, int(budget // per_sample)) if per_sample else None
+        report['fits'] = report['total']['training_bytes'] <= memory_limit_mb * 1024 ** 2
+
+    return report
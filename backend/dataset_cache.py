@@ -0,0 +1,128 @@
+"""
+Dataset Cache
+Process-wide dataset tensors backed by memory-mapped .npy snapshots
+"""
+
+import os
+import threading
+import numpy as np
+import torch
+from typing import Dict, Any, Callable, Tuple
+from tensor_data import load_mnist_tensors
+
+
+DEFAULT_CACHE_DIR = os.path.join('.', 'data', 'cache')
+
+# name -> loader(root, train, transform) returning (data, targets)
+DATASET_LOADERS: Dict[str, Callable] = {
+    'mnist': lambda root, train, transform: load_mnist_tensors(
+        root=root, train=train, normalize=(transform == 'normalize')
+    ),
+}
+
+TRANSFORMS = ['normalize', 'raw']
+
+_memory: Dict[Tuple[str, str, str], Tuple[torch.Tensor, torch.Tensor]] = {}
+_lock = threading.Lock()
+_stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+
+def get_dataset(
+    name: str = 'mnist',
+    train: bool = True,
+    transform: str = 'normalize',
+    root: str = './data',
+    cache_dir: str = DEFAULT_CACHE_DIR
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Return (data, targets) for a dataset split, loading it at most once
+
+    Lookup order: in-process memory, then an on-disk snapshot opened with
+    mmap (zero-copy, pages shared with other processes through the page
+    cache), then the dataset's loader, whose result is snapshotted.
+
+    Returned tensors are shared; callers must not modify them in place.
+    """
+    if name not in DATASET_LOADERS:
+        raise ValueError(f'Unknown dataset: {name}')
+    if transform not in TRANSFORMS:
+        raise ValueError(f'Unknown transform: {transform}')
+
+    split = 'train' if train else 'test'
+    key = (name, split, transform)
+
+    with _lock:
+        if key in _memory:
+            _stats['memory_hits'] += 1
+            return _memory[key]
+
+        data_path, targets_path = _snapshot_paths(cache_dir, key)
+        if os.path.exists(data_path) and os.path.exists(targets_path):
+            data, targets = _open_snapshot(data_path), _open_snapshot(targets_path)
+            _stats['disk_hits'] += 1
+        else:
+            data, targets = DATASET_LOADERS[name](root, train, transform)
+            try:
+                _write_snapshot(data_path, data)
+                _write_snapshot(targets_path, targets)
+            except OSError:
+                pass  # Read-only or full disk: keep the in-memory copy only
+            _stats['misses'] += 1
+
+        _memory[key] = (data, targets)
+        return data, targets
+
+
+def clear_memory_cache():
+    """Drop in-process references (on-disk snapshots are kept)"""
+    with _lock:
+        _memory.clear()
+
+
+def share_memory_cache() -> Dict[Tuple[str, str, str], Tuple[torch.Tensor, torch.Tensor]]:
+    """
+    Move cached splits into shared memory and return them
+
+    Pass the result to worker processes (torch.multiprocessing sends
+    shared tensors by handle) and install it there with
+    install_memory_cache, so every worker reads one copy.
+    """
+    with _lock:
+        for data, targets in _memory.values():
+            data.share_memory_()
+            targets.share_memory_()
+        return dict(_memory)
+
+
+def install_memory_cache(entries: Dict[Tuple[str, str, str], Tuple[torch.Tensor, torch.Tensor]]):
+    """Add splits shared by another process to this process's cache"""
+    with _lock:
+        _memory.update(entries)
+
+
+def cache_info() -> Dict[str, Any]:
+    """Hit/miss counters and the splits currently held in memory"""
+    with _lock:
+        return {
+            **_stats,
+            'cached': ['-'.join(key) for key in _memory]
+        }
+
+
+def _snapshot_paths(cache_dir: str, key: Tuple[str, str, str]) -> Tuple[str, str]:
+    stem = os.path.join(cache_dir, '-'.join(key))
+    return f'{stem}.data.npy', f'{stem}.targets.npy'
+
+
+def _open_snapshot(path: str) -> torch.Tensor:
+    # Copy-on-write mapping: zero-copy reads, and torch gets a writable array
+    return torch.from_numpy(np.load(path, mmap_mode='c'))
+
+
+def _write_snapshot(path: str, tensor: torch.Tensor):
+    """Write atomically so a concurrent reader never sees a partial file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.save(f, tensor.cpu().numpy())
+    os.replace(tmp_path, path)
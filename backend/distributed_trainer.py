@@ -0,0 +1,306 @@
+"""
+Distributed Trainer
+Data-parallel CPU training over local worker processes (torch.distributed, gloo)
+
+Each worker builds the model, wraps it in DistributedDataParallel and
+trains on its shard of the data with a share of the machine's cores.
+Gradients are averaged by DDP every step; test metrics are summed across
+workers, so the parent sees one batch_end/epoch_end stream as if a single
+engine had trained.
+"""
+
+import copy
+import io
+import os
+import queue
+import socket
+import threading
+import time
+import traceback
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+import torch.nn as nn
+from torch.nn.parallel import DistributedDataParallel
+from torch.utils.data import DataLoader, RandomSampler
+from torch.utils.data.distributed import DistributedSampler
+from typing import Dict, Any, Callable, Optional
+from model_builder import ModelBuilder
+from tensor_data import TensorBatchLoader
+from training_engine import TrainingEngine
+from trial_scheduler import create_scheduler
+from system_info import get_cpu_counts
+
+
+# Config options the workers do not implement
+UNSUPPORTED_OPTIONS = ('checkpoint', 'compile', 'profile')
+
+
+def distributed_options(config: Dict[str, Any]) -> Dict[str, int]:
+    """
+    World size and threads per worker for config['distributed']
+
+    Accepts true (one worker per two physical cores, at least 2), a worker
+    count, or {'world_size': N, 'threads_per_worker': T}. Threads default
+    to an even split of the physical cores.
+    """
+    options = config.get('distributed')
+    cores = get_cpu_counts()['cores_physical']
+    if isinstance(options, dict):
+        world_size = options.get('world_size', max(2, cores // 2))
+        threads = options.get('threads_per_worker')
+    else:
+        world_size = max(2, cores // 2) if options is True else int(options)
+        threads = None
+    if world_size < 1:
+        raise ValueError(f'world_size must be at least 1, got {world_size}')
+    return {
+        'world_size': world_size,
+        'threads_per_worker': threads or max(1, cores // world_size)
+    }
+
+
+class _ShardedDataLoader(DataLoader):
+    """DataLoader that moves its DistributedSampler to a new epoch on every pass"""
+
+    _epoch = 0
+
+    def __iter__(self):
+        self.sampler.set_epoch(self._epoch)
+        self._epoch += 1
+        return super().__iter__()
+
+
+def shard_loader(loader, rank: int, world_size: int, seed: int = 0):
+    """Restrict a training/test loader to one worker's share of the data"""
+    if isinstance(loader, TensorBatchLoader):
+        sampler = DistributedSampler(range(len(loader.data)), num_replicas=world_size, rank=rank,
+                                     shuffle=loader.shuffle, seed=seed)
+        return TensorBatchLoader(loader.data, loader.targets, batch_size=loader.batch_size,
+                                 drop_last=loader.drop_last, sampler=sampler)
+    if isinstance(loader, DataLoader):
+        sampler = DistributedSampler(loader.dataset, num_replicas=world_size, rank=rank,
+                                     shuffle=isinstance(loader.sampler, RandomSampler), seed=seed)
+        return _ShardedDataLoader(loader.dataset, batch_size=loader.batch_size, sampler=sampler,
+                                  num_workers=loader.num_workers, pin_memory=loader.pin_memory,
+                                  drop_last=loader.drop_last)
+    if hasattr(loader, 'shard'):
+        return copy.copy(loader).shard(rank, world_size)
+    raise ValueError(f'{type(loader).__name__} cannot be sharded for distributed training')
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _evaluate(engine: TrainingEngine, model: nn.Module, loader, criterion):
+    """Test loss/accuracy over every worker's shard (sums stay on the device until the end)"""
+    model.eval()
+    losses = []
+    corrects = []
+    samples = 0
+    with torch.no_grad():
+        for data, target in loader:
+            if engine.stop_requested:
+                break
+            data, target = engine._to_device(data, target)
+            with engine._autocast():
+                output = model(data)
+                losses.append(criterion(output, target))
+            corrects.append((output.argmax(dim=1) == target).sum())
+            samples += target.size(0)
+
+    # loss sum, batches, correct, samples
+    sums = torch.tensor([0.0, len(losses), 0.0, samples], dtype=torch.float64)
+    if losses:
+        sums[0] = torch.stack(losses).double().sum()
+        sums[2] = torch.stack(corrects).sum()
+    dist.all_reduce(sums)
+    loss_sum, batches, correct, samples = sums.tolist()
+    return loss_sum / max(batches, 1), correct / max(samples, 1)
+
+
+def _worker(rank, world_size, threads, port, graph_data, config, events, stop_event):
+    """Worker process body: one DDP replica"""
+    try:
+        os.environ['MASTER_ADDR'] = '127.0.0.1'
+        os.environ['MASTER_PORT'] = str(port)
+        torch.set_num_threads(threads)
+        dist.init_process_group('gloo', rank=rank, world_size=world_size)
+
+        engine = TrainingEngine()
+        engine.device = torch.device('cpu')
+        threading.Thread(target=lambda: (stop_event.wait(), engine.stop()), daemon=True).start()
+
+        # Same seed everywhere; DDP also broadcasts rank 0's weights
+        seed = config.get('seed', 0)
+        torch.manual_seed(seed)
+        model = ModelBuilder().build_model(graph_data)
+        engine._setup_precision(model, config)
+        if engine.channels_last:
+            model = model.to(memory_format=torch.channels_last)
+        net = DistributedDataParallel(model)
+        optimizer = engine._create_optimizer(net, config)
+        criterion = nn.CrossEntropyLoss()
+
+        train_loader, test_loader = engine._load_data(graph_data, config)
+        train_loader = shard_loader(train_loader, rank, world_size, seed)
+        test_loader = shard_loader(test_loader, rank, world_size, seed)
+        engine.memory_plan = engine._plan_memory(
+            model, criterion, test_loader, config.get('optimizer', 'adam').lower(), config
+        )
+        engine.batch_event_interval = max(1, int(config.get('batch_event_interval', 100)))
+
+        def on_batch_end(batch, total_batches, loss):
+            events.put(('batch_end', batch, total_batches, loss))
+
+        # Metrics are all-reduced, so every rank makes the same decision
+        epochs = config.get('epochs', 10)
+        scheduler = create_scheduler(config.get('early_stopping'), epochs)
+        final_loss = final_accuracy = 0.0
+        for epoch in range(1, epochs + 1):
+            # join() lets shards with fewer batches finish without hanging DDP
+            with net.join():
+                engine._train_epoch(net, train_loader, optimizer, criterion,
+                                    on_batch_end=on_batch_end if rank == 0 else None)
+
+            # Stop together, even if the request reached workers mid-epoch
+            flags = torch.tensor([float(engine.stop_requested), engine.epoch_timing['data_time'],
+                                  engine.epoch_timing['compute_time']], dtype=torch.float64)
+            dist.all_reduce(flags, op=dist.ReduceOp.MAX)
+            if flags[0]:
+                break
+
+            eval_start = time.perf_counter()
+            final_loss, final_accuracy = _evaluate(engine, model, test_loader, criterion)
+            if rank == 0:
+                events.put(('epoch_end', epoch, final_loss, final_accuracy, {
+                    'data_time': flags[1].item(),
+                    'compute_time': flags[2].item(),
+                    'eval_time': time.perf_counter() - eval_start
+                }))
+            if scheduler is not None and not scheduler.on_epoch_end(0, epoch, final_loss, final_accuracy):
+                break
+
+        if rank == 0:
+            buffer = io.BytesIO()
+            torch.save(model.state_dict(), buffer)
+            events.put(('result', buffer.getvalue(), final_loss, final_accuracy,
+                        scheduler.info(0) if scheduler else None))
+        dist.destroy_process_group()
+    except Exception:
+        events.put(('error', rank, traceback.format_exc()))
+
+
+class DistributedTrainer:
+    """
+    TrainingEngine stand-in that trains with N local DDP workers
+
+    Same train()/stop() interface and timing attributes, so JobManager and
+    main.py run it like any other engine. Workers are spawned fresh per
+    run; rank 0 streams events through a queue and sends the final
+    weights back, which are loaded into a model built in this process.
+    """
+
+    def __init__(self, world_size: int = 2, threads_per_worker: int = 1):
+        self.world_size = world_size
+        self.threads_per_worker = threads_per_worker
+        self.model = None
+        self.stop_requested = False
+        self.compile_info = None
+        self.memory_plan = None
+        self.epoch_timing = {}
+        self.profile_report = None
+        self.scheduler_info = None
+        self.checkpoint_info = None
+        self._stop_event = None
+
+    def train(
+        self,
+        graph_data: Dict[str, Any],
+        config: Dict[str, Any],
+        on_epoch_end: Optional[Callable] = None,
+        on_batch_end: Optional[Callable] = None,
+        on_profile_report: Optional[Callable] = None,
+        resume=None
+    ):
+        """
+        Train with DDP across world_size worker processes
+
+        Resume, checkpoint, compile and profile are not supported in this
+        mode and raise ValueError.
+
+        Returns:
+            (model, final_loss, final_accuracy)
+        """
+        if resume is not None:
+            raise ValueError('Resume is not supported with distributed training')
+        unsupported = [key for key in UNSUPPORTED_OPTIONS if config.get(key)]
+        if unsupported:
+            raise ValueError(f"{', '.join(unsupported)} not supported with distributed training")
+        ctx = mp.get_context('spawn')
+        events = ctx.Queue()
+        self._stop_event = ctx.Event()
+        if self.stop_requested:
+            self._stop_event.set()
+        port = _free_port()
+        workers = [
+            ctx.Process(
+                target=_worker,
+                args=(rank, self.world_size, self.threads_per_worker, port,
+                      graph_data, config, events, self._stop_event),
+                name=f'ddp-worker-{rank}',
+                daemon=True
+            )
+            for rank in range(self.world_size)
+        ]
+        for worker in workers:
+            worker.start()
+
+        try:
+            state, final_loss, final_accuracy, self.scheduler_info = self._collect(
+                events, workers, on_epoch_end, on_batch_end
+            )
+        finally:
+            self._stop_event.set()
+            for worker in workers:
+                worker.join(timeout=10)
+                if worker.is_alive():
+                    worker.terminate()
+
+        model = ModelBuilder().build_model(graph_data)
+        model.load_state_dict(torch.load(io.BytesIO(state)))
+        self.model = model
+        return model, final_loss, final_accuracy
+
+    def _collect(self, events, workers, on_epoch_end, on_batch_end):
+        """Relay worker events until rank 0 sends its result"""
+        while True:
+            try:
+                message = events.get(timeout=0.5)
+            except queue.Empty:
+                for worker in workers:
+                    if worker.exitcode not in (None, 0):
+                        raise RuntimeError(f'{worker.name} exited with code {worker.exitcode}')
+                continue
+
+            kind = message[0]
+            if kind == 'batch_end' and on_batch_end:
+                on_batch_end(*message[1:])
+            elif kind == 'epoch_end':
+                _, epoch, loss, accuracy, timing = message
+                self.epoch_timing = timing
+                if on_epoch_end:
+                    on_epoch_end(epoch, loss, accuracy)
+            elif kind == 'result':
+                return message[1:]
+            elif kind == 'error':
+                raise RuntimeError(f'Worker {message[1]} failed:\n{message[2]}')
+
+    def stop(self):
+        """Request training stop on every worker"""
+        self.stop_requested = True
+        if self._stop_event is not None:
+            self._stop_event.set()
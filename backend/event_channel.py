@@ -0,0 +1,269 @@
+"""
+Event Channel
+Coalesces backend events into frames written by a background thread
+
+Two encodings share the same batching:
+    json   - one JSON line per event (the original protocol)
+    binary - length-prefixed frames; batch_end events are packed into
+             float64 column arrays instead of one JSON object each
+
+Binary frame layout (little-endian):
+    b'TFEV' | u32 header_len | u32 blob_len | header JSON | blob bytes
+
+The header is {"items": [...]} where an item is either a regular event
+{"event": ..., "data": ...} or a series
+{"series": "batch_end", "job_id": ..., "fields": [...], "int_fields": [...],
+ "length": n, "offset": byte_offset_in_blob, "dropped": n_dropped}
+whose field columns are stored back to back in the blob.
+"""
+
+import json
+import struct
+import sys
+import threading
+from array import array
+from typing import Dict, Any, List, Union
+
+
+FRAME_MAGIC = b'TFEV'
+SERIES_EVENTS = ('batch_end',)
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class SeriesBlock:
+    """
+    Consecutive high-frequency events of one type, stored column-wise
+
+    Only events whose fields (besides job_id) are all numbers can be
+    packed; anything else is sent as a plain event.
+    """
+
+    def __init__(self, event_type: str, data: Dict[str, Any]):
+        self.event_type = event_type
+        self.job_id = data.get('job_id')
+        self.fields = [k for k in data if k != 'job_id']
+        # Counters such as batch indices round-trip as ints
+        self.int_fields = [k for k in self.fields if isinstance(data[k], int)]
+        self.columns = {k: array('d') for k in self.fields}
+        self.dropped = 0
+
+    @classmethod
+    def from_columns(cls, event_type: str, job_id, columns: Dict[str, array], int_fields=()):
+        block = cls(event_type, {'job_id': job_id})
+        block.fields = list(columns)
+        block.int_fields = list(int_fields)
+        block.columns = columns
+        return block
+
+    @staticmethod
+    def packable(data: Dict[str, Any]) -> bool:
+        return all(_is_number(v) for k, v in data.items() if k != 'job_id')
+
+    def accepts(self, event_type: str, data: Dict[str, Any]) -> bool:
+        # Same fields, each keeping its int/float kind, so rows decode as sent
+        return (event_type == self.event_type and data.get('job_id') == self.job_id
+                and set(data) - {'job_id'} == set(self.fields)
+                and all(isinstance(data[k], int) == (k in self.int_fields) for k in self.fields))
+
+    def append(self, data: Dict[str, Any]):
+        for k in self.fields:
+            self.columns[k].append(float(data[k]))
+
+    def __len__(self):
+        return len(self.columns[self.fields[0]]) if self.fields else 0
+
+    def downsample(self):
+        """Halve the stored rows, keeping the most recent one"""
+        n = len(self)
+        keep = range(n - 1, -1, -2)
+        for k in self.fields:
+            column = self.columns[k]
+            self.columns[k] = array('d', (column[i] for i in reversed(keep)))
+        self.dropped += n - len(self)
+
+    def events(self):
+        """Expand back into individual event dicts"""
+        int_fields = set(self.int_fields)
+        for i in range(len(self)):
+            data = {k: int(self.columns[k][i]) if k in int_fields else self.columns[k][i]
+                    for k in self.fields}
+            if self.job_id is not None:
+                data = {'job_id': self.job_id, **data}
+            yield {'event': self.event_type, 'data': data}
+
+
+class EventChannel:
+    """
+    Thread-safe event sink with time-window coalescing and backpressure
+
+    Series events (batch_end) wait for the flush window; any other event
+    wakes the writer immediately so command replies stay low-latency.
+    While the consumer is slow the writer blocks on the pipe, pending
+    series rows pile up, and past max_pending_rows the oldest series is
+    downsampled instead of growing without bound.
+    """
+
+    def __init__(
+        self,
+        stream=None,
+        encoding: str = 'json',
+        flush_interval: float = 0.05,
+        max_pending_rows: int = 10000
+    ):
+        if encoding not in ('json', 'binary'):
+            raise ValueError(f'Unknown encoding: {encoding}')
+
+        self.encoding = encoding
+        self.flush_interval = flush_interval
+        self.max_pending_rows = max_pending_rows
+        if stream is None:
+            stream = sys.stdout.buffer if encoding == 'binary' else sys.stdout
+        self.stream = stream
+
+        self._pending: List[Any] = []
+        self._pending_rows = 0
+        self._urgent = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._run, name='event-writer', daemon=True)
+        self._writer.start()
+
+    def send(self, event_type: str, data: Dict[str, Any]):
+        """Queue an event; never blocks on the consumer"""
+        with self._cond:
+            if event_type in SERIES_EVENTS and SeriesBlock.packable(data):
+                last = self._pending[-1] if self._pending else None
+                if not (isinstance(last, SeriesBlock) and last.accepts(event_type, data)):
+                    last = SeriesBlock(event_type, data)
+                    self._pending.append(last)
+                last.append(data)
+                self._pending_rows += 1
+                if self._pending_rows > self.max_pending_rows:
+                    self._shed_rows()
+            else:
+                self._pending.append({'event': event_type, 'data': data})
+                self._urgent = True
+                self._cond.notify()
+
+    def flush(self):
+        """Write everything queued so far (from the calling thread)"""
+        self._drain()
+
+    def close(self):
+        """Flush remaining events and stop the writer thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._writer.join()
+        self.flush()
+
+    def _take(self):
+        items = self._pending
+        self._pending = []
+        self._pending_rows = 0
+        self._urgent = False
+        return items
+
+    def _shed_rows(self):
+        """Downsample the oldest series blocks until under the row budget"""
+        for item in self._pending:
+            if isinstance(item, SeriesBlock) and len(item) > 1:
+                before = len(item)
+                item.downsample()
+                self._pending_rows -= before - len(item)
+                if self._pending_rows <= self.max_pending_rows:
+                    return
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._urgent and not self._closed:
+                    self._cond.wait(self.flush_interval)
+                if self._closed:
+                    return
+            self._drain()
+
+    def _drain(self):
+        # Taking and writing under one lock keeps frames in send order;
+        # producers only touch _cond, so a blocked pipe never stalls them
+        with self._write_lock:
+            with self._cond:
+                items = self._take()
+            if not items:
+                return
+            self.stream.write(self.encode(items))
+            self.stream.flush()
+
+    def encode(self, items) -> Union[str, bytes]:
+        """Encode queued items as JSON lines (str) or one binary frame (bytes)"""
+        if self.encoding == 'json':
+            lines = []
+            for item in items:
+                if isinstance(item, SeriesBlock):
+                    lines.extend(json.dumps(event) for event in item.events())
+                else:
+                    lines.append(json.dumps(item))
+            return '\n'.join(lines) + '\n'
+
+        header_items = []
+        blob = bytearray()
+        for item in items:
+            if not isinstance(item, SeriesBlock):
+                header_items.append(item)
+                continue
+            header_items.append({
+                'series': item.event_type,
+                'job_id': item.job_id,
+                'fields': item.fields,
+                'int_fields': item.int_fields,
+                'length': len(item),
+                'offset': len(blob),
+                'dropped': item.dropped
+            })
+            for k in item.fields:
+                column = item.columns[k]
+                if sys.byteorder != 'little':
+                    column = array('d', column)
+                    column.byteswap()
+                blob += column.tobytes()
+
+        header = json.dumps({'items': header_items}).encode('utf-8')
+        return FRAME_MAGIC + struct.pack('<II', len(header), len(blob)) + header + bytes(blob)
+
+
+def decode_frame(frame: bytes) -> List[Dict[str, Any]]:
+    """
+    Decode one binary frame back into event dicts (series expanded)
+
+    Mainly for tests and Python consumers; the Electron side has its own
+    decoder in pythonBridge.js.
+    """
+    if frame[:4] != FRAME_MAGIC:
+        raise ValueError('Not an event frame')
+    header_len, blob_len = struct.unpack_from('<II', frame, 4)
+    header = json.loads(frame[12:12 + header_len].decode('utf-8'))
+    blob = frame[12 + header_len:12 + header_len + blob_len]
+
+    events = []
+    for item in header['items']:
+        if 'series' not in item:
+            events.append(item)
+            continue
+        n = item['length']
+        columns = {}
+        for i, k in enumerate(item['fields']):
+            column = array('d')
+            start = item['offset'] + i * n * 8
+            column.frombytes(blob[start:start + n * 8])
+            if sys.byteorder != 'little':
+                column.byteswap()
+            columns[k] = column
+        block = SeriesBlock.from_columns(
+            item['series'], item['job_id'], columns, item.get('int_fields', ())
+        )
+        events.extend(block.events())
+    return events
@@ -0,0 +1,136 @@
+"""
+Graph Cache
+Process-wide LRU cache of per-graph results, keyed by a canonical graph hash
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Tuple, NamedTuple
+
+
+# Entries kept per kind; module templates hold weights, so keep few
+MAX_ENTRIES = {
+    'validation': 256,
+    'code': 64,
+    'module': 8,
+}
+
+_entries: Dict[str, OrderedDict] = {kind: OrderedDict() for kind in MAX_ENTRIES}
+_lock = threading.Lock()
+_stats = {kind: {'hits': 0, 'misses': 0} for kind in MAX_ENTRIES}
+
+
+class GraphKey(NamedTuple):
+    """digest identifies the graph up to node renaming; node_ids[i] is
+    this graph's id for the node at canonical index i"""
+    digest: str
+    node_ids: Tuple[str, ...]
+
+
+def graph_key(graph_data: Dict[str, Any]) -> GraphKey:
+    """
+    Canonical content hash of a graph
+
+    Only what changes the model is hashed: node types, params (keys
+    sorted) and each node's inputs in edge order. Positions, labels and
+    other UI fields are dropped, and node ids are replaced by a canonical
+    index derived from each node's content and everything upstream of it,
+    so renaming nodes or reordering the node/edge lists keeps the digest.
+
+    Graphs with cycles or dangling edges fall back to hashing the ids too.
+    """
+    nodes = graph_data.get('nodes', [])
+    edges = graph_data.get('edges', [])
+    ids = [node.get('id') for node in nodes]
+    index = {node_id: i for i, node_id in enumerate(ids)}
+
+    content = [
+        json.dumps([node.get('type'), node.get('data', {}).get('params', {})],
+                   sort_keys=True, default=str)
+        for node in nodes
+    ]
+    inputs: List[List[int]] = [[] for _ in nodes]
+    outputs: List[List[int]] = [[] for _ in nodes]
+    dangling = []
+    for edge in edges:
+        source, target = index.get(edge.get('source')), index.get(edge.get('target'))
+        if source is None or target is None:
+            dangling.append([edge.get('source'), edge.get('target')])
+            continue
+        inputs[target].append(source)
+        outputs[source].append(target)
+
+    # Signature of a node = its content plus its inputs' signatures, in order
+    signature = [None] * len(nodes)
+    pending = [len(p) for p in inputs]
+    ready = [i for i, count in enumerate(pending) if count == 0]
+    while ready:
+        i = ready.pop()
+        h = hashlib.sha1(content[i].encode('utf-8'))
+        for p in inputs[i]:
+            h.update(signature[p])
+        signature[i] = h.digest()
+        for j in outputs[i]:
+            pending[j] -= 1
+            if pending[j] == 0:
+                ready.append(j)
+
+    exact_ids = dangling or None in signature
+    if exact_ids:
+        order = list(range(len(nodes)))
+    else:
+        order = sorted(range(len(nodes)), key=lambda i: (signature[i], i))
+    canonical_index = {i: c for c, i in enumerate(order)}
+
+    canonical = {
+        'nodes': [content[i] for i in order],
+        'inputs': [[canonical_index[p] for p in inputs[i]] for i in order],
+    }
+    if exact_ids:
+        canonical['ids'] = ids
+        canonical['dangling'] = dangling
+
+    digest = hashlib.sha256(
+        json.dumps(canonical, separators=(',', ':')).encode('utf-8')
+    ).hexdigest()
+    return GraphKey(digest, tuple(ids[i] for i in order))
+
+
+def lookup(kind: str, key) -> Any:
+    """Cached value for key (most recent use kept), or None"""
+    with _lock:
+        entries = _entries[kind]
+        if key in entries:
+            entries.move_to_end(key)
+            _stats[kind]['hits'] += 1
+            return entries[key]
+        _stats[kind]['misses'] += 1
+        return None
+
+
+def store(kind: str, key, value: Any):
+    """Insert value, evicting the least recently used entries past the limit"""
+    with _lock:
+        entries = _entries[kind]
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > MAX_ENTRIES[kind]:
+            entries.popitem(last=False)
+
+
+def clear_cache():
+    """Drop every entry (counters are kept)"""
+    with _lock:
+        for entries in _entries.values():
+            entries.clear()
+
+
+def cache_info() -> Dict[str, Any]:
+    """Hit/miss counters and current size per kind"""
+    with _lock:
+        return {
+            kind: {**_stats[kind], 'size': len(_entries[kind])}
+            for kind in MAX_ENTRIES
+        }
@@ -0,0 +1,34 @@
+"""
+Graph Fixtures
+Builders for the small graphs used throughout the tests
+
+Nodes have the same layout the frontend sends (id, type, position,
+data.label, data.params).
+"""
+
+from typing import Dict, Any
+
+
+def make_node(node_id: str, node_type: str, **params) -> Dict[str, Any]:
+    return {'id': node_id, 'type': node_type, 'position': {'x': 0, 'y': 0},
+            'data': {'label': node_type, 'params': params}}
+
+
+def chain_graph(*nodes: Dict[str, Any]) -> Dict[str, Any]:
+    """Graph connecting nodes one after another"""
+    return {
+        'nodes': list(nodes),
+        'edges': [{'source': a['id'], 'target': b['id']} for a, b in zip(nodes, nodes[1:])]
+    }
+
+
+def mlp_graph(features: int = 20, hidden: int = 32, classes: int = 4,
+              activation: str = 'relu') -> Dict[str, Any]:
+    """input -> linear1 -> activation -> linear2 -> output classifier"""
+    return chain_graph(
+        make_node('input1', 'input', shape=[1, features]),
+        make_node('linear1', 'linear', in_features=features, out_features=hidden),
+        make_node(f'{activation}1', activation),
+        make_node('linear2', 'linear', in_features=hidden, out_features=classes),
+        make_node('output1', 'output', numClasses=classes),
+    )
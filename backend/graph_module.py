@@ -0,0 +1,173 @@
+"""
+Graph Module
+Executes graph-built layers in topological order over a slot-indexed buffer
+"""
+
+import re
+import torch.nn as nn
+from typing import Dict, List, Tuple
+
+
+class ExecutionStep:
+    """One node of the compiled execution plan"""
+
+    __slots__ = ('node_id', 'module_name', 'input_slots', 'output_slot', 'free_slots')
+
+    def __init__(self, node_id: str, module_name: str, input_slots: Tuple[int, ...],
+                 output_slot: int, free_slots: Tuple[int, ...]):
+        self.node_id = node_id
+        self.module_name = module_name
+        self.input_slots = input_slots
+        self.output_slot = output_slot
+        self.free_slots = free_slots
+
+    def __repr__(self):
+        return (f'ExecutionStep({self.node_id!r}, in={self.input_slots}, '
+                f'out={self.output_slot}, free={self.free_slots})')
+
+
+def plan_execution(
+    execution_order: List[str],
+    predecessors: Dict[str, List[str]],
+    input_id: str,
+    output_id: str,
+    has_module: Dict[str, bool]
+) -> Tuple[List[Tuple[str, Tuple[int, ...], int, Tuple[int, ...]]], int, int]:
+    """
+    Assign buffer slots to node outputs based on liveness
+
+    Only ancestors of output_id are scheduled. A slot is released after the
+    last step that reads it and is reused by later outputs, so the buffer
+    size equals the peak number of simultaneously live activations.
+
+    Returns:
+        (steps, output_slot, num_slots) where each step is
+        (node_id, input_slots, output_slot, free_slots)
+    """
+    # Keep only nodes the output actually depends on
+    needed = {output_id}
+    stack = [output_id]
+    while stack:
+        for src in predecessors.get(stack.pop(), []):
+            if src not in needed:
+                needed.add(src)
+                stack.append(src)
+    order = [node_id for node_id in execution_order if node_id in needed]
+
+    # Index of the last step reading each node's output
+    position = {node_id: i for i, node_id in enumerate(order)}
+    last_use = {}
+    for node_id in order:
+        for src in predecessors.get(node_id, []):
+            last_use[src] = position[node_id]
+    last_use[output_id] = len(order)  # never released
+
+    # Pass-through nodes (e.g. Output) alias their input instead of a slot
+    slot_of = {input_id: 0}
+    free = []
+    num_slots = 1
+    steps = []
+
+    for i, node_id in enumerate(order):
+        if node_id == input_id:
+            continue
+
+        srcs = predecessors.get(node_id, [])
+        input_slots = tuple(slot_of[src] for src in srcs)
+
+        if not has_module[node_id]:
+            slot_of[node_id] = input_slots[0]
+            # The alias inherits the lifetime of whichever use is later
+            src = srcs[0]
+            last_use[src] = max(last_use[src], last_use.get(node_id, i))
+            continue
+
+        # Release inputs whose last reader is this step (an alias and its
+        # source share one slot, so dedupe by slot)
+        released = tuple(dict.fromkeys(
+            slot_of[src] for src in srcs if last_use[src] == i
+        ))
+        free.extend(released)
+
+        if free:
+            output_slot = free.pop()
+        else:
+            output_slot = num_slots
+            num_slots += 1
+        slot_of[node_id] = output_slot
+
+        # Released slots are cleared at runtime unless the output reuses them
+        steps.append((node_id, input_slots, output_slot,
+                      tuple(s for s in released if s != output_slot)))
+
+    return steps, slot_of[output_id], num_slots
+
+
+def module_name_for(node_id: str, taken: set) -> str:
+    """Turn a node id into a unique attribute-safe module name"""
+    name = re.sub(r'\W', '_', str(node_id)) or 'node'
+    if name[0].isdigit():
+        name = f'n_{name}'
+    candidate = name
+    suffix = 1
+    while candidate in taken:
+        suffix += 1
+        candidate = f'{name}_{suffix}'
+    taken.add(candidate)
+    return candidate
+
+
+class GraphModule(nn.Module):
+    """
+    nn.Module running a DAG of layers
+
+    Each forward walks a precomputed plan. Activations live in a list
+    indexed by slot and are dropped after their last consumer runs.
+    """
+
+    def __init__(
+        self,
+        layers: Dict[str, nn.Module],
+        execution_order: List[str],
+        predecessors: Dict[str, List[str]],
+        input_id: str,
+        output_id: str
+    ):
+        super().__init__()
+        self.layers = nn.ModuleDict()
+        self.node_modules: Dict[str, str] = {}
+
+        taken = set()
+        for node_id in execution_order:
+            if node_id in layers:
+                name = module_name_for(node_id, taken)
+                self.layers[name] = layers[node_id]
+                self.node_modules[node_id] = name
+
+        has_module = {node_id: node_id in layers for node_id in execution_order}
+        has_module[input_id] = False
+        planned, self.output_slot, self.num_slots = plan_execution(
+            execution_order, predecessors, input_id, output_id, has_module
+        )
+        self.steps = [
+            ExecutionStep(node_id, self.node_modules[node_id], ins, out, frees)
+            for node_id, ins, out, frees in planned
+        ]
+        self._build_plan()
+
+    def _build_plan(self):
+        """Cache (module, input_slots, output_slot, free_slots) per step"""
+        self._plan = [
+            (self.layers[step.module_name], step.input_slots, step.output_slot, step.free_slots)
+            for step in self.steps
+        ]
+
+    def forward(self, x):
+        buffer = [None] * self.num_slots
+        buffer[0] = x
+        for module, input_slots, output_slot, free_slots in self._plan:
+            out = module(*[buffer[s] for s in input_slots])
+            for s in free_slots:
+                buffer[s] = None
+            buffer[output_slot] = out
+        return buffer[self.output_slot]
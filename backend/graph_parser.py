@@ -3,25 +3,242 @@ Graph Parser and Validator
 Validates graph structure, connections, and shape compatibility
 """
 
-from typing import Dict, List, Any, Set
-from schema import NodeType, NODE_SCHEMAS, infer_output_shape, validate_node_params
+from collections import deque
+from typing import Dict, List, Any, Set, Optional, Tuple
+from schema import NodeType, NODE_SCHEMAS, SHAPE_RULES, validate_node_params
+from cost_model import count_node_params, node_cost, summarize_costs
+import graph_cache
+
+
+# NodeType(value) goes through Enum.__call__; a dict lookup is much cheaper
+# on the per-node paths of large graphs
+NODE_TYPES = {t.value: t for t in NodeType}
+_INPUT = NodeType.INPUT
+
+
+def node_params(node: Dict[str, Any]) -> Dict[str, Any]:
+    """Parameters of a graph node"""
+    return node.get('data', {}).get('params', {})
+
+
+def infer_node_shape(
+    node_id: str,
+    node_type: NodeType,
+    params: Dict[str, Any],
+    input_shapes: List[Optional[List[int]]]
+) -> Tuple[Optional[List[int]], Optional[str]]:
+    """
+    Shape of one node given its predecessors' shapes (in edge order)
+    
+    Returns:
+        (shape, error) - shape is None when it cannot be determined
+    """
+    if node_type is _INPUT:
+        # Input node defines its own shape
+        shape = params.get('shape', [])
+        if not shape:
+            return None, f'Input node {node_id} missing shape'
+        return shape, None
+    
+    # Unknown until every input's shape is known
+    if not input_shapes or not all(input_shapes):
+        return None, None
+    
+    try:
+        # Same as schema.infer_output_shape, minus one call per node
+        return SHAPE_RULES[node_type](input_shapes, params), None
+    except Exception as e:
+        return None, f'Node {node_id}: Shape inference failed - {str(e)}'
+
+
+# Declared input count per node type (-1 = any number)
+EXPECTED_INPUTS = {t: NODE_SCHEMAS[t].get('inputs', 0) for t in NODE_SCHEMAS}
+
+
+def cycle_error(cycle: List[str], limit: int = 8) -> str:
+    """Error message naming the nodes of one cycle (long cycles abbreviated)"""
+    if len(cycle) > limit:
+        shown = cycle[:limit - 1] + ['...', cycle[-1]]
+        path = ' -> '.join(shown + cycle[:1])
+        return f'Graph contains cycles (must be DAG): {path} ({len(cycle)} nodes)'
+    path = ' -> '.join(cycle + cycle[:1])
+    return f'Graph contains cycles (must be DAG): {path}'
+
+
+def connection_error(node_id: str, node_type: NodeType, num_inputs: int) -> Optional[str]:
+    """Input-count check for one node, or None when it is satisfied"""
+    expected_inputs = EXPECTED_INPUTS[node_type]
+    
+    if expected_inputs > 0 and num_inputs == 0:
+        return f'Node {node_id} ({node_type.value}) requires {expected_inputs} input(s)'
+    elif expected_inputs > 0 and num_inputs > expected_inputs:
+        return f'Node {node_id} ({node_type.value}) has too many inputs'
+    return None
+
+
+class IndexedGraph:
+    """
+    Integer-indexed graph with CSR adjacency
+    
+    Node i is node_ids[i], with node_types[i] (None if the type is
+    unknown) and node_params[i]; the successors of i are
+    out_targets[out_offsets[i]:out_offsets[i + 1]] and its predecessors
+    in_sources[in_offsets[i]:in_offsets[i + 1]], both in edge order.
+    Edges with an unknown endpoint are left out and reported in
+    edge_errors. Built once per validate and shared by every pass.
+    """
+    
+    def __init__(self, nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]]):
+        self.node_ids = [node['id'] for node in nodes]
+        self.node_types = [NODE_TYPES.get(node.get('type')) for node in nodes]
+        self.node_params = [node_params(node) for node in nodes]
+        self.index = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        self.edge_errors = []
+        
+        lookup = self.index.get
+        sources = [lookup(edge.get('source')) for edge in edges]
+        targets = [lookup(edge.get('target')) for edge in edges]
+        
+        if None in sources or None in targets:
+            kept_sources, kept_targets = [], []
+            for edge, source, target in zip(edges, sources, targets):
+                if source is None:
+                    self.edge_errors.append(f"Edge references unknown source node: {edge.get('source')}")
+                    continue
+                if target is None:
+                    self.edge_errors.append(f"Edge references unknown target node: {edge.get('target')}")
+                    continue
+                kept_sources.append(source)
+                kept_targets.append(target)
+            sources, targets = kept_sources, kept_targets
+        
+        n = len(self.node_ids)
+        self.out_offsets, self.out_targets = self._csr(n, sources, targets)
+        self.in_offsets, self.in_sources = self._csr(n, targets, sources)
+        self._order = None
+    
+    @staticmethod
+    def _csr(n: int, keys: List[int], values: List[int]) -> Tuple[List[int], List[int]]:
+        """Counting sort of values by key (stable, so edge order is kept)"""
+        offsets = [0] * (n + 1)
+        for k in keys:
+            offsets[k + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+        
+        fill = offsets[:-1]
+        packed = [0] * len(values)
+        for k, v in zip(keys, values):
+            packed[fill[k]] = v
+            fill[k] += 1
+        return offsets, packed
+    
+    def __len__(self):
+        return len(self.node_ids)
+    
+    def successors(self, i: int) -> List[int]:
+        return self.out_targets[self.out_offsets[i]:self.out_offsets[i + 1]]
+    
+    def predecessors(self, i: int) -> List[int]:
+        return self.in_sources[self.in_offsets[i]:self.in_offsets[i + 1]]
+    
+    def in_degree(self, i: int) -> int:
+        return self.in_offsets[i + 1] - self.in_offsets[i]
+    
+    def topological_order(self) -> List[int]:
+        """
+        Kahn's algorithm (FIFO); computed once and cached
+        
+        Returns:
+            Node indices in order - shorter than the graph if it has a cycle
+        """
+        if self._order is not None:
+            return self._order
+        
+        in_offsets, out_offsets, out_targets = self.in_offsets, self.out_offsets, self.out_targets
+        in_degree = [in_offsets[i + 1] - in_offsets[i] for i in range(len(self))]
+        queue = deque(i for i, degree in enumerate(in_degree) if degree == 0)
+        order = []
+        
+        while queue:
+            i = queue.popleft()
+            order.append(i)
+            for j in out_targets[out_offsets[i]:out_offsets[i + 1]]:
+                in_degree[j] -= 1
+                if in_degree[j] == 0:
+                    queue.append(j)
+        
+        self._order = order
+        return order
+    
+    def find_cycle(self) -> List[int]:
+        """
+        One cycle, as node indices in edge direction ([] for a DAG)
+        
+        Every node Kahn's pass never reached still has an unreached
+        predecessor, so walking those predecessors must revisit a node;
+        the walk between the two visits is a cycle. Iterative and O(V + E).
+        """
+        order = self.topological_order()
+        if len(order) == len(self):
+            return []
+        
+        reached = [False] * len(self)
+        for i in order:
+            reached[i] = True
+        
+        in_offsets, in_sources = self.in_offsets, self.in_sources
+        step = {}
+        node = reached.index(False)
+        while node not in step:
+            for p in in_sources[in_offsets[node]:in_offsets[node + 1]]:
+                if not reached[p]:
+                    step[node] = p
+                    node = p
+                    break
+        
+        # node is on the cycle; follow predecessors back round to it, then
+        # flip the walk into edge direction starting from node
+        walk = []
+        current = step[node]
+        while current != node:
+            walk.append(current)
+            current = step[current]
+        return [node] + walk[::-1]
 
 
 class GraphParser:
     def __init__(self):
         self.nodes = {}
         self.edges = []
+        self.graph = None
         self.node_shapes = {}
-        
-    def validate(self, graph_data: Dict[str, Any]) -> Dict[str, Any]:
+        self._execution_order = None
+        
+    def validate(
+        self,
+        graph_data: Dict[str, Any],
+        cost_options: Optional[Dict[str, Any]] = None,
+        use_cache: bool = False
+    ) -> Dict[str, Any]:
         """
         Validate entire graph
         
+        Args:
+            graph_data: Graph JSON
+            cost_options: If given, a valid graph also gets a 'cost' report
+                (see cost_model.summarize_costs); keys batch_size (default:
+                the Input shape's batch), dtype, memory_limit_mb
+            use_cache: Reuse the result of an earlier validation of the same
+                graph (see graph_cache.graph_key); only valid graphs are
+                cached, and requests with cost_options always recompute
+        
         Returns:
             {
                 'valid': bool,
                 'errors': List[str],
-                'total_params': int
+                'total_params': int,
+                'cost': dict (only with cost_options)
             }
         """
         errors = []
@@ -33,9 +250,18 @@ class GraphParser:
         if not nodes:
             return {'valid': False, 'errors': ['Graph has no nodes']}
         
-        # Build node map
+        key = None
+        if use_cache and cost_options is None:
+            key = graph_cache.graph_key(graph_data)
+            cached = graph_cache.lookup('validation', key.digest)
+            if cached is not None:
+                return self._restore_cached(nodes, edges, key, cached)
+        
+        # Build node map and the indexed graph every pass shares
         self.nodes = {node['id']: node for node in nodes}
         self.edges = edges
+        self.graph = IndexedGraph(list(self.nodes.values()), edges)
+        self._execution_order = None
         
         # Validate individual nodes
         for node in nodes:
@@ -54,8 +280,9 @@ class GraphParser:
         errors.extend(connection_errors)
         
         # Check for cycles
-        if self._has_cycle():
-            errors.append('Graph contains cycles (must be DAG)')
+        cycle = self._find_cycle()
+        if cycle:
+            errors.append(cycle_error(cycle))
         
         # Validate shapes
         if not errors:
@@ -67,11 +294,47 @@ class GraphParser:
         if not errors:
             total_params = self._calculate_total_params()
         
-        return {
+        result = {
             'valid': len(errors) == 0,
             'errors': errors,
             'total_params': total_params
         }
+        if not errors and cost_options is not None:
+            result['cost'] = self._estimate_cost(cost_options)
+        if key is not None and not errors:
+            self._store_cached(key, result)
+        return result
+    
+    def _store_cached(self, key: graph_cache.GraphKey, result: Dict[str, Any]):
+        """Cache a valid result with node ids replaced by canonical indices"""
+        canonical = {node_id: c for c, node_id in enumerate(key.node_ids)}
+        graph_cache.store('validation', key.digest, {
+            'total_params': result['total_params'],
+            'shapes': [self.node_shapes[node_id] for node_id in key.node_ids],
+            'order': [canonical[node_id] for node_id in self._topological_sort()],
+            'node_ids': key.node_ids
+        })
+    
+    def _restore_cached(
+        self,
+        nodes: List[Dict[str, Any]],
+        edges: List[Dict[str, Any]],
+        key: graph_cache.GraphKey,
+        cached: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Adopt a cached result for this graph's node ids"""
+        self.nodes = {node['id']: node for node in nodes}
+        self.edges = edges
+        self.graph = None
+        node_ids = key.node_ids
+        self.node_shapes = {node_id: cached['shapes'][c] for c, node_id in enumerate(node_ids)}
+        # Nodes with identical content and inputs may swap canonical slots
+        # between isomorphic graphs, which keeps shapes but not necessarily
+        # a valid order - reuse the order only for the very same ids
+        self._execution_order = None
+        if node_ids == cached['node_ids']:
+            self._execution_order = [node_ids[c] for c in cached['order']]
+        return {'valid': True, 'errors': [], 'total_params': cached['total_params']}
     
     def _validate_node(self, node: Dict[str, Any]) -> List[str]:
         """Validate single node"""
@@ -83,9 +346,8 @@ class GraphParser:
             errors.append('Node missing id')
             return errors
         
-        try:
-            node_type = NodeType(node_type_str)
-        except ValueError:
+        node_type = NODE_TYPES.get(node_type_str)
+        if node_type is None:
             errors.append(f'Node {node_id}: Invalid node type {node_type_str}')
             return errors
         
@@ -99,70 +361,26 @@ class GraphParser:
     
     def _validate_connections(self) -> List[str]:
         """Validate edge connections"""
-        errors = []
-        
-        # Build adjacency list
-        incoming = {node_id: [] for node_id in self.nodes}
-        
-        for edge in self.edges:
-            source = edge.get('source')
-            target = edge.get('target')
-            
-            if source not in self.nodes:
-                errors.append(f'Edge references unknown source node: {source}')
-                continue
-            if target not in self.nodes:
-                errors.append(f'Edge references unknown target node: {target}')
-                continue
+        graph = self.graph
+        errors = list(graph.edge_errors)
+        
+        # Check input counts
+        in_offsets = graph.in_offsets
+        for i, node_type in enumerate(graph.node_types):
+            if node_type is None:
+                continue  # Already reported by _validate_node
             
-            incoming[target].append(source)
-        
-        # Check input/output counts
-        for node_id, node in self.nodes.items():
-            node_type = NodeType(node['type'])
-            schema = NODE_SCHEMAS[node_type]
-            
-            # Check inputs
-            expected_inputs = schema.get('inputs', 0)
-            actual_inputs = len(incoming[node_id])
-            
-            if expected_inputs > 0 and actual_inputs == 0:
-                errors.append(f'Node {node_id} ({node_type.value}) requires {expected_inputs} input(s)')
-            elif expected_inputs > 0 and actual_inputs > expected_inputs:
-                errors.append(f'Node {node_id} ({node_type.value}) has too many inputs')
+            expected_inputs = EXPECTED_INPUTS[node_type]
+            num_inputs = in_offsets[i + 1] - in_offsets[i]
+            if expected_inputs > 0 and (num_inputs == 0 or num_inputs > expected_inputs):
+                errors.append(connection_error(graph.node_ids[i], node_type, num_inputs))
         
         return errors
     
-    def _has_cycle(self) -> bool:
-        """Detect cycles using DFS"""
-        visited = set()
-        rec_stack = set()
-        
-        # Build adjacency list
-        adj = {node_id: [] for node_id in self.nodes}
-        for edge in self.edges:
-            adj[edge['source']].append(edge['target'])
-        
-        def dfs(node_id):
-            visited.add(node_id)
-            rec_stack.add(node_id)
-            
-            for neighbor in adj[node_id]:
-                if neighbor not in visited:
-                    if dfs(neighbor):
-                        return True
-                elif neighbor in rec_stack:
-                    return True
-            
-            rec_stack.remove(node_id)
-            return False
-        
-        for node_id in self.nodes:
-            if node_id not in visited:
-                if dfs(node_id):
-                    return True
-        
-        return False
+    def _find_cycle(self) -> List[str]:
+        """Node ids of one cycle, read off the Kahn pass ([] if none)"""
+        node_ids = self.graph.node_ids
+        return [node_ids[i] for i in self.graph.find_cycle()]
     
     def _validate_shapes(self) -> List[str]:
         """Validate shape compatibility through the graph"""
@@ -179,97 +397,73 @@ class GraphParser:
             return errors
         
         # Topological sort
-        sorted_nodes = self._topological_sort()
-        if not sorted_nodes:
+        graph = self.graph
+        order = graph.topological_order()
+        if len(order) != len(graph):
             return ['Cannot perform topological sort']
         
-        # Propagate shapes
-        self.node_shapes = {}
+        # Propagate shapes, indexed by node position
+        shapes = [None] * len(graph)
+        node_ids, node_types, params = graph.node_ids, graph.node_types, graph.node_params
+        in_offsets, in_sources = graph.in_offsets, graph.in_sources
         
-        for node_id in sorted_nodes:
-            node = self.nodes[node_id]
-            node_type = NodeType(node['type'])
-            params = node.get('data', {}).get('params', {})
+        for i in order:
+            input_shapes = [shapes[p] for p in in_sources[in_offsets[i]:in_offsets[i + 1]]]
             
-            if node_type == NodeType.INPUT:
-                # Input node defines its own shape
-                shape = params.get('shape', [])
-                if not shape:
-                    errors.append(f'Input node {node_id} missing shape')
-                else:
-                    self.node_shapes[node_id] = shape
+            shape, error = infer_node_shape(node_ids[i], node_types[i], params[i], input_shapes)
+            if error:
+                errors.append(error)
             else:
-                # Get input shape from predecessor
-                predecessors = [e['source'] for e in self.edges if e['target'] == node_id]
-                
-                if not predecessors:
-                    continue
-                
-                input_shape = self.node_shapes.get(predecessors[0])
-                if not input_shape:
-                    continue
-                
-                try:
-                    output_shape = infer_output_shape(node_type, input_shape, params)
-                    self.node_shapes[node_id] = output_shape
-                except Exception as e:
-                    errors.append(f'Node {node_id}: Shape inference failed - {str(e)}')
+                shapes[i] = shape
         
+        self.node_shapes = {
+            node_ids[i]: shape for i, shape in enumerate(shapes) if shape is not None
+        }
         return errors
     
+    def _estimate_cost(self, options: Dict[str, Any]) -> Dict[str, Any]:
+        """Cost report from the shapes _validate_shapes inferred"""
+        graph = self.graph
+        node_ids, shapes = graph.node_ids, self.node_shapes
+        node_costs = {}
+        batch_size = options.get('batch_size')
+        
+        for i in graph.topological_order():
+            node_id = node_ids[i]
+            if node_id not in shapes:
+                continue
+            if graph.node_types[i] is NodeType.INPUT and not batch_size:
+                batch_size = shapes[node_id][0]
+            input_shapes = [shapes[node_ids[p]] for p in graph.predecessors(i)]
+            node_costs[node_id] = node_cost(
+                graph.node_types[i], graph.node_params[i], input_shapes, shapes[node_id]
+            )
+        
+        return summarize_costs(
+            node_costs, shapes, batch_size or 1,
+            dtype=options.get('dtype', 'float32'),
+            memory_limit_mb=options.get('memory_limit_mb')
+        )
+    
     def _topological_sort(self) -> List[str]:
         """Return nodes in topological order"""
-        # Build adjacency list
-        adj = {node_id: [] for node_id in self.nodes}
-        in_degree = {node_id: 0 for node_id in self.nodes}
-        
-        for edge in self.edges:
-            adj[edge['source']].append(edge['target'])
-            in_degree[edge['target']] += 1
-        
-        # Kahn's algorithm
-        queue = [node_id for node_id, degree in in_degree.items() if degree == 0]
-        result = []
+        if self.graph is None:
+            self.graph = IndexedGraph(list(self.nodes.values()), self.edges)
         
-        while queue:
-            node_id = queue.pop(0)
-            result.append(node_id)
-            
-            for neighbor in adj[node_id]:
-                in_degree[neighbor] -= 1
-                if in_degree[neighbor] == 0:
-                    queue.append(neighbor)
-        
-        if len(result) != len(self.nodes):
+        order = self.graph.topological_order()
+        if len(order) != len(self.graph):
             return []
         
-        return result
+        node_ids = self.graph.node_ids
+        return [node_ids[i] for i in order]
     
     def _calculate_total_params(self) -> int:
         """Calculate total trainable parameters"""
-        total = 0
-        
-        for node_id, node in self.nodes.items():
-            node_type = NodeType(node['type'])
-            params = node.get('data', {}).get('params', {})
-            
-            if node_type == NodeType.LINEAR:
-                in_f = params.get('in_features', 0)
-                out_f = params.get('out_features', 0)
-                total += in_f * out_f + out_f  # weights + bias
-            
-            elif node_type == NodeType.CONV2D:
-                in_c = params.get('in_channels', 0)
-                out_c = params.get('out_channels', 0)
-                k = params.get('kernel_size', 0)
-                total += in_c * out_c * k * k + out_c  # weights + bias
-            
-            elif node_type == NodeType.BATCHNORM:
-                num_f = params.get('num_features', 0)
-                total += num_f * 2  # gamma + beta
-        
-        return total
+        graph = self.graph
+        return sum(map(count_node_params, graph.node_types, graph.node_params))
     
     def get_execution_order(self) -> List[str]:
         """Get nodes in execution order"""
+        if self._execution_order is not None:
+            return list(self._execution_order)
         return self._topological_sort()
@@ -0,0 +1,132 @@
+"""
+Training Job Manager
+Runs training jobs on background threads so the command loop stays responsive
+"""
+
+import itertools
+import threading
+import time
+from typing import Dict, Any, Callable, List, Optional
+
+
+class TrainingJob:
+    """A single training run executing on its own thread"""
+
+    def __init__(self, job_id: str, engine, target: Callable):
+        self.job_id = job_id
+        self.engine = engine
+        self.status = 'pending'
+        self.progress = {}
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self._target = target
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f'training-{job_id}',
+            daemon=True
+        )
+
+    def start(self):
+        """Start the job thread"""
+        self._thread.start()
+
+    def stop(self):
+        """Ask the engine to stop at the next batch boundary"""
+        self.engine.stop()
+
+    def join(self, timeout: Optional[float] = None):
+        """Wait for the job thread to finish"""
+        self._thread.join(timeout)
+
+    def is_active(self) -> bool:
+        return self.status in ('pending', 'running')
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable job summary for status events"""
+        end = self.finished_at or time.time()
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'progress': dict(self.progress),
+            'error': self.error,
+            'elapsed': round(end - self.started_at, 3) if self.started_at else 0.0
+        }
+
+    def _run(self):
+        self.status = 'running'
+        self.started_at = time.time()
+        try:
+            self._target(self)
+            self.status = 'stopped' if self.engine.stop_requested else 'completed'
+        except Exception as e:
+            self.status = 'failed'
+            self.error = str(e)
+        finally:
+            self.finished_at = time.time()
+
+
+class JobManager:
+    """Track training jobs by id and route stop/status requests to them"""
+
+    def __init__(self):
+        self._jobs: Dict[str, TrainingJob] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, engine, target: Callable) -> TrainingJob:
+        """
+        Start a new job
+
+        Args:
+            engine: Object exposing stop() and stop_requested
+            target: Callable(job) run on the job thread
+
+        Returns:
+            The started TrainingJob
+        """
+        with self._lock:
+            job_id = f'job-{next(self._ids)}'
+            job = TrainingJob(job_id, engine, target)
+            self._jobs[job_id] = job
+        job.start()
+        return job
+
+    def get(self, job_id: str) -> Optional[TrainingJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def active_jobs(self) -> List[TrainingJob]:
+        with self._lock:
+            return [job for job in self._jobs.values() if job.is_active()]
+
+    def stop(self, job_id: Optional[str] = None) -> List[str]:
+        """
+        Request stop for one job, or every active job if no id is given
+
+        Returns:
+            Ids of the jobs that were asked to stop
+        """
+        if job_id is not None:
+            job = self.get(job_id)
+            jobs = [job] if job and job.is_active() else []
+        else:
+            jobs = self.active_jobs()
+
+        for job in jobs:
+            job.stop()
+        return [job.job_id for job in jobs]
+
+    def status(self, job_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return summaries for one job or all known jobs"""
+        with self._lock:
+            if job_id is not None:
+                jobs = [self._jobs[job_id]] if job_id in self._jobs else []
+            else:
+                jobs = list(self._jobs.values())
+        return [job.to_dict() for job in jobs]
+
+    def wait(self, timeout: Optional[float] = None):
+        """Block until all active jobs have finished"""
+        for job in self.active_jobs():
+            job.join(timeout)
@@ -0,0 +1,230 @@
+"""
+Layer Profiler
+Per-node forward/backward timings for graph-built models
+"""
+
+import json
+import time
+import torch
+from typing import Dict, List, Any, Optional
+from graph_module import GraphModule
+
+
+class LayerProfiler:
+    """
+    Times every layer of a GraphModule over the first N training batches
+
+    Forward and backward hooks are registered per layer and mapped back to
+    the graph node through GraphModule.node_modules. They are removed once
+    num_batches steps are recorded, so the rest of training runs the plain
+    model. With use_torch_profiler the same batches also run under
+    torch.profiler with one record_function range per node, which adds
+    op-level detail to the trace and an 'ops' table to the report.
+
+    Hooks only fire for eager (and fx-compiled) modules; TorchScript and
+    inductor run fused code and report no layer calls.
+    """
+
+    def __init__(
+        self,
+        model: GraphModule,
+        num_batches: int = 20,
+        node_types: Optional[Dict[str, str]] = None,
+        use_torch_profiler: bool = False,
+        trace_path: Optional[str] = None
+    ):
+        self.model = model
+        self.num_batches = max(1, int(num_batches))
+        self.node_types = node_types or {}
+        self.use_torch_profiler = use_torch_profiler
+        self.trace_path = trace_path
+        self.batches = 0
+        self.stats = {
+            node_id: {'forward': 0.0, 'backward': 0.0, 'calls': 0, 'activation_bytes': 0}
+            for node_id in model.node_modules
+        }
+        # (node_id, phase, start, end) per call, kept only for the trace
+        self.events: List[tuple] = []
+        self._handles = []
+        self._forward_start: Dict[str, float] = {}
+        self._backward_start: Dict[str, float] = {}
+        self._ranges: Dict[str, Any] = {}
+        self._torch_profiler = None
+        self._origin = 0.0
+        device = next((p.device for p in model.parameters()), torch.device('cpu'))
+        # Kernels run asynchronously on CUDA; timings need a sync per hook
+        self._cuda = device.type == 'cuda'
+
+    def start(self):
+        """Register the hooks (and enter torch.profiler if requested)"""
+        self._origin = time.perf_counter()
+        # A leaf input gets no gradient, so the first layer's backward would
+        # end right after its grad_output; asking for the input gradient
+        # keeps the weight-gradient work inside that layer's window
+        self._handles.append(self.model.register_forward_pre_hook(_input_requires_grad))
+        for node_id, name in self.model.node_modules.items():
+            module = self.model.layers[name]
+            forward_pre, forward, backward_pre, backward = self._hooks(node_id)
+            self._handles += [
+                module.register_forward_pre_hook(forward_pre),
+                module.register_forward_hook(forward),
+                module.register_full_backward_pre_hook(backward_pre),
+                module.register_full_backward_hook(backward),
+            ]
+
+        if self.use_torch_profiler:
+            activities = [torch.profiler.ProfilerActivity.CPU]
+            if self._cuda:
+                activities.append(torch.profiler.ProfilerActivity.CUDA)
+            self._torch_profiler = torch.profiler.profile(activities=activities, profile_memory=True)
+            self._torch_profiler.__enter__()
+        return self
+
+    def step(self) -> bool:
+        """Count one finished training step; True once num_batches are recorded"""
+        self.batches += 1
+        return self.batches >= self.num_batches
+
+    def finish(self) -> Dict[str, Any]:
+        """Remove the hooks, write the trace if requested and build the report"""
+        for handle in self._handles:
+            handle.remove()
+        self._handles = []
+
+        ops = None
+        if self._torch_profiler is not None:
+            self._torch_profiler.__exit__(None, None, None)
+            ops = self._op_table()
+            if self.trace_path:
+                self._torch_profiler.export_chrome_trace(self.trace_path)
+        elif self.trace_path:
+            self._write_trace()
+
+        report = self.report()
+        if ops is not None:
+            report['ops'] = ops
+        if self.trace_path:
+            report['trace_path'] = self.trace_path
+        return report
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Per-node timings averaged per batch
+
+        Returns:
+            {'batches', 'forward_ms', 'backward_ms', 'top': node ids by
+            total time, 'nodes': {node_id: {'module', 'type', 'forward_ms',
+            'backward_ms', 'total_ms', 'share', 'calls', 'activation_bytes',
+            'param_bytes'}}}
+        """
+        batches = max(1, self.batches)
+        total = sum(s['forward'] + s['backward'] for s in self.stats.values()) or 1.0
+        nodes = {}
+        for node_id, s in self.stats.items():
+            name = self.model.node_modules[node_id]
+            module = self.model.layers[name]
+            nodes[node_id] = {
+                'module': name,
+                'type': self.node_types.get(node_id, type(module).__name__),
+                'forward_ms': s['forward'] * 1000 / batches,
+                'backward_ms': s['backward'] * 1000 / batches,
+                'total_ms': (s['forward'] + s['backward']) * 1000 / batches,
+                'share': (s['forward'] + s['backward']) / total,
+                'calls': s['calls'],
+                'activation_bytes': s['activation_bytes'] // batches,
+                'param_bytes': sum(p.numel() * p.element_size() for p in module.parameters())
+            }
+        return {
+            'batches': self.batches,
+            'forward_ms': sum(n['forward_ms'] for n in nodes.values()),
+            'backward_ms': sum(n['backward_ms'] for n in nodes.values()),
+            'top': sorted(nodes, key=lambda node_id: nodes[node_id]['total_ms'], reverse=True)[:10],
+            'nodes': nodes
+        }
+
+    def _hooks(self, node_id: str):
+        stats = self.stats[node_id]
+        label = f'node:{node_id}'
+
+        def forward_pre(module, args):
+            if self._torch_profiler is not None:
+                self._ranges[node_id] = torch.profiler.record_function(label).__enter__()
+            self._sync()
+            self._forward_start[node_id] = time.perf_counter()
+
+        def forward(module, args, output):
+            self._sync()
+            end = time.perf_counter()
+            start = self._forward_start.pop(node_id)
+            stats['forward'] += end - start
+            stats['calls'] += 1
+            if isinstance(output, torch.Tensor):
+                stats['activation_bytes'] += output.numel() * output.element_size()
+            if node_id in self._ranges:
+                self._ranges.pop(node_id).__exit__(None, None, None)
+            self._record(node_id, 'forward', start, end)
+
+        def backward_pre(module, grad_output):
+            self._sync()
+            self._backward_start[node_id] = time.perf_counter()
+
+        def backward(module, grad_input, grad_output):
+            self._sync()
+            end = time.perf_counter()
+            start = self._backward_start.pop(node_id, None)
+            if start is not None:
+                stats['backward'] += end - start
+                self._record(node_id, 'backward', start, end)
+
+        return forward_pre, forward, backward_pre, backward
+
+    def _sync(self):
+        if self._cuda:
+            torch.cuda.synchronize()
+
+    def _record(self, node_id: str, phase: str, start: float, end: float):
+        if self.trace_path and self._torch_profiler is None:
+            self.events.append((node_id, phase, start, end))
+
+    def _write_trace(self):
+        """Chrome trace (chrome://tracing, Perfetto) of the recorded hook windows"""
+        lanes = {'forward': 0, 'backward': 1}
+        trace = {
+            'traceEvents': [
+                {
+                    'name': node_id,
+                    'cat': phase,
+                    'ph': 'X',
+                    'ts': (start - self._origin) * 1e6,
+                    'dur': (end - start) * 1e6,
+                    'pid': 0,
+                    'tid': lanes[phase],
+                    'args': {'type': self.node_types.get(node_id, '')}
+                }
+                for node_id, phase, start, end in self.events
+            ],
+            'displayTimeUnit': 'ms'
+        }
+        with open(self.trace_path, 'w') as f:
+            json.dump(trace, f)
+
+    def _op_table(self, limit: int = 15) -> List[Dict[str, Any]]:
+        """Most expensive torch ops by self CPU time"""
+        averages = self._torch_profiler.key_averages()
+        rows = sorted(averages, key=lambda e: e.self_cpu_time_total, reverse=True)[:limit]
+        return [
+            {
+                'name': e.key,
+                'calls': e.count,
+                'self_cpu_ms': e.self_cpu_time_total / 1000,
+                'cpu_memory_bytes': e.self_cpu_memory_usage
+            }
+            for e in rows
+        ]
+
+
+def _input_requires_grad(module, args):
+    x = args[0]
+    if isinstance(x, torch.Tensor) and x.is_floating_point() and not x.requires_grad:
+        return (x.detach().requires_grad_(), *args[1:])
+    return None
@@ -0,0 +1,81 @@
+"""
+Custom Layers
+Modules for graph nodes that have no direct single-tensor nn equivalent
+"""
+
+import torch
+import torch.nn as nn
+from typing import List
+
+
+class Add(nn.Module):
+    """Element-wise sum of all inputs"""
+
+    def forward(self, *inputs):
+        out = inputs[0]
+        for x in inputs[1:]:
+            out = out + x
+        return out
+
+
+class Multiply(nn.Module):
+    """Element-wise product of all inputs"""
+
+    def forward(self, *inputs):
+        out = inputs[0]
+        for x in inputs[1:]:
+            out = out * x
+        return out
+
+
+class Concatenate(nn.Module):
+    """Concatenate all inputs along a dimension"""
+
+    def __init__(self, dim: int = 1):
+        super().__init__()
+        self.dim = dim
+
+    def forward(self, *inputs):
+        return torch.cat(inputs, dim=self.dim)
+
+    def extra_repr(self):
+        return f'dim={self.dim}'
+
+
+class Reshape(nn.Module):
+    """Reshape each sample to target_shape (batch dimension is kept)"""
+
+    def __init__(self, target_shape: List[int]):
+        super().__init__()
+        self.target_shape = tuple(target_shape)
+
+    def forward(self, x):
+        return x.reshape(x.shape[0], *self.target_shape)
+
+    def extra_repr(self):
+        return f'target_shape={self.target_shape}'
+
+
+# Recurrent layers return (output, hidden); graph edges carry only the output.
+# Subclassing keeps state_dict keys identical to the plain nn modules.
+
+class LSTM(nn.LSTM):
+    def forward(self, x):
+        return super().forward(x)[0]
+
+
+class GRU(nn.GRU):
+    def forward(self, x):
+        return super().forward(x)[0]
+
+
+class RNN(nn.RNN):
+    def forward(self, x):
+        return super().forward(x)[0]
+
+
+class SelfAttention(nn.MultiheadAttention):
+    """Multi-head attention with query, key and value taken from one input"""
+
+    def forward(self, x):
+        return super().forward(x, x, x, need_weights=False)[0]
@@ -5,33 +5,49 @@ Handles commands from Electron frontend via stdin/stdout JSON protocol
 
 import sys
 import json
+import argparse
 import traceback
-from graph_parser import GraphParser
+from validation_session import ValidationSession
 from training_engine import TrainingEngine
+from distributed_trainer import UNSUPPORTED_OPTIONS, DistributedTrainer, distributed_options
+from sweep_runner import SweepRunner, expand_trials
 from model_exporter import ModelExporter
+from checkpoint_manager import checkpoint_dir, find_checkpoint, load_checkpoint
 from system_info import get_system_info
+from job_manager import JobManager
+from event_channel import EventChannel
+import graph_cache
+import dataset_cache
+
+
+job_manager = JobManager()
+# The UI re-sends the whole graph on every edit; validate incrementally
+validation_session = ValidationSession()
+# Created by main(); JSON lines on stdout if events are sent before that
+channel = None
 
 
 def send_event(event_type, data):
-    """Send event to frontend via stdout"""
-    event = {
-        "event": event_type,
-        "data": data
-    }
-    print(json.dumps(event), flush=True)
+    """Queue event for the frontend (written to stdout by the event channel)"""
+    global channel
+    if channel is None:
+        channel = EventChannel()
+    channel.send(event_type, data)
 
 
-def handle_validate(graph_data):
+def handle_validate(graph_data, cost_options=None):
     """Validate graph structure and shape compatibility"""
     try:
-        parser = GraphParser()
-        result = parser.validate(graph_data)
+        # Valid graphs always get a cost report; the command may set
+        # batch_size, dtype and memory_limit_mb for it
+        result = validation_session.validate(graph_data, cost_options or {})
         
         if result['valid']:
             send_event('validation_success', {
                 'message': 'Graph is valid',
                 'node_count': len(graph_data.get('nodes', [])),
-                'total_params': result.get('total_params', 0)
+                'total_params': result.get('total_params', 0),
+                'cost': result['cost']
             })
         else:
             send_event('validation_error', {
@@ -56,53 +72,106 @@ def handle_get_system_info():
         })
 
 
-def handle_train(graph_data, config):
-    """Train model with given configuration"""
+def handle_train(graph_data, config, resume=None):
+    """Validate the graph and start training on a background job"""
     try:
-        # Validate graph
-        parser = GraphParser()
-        validation = parser.validate(graph_data)
+        # Resume: graph and config default to the checkpoint's
+        checkpoint = None
+        if resume:
+            path = find_checkpoint(resume, checkpoint_dir(config))
+            checkpoint = load_checkpoint(path)
+            graph_data = graph_data or checkpoint['graph_data']
+            config = {**checkpoint['config'], **config}
+        
+        # Validate graph (free when it is unchanged since the last validate)
+        validation = validation_session.validate(graph_data)
         
         if not validation['valid']:
             send_event('error', {'message': 'Invalid graph', 'errors': validation['errors']})
             return
         
-        # Start training
-        engine = TrainingEngine()
+        active = job_manager.active_jobs()
+        if active:
+            send_event('error', {
+                'message': f'Training already in progress ({active[0].job_id})',
+                'job_id': active[0].job_id
+            })
+            return
+        
+        if config.get('distributed'):
+            if checkpoint is not None:
+                send_event('error', {'message': 'Resume is not supported with distributed training'})
+                return
+            unsupported = [key for key in UNSUPPORTED_OPTIONS if config.get(key)]
+            if unsupported:
+                send_event('error', {
+                    'message': f"{', '.join(unsupported)} not supported with distributed training"
+                })
+                return
+            engine = DistributedTrainer(**distributed_options(config))
+        else:
+            engine = TrainingEngine()
+        job = job_manager.submit(
+            engine,
+            lambda job: _run_training(job, graph_data, config, checkpoint)
+        )
         send_event('training_start', {
+            'job_id': job.job_id,
             'epochs': config.get('epochs', 10),
             'optimizer': config.get('optimizer', 'adam'),
-            'lr': config.get('lr', 0.001)
+            'lr': config.get('lr', 0.001),
+            'world_size': getattr(engine, 'world_size', 1),
+            'resumed_from': {'path': path, 'epoch': checkpoint['epoch'], 'batch': checkpoint['batch']}
+                            if checkpoint is not None else None
         })
         
+    except Exception as e:
+        send_event('error', {
+            'message': f'Training failed: {str(e)}',
+            'traceback': traceback.format_exc()
+        })
+
+
+def _run_training(job, graph_data, config, checkpoint=None):
+    """Training job body - runs on the job thread"""
+    try:
         # Training loop with event callbacks
         def on_epoch_end(epoch, loss, accuracy):
+            job.progress['epoch'] = epoch
+            timing = job.engine.epoch_timing
             send_event('epoch_end', {
+                'job_id': job.job_id,
                 'epoch': epoch,
                 'loss': float(loss),
-                'accuracy': float(accuracy)
+                'accuracy': float(accuracy),
+                'data_time': round(timing.get('data_time', 0.0), 4),
+                'compute_time': round(timing.get('compute_time', 0.0), 4),
+                'eval_time': round(timing.get('eval_time', 0.0), 4)
             })
         
         def on_batch_end(batch, total_batches, loss):
+            job.progress['batch'] = batch
+            job.progress['total_batches'] = total_batches
             send_event('batch_end', {
+                'job_id': job.job_id,
                 'batch': batch,
                 'total_batches': total_batches,
                 'loss': float(loss)
             })
         
-        model, final_loss, final_accuracy = engine.train(
+        def on_profile_report(report):
+            send_event('profile_report', {'job_id': job.job_id, **report})
+        
+        model, final_loss, final_accuracy = job.engine.train(
             graph_data=graph_data,
             config=config,
             on_epoch_end=on_epoch_end,
-            on_batch_end=on_batch_end
+            on_batch_end=on_batch_end,
+            on_profile_report=on_profile_report,
+            resume=checkpoint
         )
         
-        send_event('training_complete', {
-            'final_loss': float(final_loss),
-            'final_accuracy': float(final_accuracy)
-        })
-        
-        # Store model for export
+        # Store model for export (a stopped run is still exportable)
         global trained_model
         trained_model = {
             'model': model,
@@ -110,15 +179,130 @@ def handle_train(graph_data, config):
             'config': config
         }
         
+        event_type = 'training_stopped' if job.engine.stop_requested else 'training_complete'
+        send_event(event_type, {
+            'job_id': job.job_id,
+            'final_loss': float(final_loss),
+            'final_accuracy': float(final_accuracy),
+            'compile': job.engine.compile_info,
+            'memory_plan': job.engine.memory_plan,
+            'early_stopping': job.engine.scheduler_info,
+            'checkpoint': job.engine.checkpoint_info
+        })
+        
     except Exception as e:
         send_event('error', {
+            'job_id': job.job_id,
             'message': f'Training failed: {str(e)}',
             'traceback': traceback.format_exc()
         })
+        raise
+
+
+def handle_sweep(graph_data, config, space, method='grid', num_trials=None, options=None):
+    """Validate the graph and run a hyperparameter sweep on a background job"""
+    try:
+        validation = validation_session.validate(graph_data)
+        
+        if not validation['valid']:
+            send_event('error', {'message': 'Invalid graph', 'errors': validation['errors']})
+            return
+        
+        active = job_manager.active_jobs()
+        if active:
+            send_event('error', {
+                'message': f'Training already in progress ({active[0].job_id})',
+                'job_id': active[0].job_id
+            })
+            return
+        
+        options = options or {}
+        trials = expand_trials(space, method, num_trials, options.get('seed', 0))
+        if not trials:
+            send_event('error', {'message': 'Search space has no trials'})
+            return
+        
+        runner = SweepRunner(
+            max_workers=options.get('max_workers'),
+            threads_per_trial=options.get('threads_per_trial', 1),
+            metric=options.get('metric', 'accuracy'),
+            scheduler=options.get('scheduler')
+        )
+        job = job_manager.submit(
+            runner,
+            lambda job: _run_sweep(job, graph_data, config, trials)
+        )
+        send_event('sweep_start', {
+            'job_id': job.job_id,
+            'method': method,
+            'trials': trials,
+            'max_workers': min(runner.max_workers, len(trials)),
+            'threads_per_trial': runner.threads_per_trial
+        })
+        
+    except Exception as e:
+        send_event('error', {
+            'message': f'Sweep failed: {str(e)}',
+            'traceback': traceback.format_exc()
+        })
 
 
-def handle_export(export_path):
-    """Export trained model and code"""
+def _run_sweep(job, graph_data, config, trials):
+    """Sweep job body - runs on the job thread"""
+    try:
+        def on_event(event_type, data):
+            if event_type == 'trial_complete':
+                job.progress['trials_done'] = job.progress.get('trials_done', 0) + 1
+            send_event(event_type, {'job_id': job.job_id, **data})
+        
+        job.progress['trials'] = len(trials)
+        summary = job.engine.run(graph_data, config, trials, on_event=on_event)
+        
+        # The best trial becomes the exportable model
+        best = summary['best']
+        if best is not None:
+            global trained_model
+            trained_model = {
+                'model': job.engine.best_model(graph_data),
+                'graph_data': graph_data,
+                'config': {**config, **best['params']}
+            }
+        
+        send_event('sweep_complete', {
+            'job_id': job.job_id,
+            'stopped': job.engine.stop_requested,
+            'metric': job.engine.metric,
+            **summary
+        })
+        
+    except Exception as e:
+        send_event('error', {
+            'job_id': job.job_id,
+            'message': f'Sweep failed: {str(e)}',
+            'traceback': traceback.format_exc()
+        })
+        raise
+
+
+def handle_stop(job_id=None):
+    """Request stop for a running training job (all jobs if no id is given)"""
+    stopped = job_manager.stop(job_id)
+    send_event('stop_requested', {'job_ids': stopped})
+
+
+def handle_status(job_id=None):
+    """Report state and progress of training jobs, and cache counters"""
+    send_event('status', {
+        'jobs': job_manager.status(job_id),
+        'cache': {
+            'graphs': graph_cache.cache_info(),
+            'datasets': dataset_cache.cache_info()
+        }
+    })
+
+
+def handle_export(export_path, formats=None, max_shard_mb=1024):
+    """Export trained model and code (weights in each of formats)"""
     try:
         if 'trained_model' not in globals():
             send_event('error', {'message': 'No trained model to export'})
@@ -129,11 +313,17 @@ def handle_export(export_path):
             model=trained_model['model'],
             graph_data=trained_model['graph_data'],
             config=trained_model['config'],
-            path=export_path
+            path=export_path,
+            formats=formats,
+            max_shard_mb=max_shard_mb
         )
         
+        stats = exporter.write_stats
         send_event('export_complete', {
-            'files': files
+            'files': files,
+            'formats': stats,
+            'bytes': sum(s['bytes'] for s in stats.values()),
+            'write_time': round(sum(s['write_time'] for s in stats.values()), 4)
         })
     except Exception as e:
         send_event('error', {
@@ -142,8 +332,26 @@ def handle_export(export_path):
         })
 
 
-def main():
+def main(argv=None):
     """Main loop - read commands from stdin"""
+    args = argparse.ArgumentParser(description='PyTorch GUI backend')
+    args.add_argument('--transport', choices=['json', 'binary'], default='json',
+                      help='Event encoding on stdout')
+    args.add_argument('--flush-interval', type=float, default=50,
+                      help='Window in ms for coalescing batch events')
+    options = args.parse_args(argv)
+    
+    global channel
+    if channel is not None:
+        channel.close()
+    channel = EventChannel(
+        encoding=options.transport,
+        flush_interval=options.flush_interval / 1000.0
+    )
+    if options.transport == 'binary':
+        # Stray prints from libraries must not corrupt binary frames
+        sys.stdout = sys.stderr
+    
     send_event('ready', {'message': 'Python backend ready'})
     
     for line in sys.stdin:
@@ -152,13 +360,30 @@ def main():
             cmd_type = command.get('command')
             
             if cmd_type == 'validate':
-                handle_validate(command.get('graph'))
+                handle_validate(command.get('graph'), command.get('cost'))
             elif cmd_type == 'get_system_info':
                 handle_get_system_info()
             elif cmd_type == 'train':
-                handle_train(command.get('graph'), command.get('config', {}))
+                handle_train(command.get('graph'), command.get('config', {}), command.get('resume'))
+            elif cmd_type == 'sweep':
+                handle_sweep(
+                    command.get('graph'),
+                    command.get('config', {}),
+                    command.get('space', {}),
+                    command.get('method', 'grid'),
+                    command.get('num_trials'),
+                    command.get('options')
+                )
+            elif cmd_type == 'stop':
+                handle_stop(command.get('job_id'))
+            elif cmd_type == 'status':
+                handle_status(command.get('job_id'))
             elif cmd_type == 'export':
-                handle_export(command.get('path', './exports'))
+                handle_export(
+                    command.get('path', './exports'),
+                    command.get('formats'),
+                    command.get('max_shard_mb', 1024)
+                )
             else:
                 send_event('error', {'message': f'Unknown command: {cmd_type}'})
                 
@@ -169,6 +394,10 @@ def main():
                 'message': f'Command failed: {str(e)}',
                 'traceback': traceback.format_exc()
             })
+    
+    # stdin closed - let running jobs finish before exiting
+    job_manager.wait()
+    channel.close()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,128 @@
+"""
+Memory Planner
+Estimates training memory for a built model and picks a micro-batch size
+"""
+
+import copy
+import math
+import torch
+import torch.nn as nn
+from typing import Dict, Any, Optional
+
+
+# Extra per-parameter tensors kept by each optimizer (Adam: exp_avg, exp_avg_sq)
+OPTIMIZER_STATE_TENSORS = {
+    'adam': 2,
+    'sgd': 0,
+}
+
+
+def static_bytes(model: nn.Module, optimizer_name: str = 'adam') -> int:
+    """Parameters + gradients + optimizer state, independent of batch size"""
+    param_bytes = sum(p.numel() * p.element_size() for p in model.parameters())
+    copies = 2 + OPTIMIZER_STATE_TENSORS.get(optimizer_name, 2)
+    return param_bytes * copies
+
+
+def _step_activation_bytes(model, criterion, data, target, autocast) -> int:
+    """Bytes of tensors saved for backward by one forward/loss pass"""
+    device = data.device
+    if device.type == 'cuda':
+        torch.cuda.synchronize(device)
+        torch.cuda.reset_peak_memory_stats(device)
+        base = torch.cuda.memory_allocated(device)
+        with autocast():
+            loss = criterion(model(data), target)
+        loss.backward()
+        torch.cuda.synchronize(device)
+        return torch.cuda.max_memory_allocated(device) - base
+
+    # No allocator statistics on CPU: count unique storages autograd saves
+    seen = set()
+    total = [0]
+
+    def pack(tensor):
+        key = (tensor.untyped_storage().data_ptr(), tensor.untyped_storage().nbytes())
+        if key not in seen:
+            seen.add(key)
+            total[0] += key[1]
+        return tensor
+
+    with torch.autograd.graph.saved_tensors_hooks(pack, lambda t: t):
+        with autocast():
+            loss = criterion(model(data), target)
+    loss.backward()
+    return total[0]
+
+
+def probe_bytes_per_sample(
+    model: nn.Module,
+    criterion,
+    sample_data: torch.Tensor,
+    sample_target: torch.Tensor,
+    autocast=None
+) -> float:
+    """
+    Measure activation memory per sample for a training step
+
+    Runs forward/backward on a throwaway copy of the model at two batch
+    sizes; the difference cancels batch-independent terms (weights saved
+    for backward, allocator slack) and leaves the per-sample slope.
+    """
+    autocast = autocast or (lambda: torch.autocast(sample_data.device.type, enabled=False))
+    probe_model = copy.deepcopy(model)
+    probe_model.train()
+
+    small = max(1, min(len(sample_data) // 2, 8))
+    large = 2 * small
+    if len(sample_data) < large:
+        reps = math.ceil(large / len(sample_data))
+        sample_data = sample_data.repeat(reps, *([1] * (sample_data.dim() - 1)))
+        sample_target = sample_target.repeat(reps)
+
+    small_bytes = _step_activation_bytes(
+        probe_model, criterion, sample_data[:small], sample_target[:small], autocast
+    )
+    large_bytes = _step_activation_bytes(
+        probe_model, criterion, sample_data[:large], sample_target[:large], autocast
+    )
+    slope = (large_bytes - small_bytes) / (large - small)
+    # Guard against allocator noise making the slope vanish
+    return slope if slope > 0 else large_bytes / large
+
+
+def plan_micro_batch(
+    batch_size: int,
+    accumulation_steps: int = 1,
+    max_memory_mb: Optional[float] = None,
+    fixed_bytes: int = 0,
+    bytes_per_sample: float = 0.0
+) -> Dict[str, Any]:
+    """
+    Split a global batch into micro-batches
+
+    The micro-batch is the largest size that keeps fixed_bytes plus
+    activations under max_memory_mb, and never larger than what the
+    requested accumulation_steps implies.
+
+    Returns:
+        {'micro_batch_size', 'accumulation_steps', 'estimated_peak_mb'}
+    """
+    accumulation_steps = max(1, int(accumulation_steps))
+    micro = math.ceil(batch_size / accumulation_steps)
+
+    if max_memory_mb is not None and bytes_per_sample > 0:
+        budget = max_memory_mb * 1024 ** 2 - fixed_bytes
+        if budget < bytes_per_sample:
+            raise ValueError(
+                f'max_memory_mb={max_memory_mb} is below the model footprint '
+                f'({(fixed_bytes + bytes_per_sample) / 1024 ** 2:.1f} MB for one sample)'
+            )
+        micro = min(micro, int(budget // bytes_per_sample))
+
+    micro = max(1, min(micro, batch_size))
+    return {
+        'micro_batch_size': micro,
+        'accumulation_steps': math.ceil(batch_size / micro),
+        'estimated_peak_mb': round((fixed_bytes + micro * bytes_per_sample) / 1024 ** 2, 2)
+    }
@@ -3,10 +3,32 @@ Model Builder
 Dynamically builds PyTorch models from graph data structure
 """
 
+import copy
 import torch
 import torch.nn as nn
 from typing import Dict, List, Any
 from schema import NodeType
+from graph_parser import GraphParser
+from graph_module import GraphModule
+import graph_cache
+import layers
+
+
+def instantiate_template(template: GraphModule) -> GraphModule:
+    """
+    Materialize a meta-device template with freshly initialized weights
+
+    Layers are reset in construction order (children before their parent,
+    as MultiheadAttention resets its out_proj bias after the Linear's own
+    init), so under the same seed the result equals a fresh build.
+    """
+    model = copy.deepcopy(template).to_empty(device='cpu')
+    for layer in model.layers.values():
+        for module in reversed(list(layer.modules())):
+            reset = getattr(module, 'reset_parameters', None) or getattr(module, '_reset_parameters', None)
+            if reset is not None:
+                reset()
+    return model
 
 
 class ModelBuilder:
@@ -50,6 +72,10 @@ class ModelBuilder:
             
             # Utility
             NodeType.DROPOUT: lambda p: nn.Dropout(p.get('p', 0.5)),
+            NodeType.RESHAPE: lambda p: layers.Reshape(p['target_shape']),
+            NodeType.CONCATENATE: lambda p: layers.Concatenate(p.get('dim', 1)),
+            NodeType.ADD: lambda p: layers.Add(),
+            NodeType.MULTIPLY: lambda p: layers.Multiply(),
             NodeType.EMBEDDING: lambda p: nn.Embedding(p['num_embeddings'], p['embedding_dim']),
             
             # Attention
@@ -57,33 +83,75 @@ class ModelBuilder:
         }
     
     def build_model(self, graph_data: Dict[str, Any]) -> nn.Module:
-        """Build PyTorch model from graph data"""
+        """
+        Build PyTorch model from graph data
+        
+        Layers are wired along the graph edges and executed in topological
+        order, so branching graphs (Add, Concatenate, Multiply) are supported.
+        
+        The built structure is kept on the meta device in graph_cache; a
+        rebuild of the same graph copies it and re-initializes the weights.
+        Module names and layer order follow node ids and list order, so
+        those are part of the key alongside the canonical digest.
+        """
         nodes = graph_data.get('nodes', [])
         edges = graph_data.get('edges', [])
+        template_key = (
+            graph_cache.graph_key(graph_data).digest,
+            tuple(node['id'] for node in nodes),
+            tuple((edge['source'], edge['target']) for edge in edges)
+        )
+        template = graph_cache.lookup('module', template_key)
+        if template is not None:
+            return instantiate_template(template)
+        
+        model = self._build(graph_data)
+        graph_cache.store('module', template_key, copy.deepcopy(model).to('meta'))
+        return model
+    
+    def _build(self, graph_data: Dict[str, Any]) -> GraphModule:
+        """Validate the graph and construct its GraphModule"""
+        parser = GraphParser()
+        validation = parser.validate(graph_data, use_cache=True)
+        if not validation['valid']:
+            raise ValueError(f"Invalid graph: {validation['errors']}")
+        
+        execution_order = parser.get_execution_order()
+        
+        # Inputs of each node, in edge order (matters for Concatenate)
+        predecessors = {node_id: [] for node_id in parser.nodes}
+        successors = {node_id: [] for node_id in parser.nodes}
+        for edge in parser.edges:
+            predecessors[edge['target']].append(edge['source'])
+            successors[edge['source']].append(edge['target'])
         
         # Build layers
-        modules = []
-        node_map = {}
+        modules = {}
+        input_id = None
+        output_id = None
         
-        for node in nodes:
-            node_id = node['id']
+        for node_id in execution_order:
+            node = parser.nodes[node_id]
             node_type = NodeType(node['type'])
-            params = node.get('params', {})
+            params = node.get('data', {}).get('params', {})
             
-            # Skip input/output nodes
-            if node_type in [NodeType.INPUT, NodeType.OUTPUT]:
-                node_map[node_id] = None
+            # Input/output nodes carry no layer
+            if node_type == NodeType.INPUT:
+                input_id = node_id
+                continue
+            if node_type == NodeType.OUTPUT:
+                output_id = node_id
                 continue
             
-            # Build layer
             if node_type in self.layer_map:
-                layer = self.layer_map[node_type](params)
-                modules.append(layer)
-                node_map[node_id] = layer
+                modules[node_id] = self.layer_map[node_type](params)
         
-        # Create sequential model
-        model = nn.Sequential(*modules)
-        return model
+        # Without an Output node, the model returns the last sink node
+        if output_id is None:
+            sinks = [node_id for node_id in execution_order if not successors[node_id]]
+            output_id = sinks[-1]
+        
+        return GraphModule(modules, execution_order, predecessors, input_id, output_id)
     
     # Layer builders
     def _build_conv1d(self, params):
@@ -92,7 +160,8 @@ class ModelBuilder:
             params['out_channels'],
             params['kernel_size'],
             stride=params.get('stride', 1),
-            padding=params.get('padding', 0)
+            padding=params.get('padding', 0),
+            dilation=params.get('dilation', 1)
         )
     
     def _build_conv2d(self, params):
@@ -101,7 +170,8 @@ class ModelBuilder:
             params['out_channels'],
             params['kernel_size'],
             stride=params.get('stride', 1),
-            padding=params.get('padding', 0)
+            padding=params.get('padding', 0),
+            dilation=params.get('dilation', 1)
         )
     
     def _build_conv3d(self, params):
@@ -110,7 +180,8 @@ class ModelBuilder:
             params['out_channels'],
             params['kernel_size'],
             stride=params.get('stride', 1),
-            padding=params.get('padding', 0)
+            padding=params.get('padding', 0),
+            dilation=params.get('dilation', 1)
         )
     
     def _build_convtranspose2d(self, params):
@@ -119,21 +190,26 @@ class ModelBuilder:
             params['out_channels'],
             params['kernel_size'],
             stride=params.get('stride', 2),
-            padding=params.get('padding', 1)
+            padding=params.get('padding', 1),
+            output_padding=params.get('output_padding', 0),
+            dilation=params.get('dilation', 1)
         )
     
     def _build_maxpool2d(self, params):
         return nn.MaxPool2d(
             params['kernel_size'],
             stride=params.get('stride', 2),
-            padding=params.get('padding', 0)
+            padding=params.get('padding', 0),
+            dilation=params.get('dilation', 1),
+            ceil_mode=params.get('ceil_mode', False)
         )
     
     def _build_avgpool2d(self, params):
         return nn.AvgPool2d(
             params['kernel_size'],
             stride=params.get('stride', 2),
-            padding=params.get('padding', 0)
+            padding=params.get('padding', 0),
+            ceil_mode=params.get('ceil_mode', False)
         )
     
     def _build_adaptiveavgpool2d(self, params):
@@ -146,7 +222,7 @@ class ModelBuilder:
         return nn.Flatten()
     
     def _build_lstm(self, params):
-        return nn.LSTM(
+        return layers.LSTM(
             params['input_size'],
             params['hidden_size'],
             num_layers=params.get('num_layers', 1),
@@ -155,7 +231,7 @@ class ModelBuilder:
         )
     
     def _build_gru(self, params):
-        return nn.GRU(
+        return layers.GRU(
             params['input_size'],
             params['hidden_size'],
             num_layers=params.get('num_layers', 1),
@@ -164,7 +240,7 @@ class ModelBuilder:
         )
     
     def _build_rnn(self, params):
-        return nn.RNN(
+        return layers.RNN(
             params['input_size'],
             params['hidden_size'],
             num_layers=params.get('num_layers', 1),
@@ -184,7 +260,7 @@ class ModelBuilder:
         return nn.InstanceNorm1d(params['num_features'])
     
     def _build_multihead_attention(self, params):
-        return nn.MultiheadAttention(
+        return layers.SelfAttention(
             params['embed_dim'],
             params['num_heads'],
             batch_first=True
@@ -0,0 +1,222 @@
+"""
+Model Compiler
+Lowers graph-built models to torch.fx, folds BatchNorm and optionally scripts/compiles
+
+Only the inductor backend fuses Linear+activation into one kernel; fx and
+script keep them as separate ops.
+"""
+
+import operator
+import torch
+import torch.fx as fx
+import torch.nn as nn
+import torch.nn.functional as F
+from torch.nn.utils.fusion import fuse_conv_bn_eval, fuse_linear_bn_eval
+from typing import Dict, Any, List, Optional, Tuple
+from graph_module import GraphModule
+import layers
+
+
+COMPILE_MODES = ['fx', 'script', 'inductor']
+
+# Parameter-free modules replaced by direct function calls
+_FUNCTIONAL = {
+    nn.ReLU: lambda m: (F.relu, {}),
+    nn.GELU: lambda m: (F.gelu, {}),
+    nn.SiLU: lambda m: (F.silu, {}),
+    nn.Sigmoid: lambda m: (torch.sigmoid, {}),
+    nn.Tanh: lambda m: (torch.tanh, {}),
+    nn.LeakyReLU: lambda m: (F.leaky_relu, {'negative_slope': m.negative_slope}),
+    nn.ELU: lambda m: (F.elu, {'alpha': m.alpha}),
+    nn.Softmax: lambda m: (F.softmax, {'dim': m.dim}),
+}
+
+_CONV_BN = {
+    nn.Conv1d: nn.BatchNorm1d,
+    nn.Conv2d: nn.BatchNorm2d,
+    nn.Conv3d: nn.BatchNorm3d,
+}
+
+
+def compile_model(
+    model: GraphModule,
+    mode: str = 'fx',
+    fuse: bool = True,
+    example_input: Optional[torch.Tensor] = None
+) -> Tuple[nn.Module, Dict[str, Any]]:
+    """
+    Compile a GraphModule for faster forward passes
+
+    Args:
+        model: Model built by ModelBuilder
+        mode: 'fx', 'script' (TorchScript) or 'inductor' (torch.compile)
+        fuse: Fold BatchNorm into the preceding Conv/Linear (eval mode only)
+        example_input: Optional batch used to trigger compilation eagerly -
+            the eval forward, and the training forward/backward when model
+            is training - so a failing backend falls back to fx up front
+
+    Returns:
+        (compiled_module, info) - the compiled module shares parameters with
+        model; info describes mode, fusions and any fallback
+    """
+    if mode not in COMPILE_MODES:
+        raise ValueError(f'Unknown compile mode: {mode} (expected one of {COMPILE_MODES})')
+
+    info = {'mode': mode, 'fused': [], 'fallback': None}
+    gm = to_fx(model)
+
+    if fuse and not model.training:
+        info['fused'].extend(_fold_batchnorm(gm))
+        gm.graph.lint()
+        gm.recompile()
+
+    compiled = gm
+    try:
+        if mode == 'script':
+            compiled = torch.jit.script(gm)
+        elif mode == 'inductor':
+            compiled = torch.compile(gm)
+
+        if example_input is not None and compiled is not gm:
+            _warm_up(compiled, example_input)
+    except Exception as e:
+        compiled = gm
+        info['fallback'] = f'{mode} failed, using fx: {str(e).splitlines()[0] if str(e) else type(e).__name__}'
+
+    return compiled, info
+
+
+def compile_for_eval(model: GraphModule) -> Tuple[fx.GraphModule, List[str]]:
+    """
+    fx module evaluating model's current weights, BatchNorm folded in
+
+    Folding bakes the BatchNorm statistics into copies of the preceding
+    layers, so build it again after the weights change (TrainingEngine
+    does once per epoch). Puts model in eval mode.
+
+    Returns:
+        (eval_module, fused) - fused names the folded layer pairs
+    """
+    model.eval()
+    gm = to_fx(model)
+    fused = _fold_batchnorm(gm)
+    gm.graph.lint()
+    gm.recompile()
+    return gm, fused
+
+
+def _warm_up(module: nn.Module, example_input: torch.Tensor):
+    """Run the passes training will use, leaving parameters and buffers untouched"""
+    was_training = module.training
+    module.eval()
+    with torch.no_grad():
+        module(example_input)
+    module.train(was_training)
+    if not was_training:
+        return
+
+    # BatchNorm updates its running stats in training mode; put them back
+    buffers = {name: buf.clone() for name, buf in module.named_buffers()}
+    try:
+        module(example_input.clone()).float().sum().backward()
+    finally:
+        with torch.no_grad():
+            for name, buf in module.named_buffers():
+                buf.copy_(buffers[name])
+        for param in module.parameters():
+            param.grad = None
+
+
+def to_fx(model: GraphModule) -> fx.GraphModule:
+    """
+    Emit a torch.fx.GraphModule from the model's execution plan
+
+    Stateless nodes (activations, Flatten, Add, Multiply, Concatenate,
+    Reshape) become direct function calls; parameterised layers stay
+    module calls and keep sharing their parameters with model.
+    """
+    graph = fx.Graph()
+    owners = {}
+    buffer = [None] * model.num_slots
+    buffer[0] = graph.placeholder('x')
+
+    for step in model.steps:
+        module = model.layers[step.module_name]
+        args = [buffer[s] for s in step.input_slots]
+        target = f'layers.{step.module_name}'
+        owners[target] = module
+        buffer[step.output_slot] = _emit(graph, module, target, args)
+
+    graph.output(buffer[model.output_slot])
+    return fx.GraphModule(owners, graph, class_name='CompiledModel')
+
+
+def _emit(graph: fx.Graph, module: nn.Module, target: str, args):
+    """Emit the fx node(s) for one layer"""
+    if isinstance(module, layers.Add):
+        return _reduce(graph, operator.add, args)
+    if isinstance(module, layers.Multiply):
+        return _reduce(graph, operator.mul, args)
+    if isinstance(module, layers.Concatenate):
+        return graph.call_function(torch.cat, (tuple(args),), {'dim': module.dim})
+    if isinstance(module, layers.Reshape):
+        flat = graph.call_function(torch.flatten, (args[0], 1))
+        return graph.call_function(torch.unflatten, (flat, 1, list(module.target_shape)))
+    if isinstance(module, nn.Flatten):
+        return graph.call_function(torch.flatten, (args[0], module.start_dim, module.end_dim))
+    if type(module) in _FUNCTIONAL:
+        fn, kwargs = _FUNCTIONAL[type(module)](module)
+        return graph.call_function(fn, (args[0],), kwargs)
+    return graph.call_module(target, tuple(args))
+
+
+def _reduce(graph: fx.Graph, op, args):
+    out = args[0]
+    for arg in args[1:]:
+        out = graph.call_function(op, (out, arg))
+    return out
+
+
+def _single_user_module(gm: fx.GraphModule, node: fx.Node, types) -> Optional[nn.Module]:
+    """Return node's module if node is a call_module of types with one user"""
+    if node.op != 'call_module' or len(node.users) != 1:
+        return None
+    module = gm.get_submodule(node.target)
+    return module if type(module) in types else None
+
+
+def _fold_batchnorm(gm: fx.GraphModule):
+    """Fold eval-mode BatchNorm into the preceding Conv/Linear"""
+    fused = []
+    for node in list(gm.graph.nodes):
+        if node.op != 'call_module':
+            continue
+        bn = gm.get_submodule(node.target)
+        if not isinstance(bn, nn.modules.batchnorm._BatchNorm) or bn.training:
+            continue
+        if bn.running_mean is None:
+            continue
+
+        prev = node.args[0]
+        producer = _single_user_module(gm, prev, (nn.Linear, *_CONV_BN))
+        if producer is None or producer.training:
+            continue
+
+        if isinstance(producer, nn.Linear):
+            if producer.out_features != bn.num_features or type(bn) is not nn.BatchNorm1d:
+                continue
+            folded = fuse_linear_bn_eval(producer, bn)
+        else:
+            if producer.out_channels != bn.num_features or type(bn) is not _CONV_BN[type(producer)]:
+                continue
+            folded = fuse_conv_bn_eval(producer, bn)
+
+        name = 'fused_' + prev.target.split('.')[-1]
+        gm.add_submodule(name, folded)
+        prev.target = name
+        node.replace_all_uses_with(prev)
+        gm.graph.erase_node(node)
+        fused.append(f'{prev.name}+{node.name}')
+
+    gm.delete_all_unused_submodules()
+    return fused
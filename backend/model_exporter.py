@@ -1,28 +1,183 @@
 """
 Model Exporter
 Exports trained model code and weights
+
+Weights can be written as model.pt (torch.save), as a safetensors file,
+or as safetensors shards with a JSON index for large models. safetensors
+files are a JSON header followed by raw tensor bytes, so load_weights
+maps them into memory instead of unpickling and copying them.
 """
 
 import torch
 import json
 import os
-from typing import Dict, Any
+import struct
+import time
+from typing import Dict, List, Any, Optional
+
+
+WEIGHT_FORMATS = ['pt', 'safetensors', 'sharded']
+
+SHARD_INDEX_NAME = 'model.safetensors.index.json'
+
+# torch dtype <-> safetensors dtype tag
+_DTYPES = {
+    torch.float64: 'F64', torch.float32: 'F32', torch.float16: 'F16', torch.bfloat16: 'BF16',
+    torch.int64: 'I64', torch.int32: 'I32', torch.int16: 'I16', torch.int8: 'I8',
+    torch.uint8: 'U8', torch.bool: 'BOOL',
+}
+_TORCH_DTYPES = {tag: dtype for dtype, tag in _DTYPES.items()}
+
+
+def save_safetensors(tensors: Dict[str, torch.Tensor], path: str,
+                     metadata: Optional[Dict[str, str]] = None) -> int:
+    """
+    Write tensors in the safetensors layout
+
+    Larger element types come first, so every tensor starts at an offset
+    aligned to its element size and can be viewed in place when mapped.
+
+    Returns:
+        Bytes written
+    """
+    names = sorted(tensors, key=lambda name: (-tensors[name].element_size(), name))
+    header = {'__metadata__': metadata or {'format': 'pt'}}
+    offset = 0
+    for name in names:
+        tensor = tensors[name]
+        if tensor.dtype not in _DTYPES:
+            raise ValueError(f'{name}: dtype {tensor.dtype} cannot be stored in safetensors')
+        size = tensor.numel() * tensor.element_size()
+        header[name] = {'dtype': _DTYPES[tensor.dtype], 'shape': list(tensor.shape),
+                        'data_offsets': [offset, offset + size]}
+        offset += size
+
+    encoded = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    encoded += b' ' * (-len(encoded) % 8)  # data section starts 8-byte aligned
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<Q', len(encoded)))
+        f.write(encoded)
+        for name in names:
+            raw = tensors[name].detach().cpu().contiguous().reshape(-1).view(torch.uint8)
+            f.write(raw.numpy().data)
+    return 8 + len(encoded) + offset
+
+
+def load_safetensors(path: str) -> Dict[str, torch.Tensor]:
+    """
+    Tensors of a safetensors file, backed by a private memory map
+
+    Nothing is read until a tensor is used; writes to the returned
+    tensors never reach the file.
+    """
+    with open(path, 'rb') as f:
+        header_size = struct.unpack('<Q', f.read(8))[0]
+        header = json.loads(f.read(header_size))
+    start = 8 + header_size
+
+    data = torch.from_file(path, shared=False, size=os.path.getsize(path), dtype=torch.uint8)
+    tensors = {}
+    for name, info in header.items():
+        if name == '__metadata__':
+            continue
+        dtype = _TORCH_DTYPES[info['dtype']]
+        begin, end = (start + offset for offset in info['data_offsets'])
+        raw = data[begin:end]
+        if begin % torch.empty((), dtype=dtype).element_size():
+            raw = raw.clone()  # unaligned (files from other writers): copy
+        tensors[name] = raw.view(dtype).reshape(info['shape'])
+    return tensors
+
+
+def save_sharded(tensors: Dict[str, torch.Tensor], path: str, max_shard_bytes: int) -> List[str]:
+    """
+    Write tensors as safetensors shards of at most max_shard_bytes
+    (a larger tensor gets a shard of its own) plus a JSON index
+
+    Returns:
+        Paths written, index last
+    """
+    shards = [[]]
+    shard_bytes = 0
+    for name, tensor in tensors.items():
+        size = tensor.numel() * tensor.element_size()
+        if shards[-1] and shard_bytes + size > max_shard_bytes:
+            shards.append([])
+            shard_bytes = 0
+        shards[-1].append(name)
+        shard_bytes += size
+
+    paths = []
+    weight_map = {}
+    total_size = 0
+    for i, names in enumerate(shards, 1):
+        file_name = f'model-{i:05d}-of-{len(shards):05d}.safetensors'
+        save_safetensors({name: tensors[name] for name in names}, os.path.join(path, file_name))
+        paths.append(os.path.join(path, file_name))
+        for name in names:
+            weight_map[name] = file_name
+            total_size += tensors[name].numel() * tensors[name].element_size()
+
+    index_path = os.path.join(path, SHARD_INDEX_NAME)
+    with open(index_path, 'w') as f:
+        json.dump({'metadata': {'total_size': total_size}, 'weight_map': weight_map}, f, indent=2)
+    return paths + [index_path]
+
+
+def load_weights(path: str) -> Dict[str, torch.Tensor]:
+    """
+    State dict from an export, memory-mapped where the format allows
+
+    path is a .safetensors file, a shard index, a .pt file, or an export
+    directory (shard index first, then model.safetensors, then model.pt).
+    """
+    if os.path.isdir(path):
+        for name in (SHARD_INDEX_NAME, 'model.safetensors', 'model.pt'):
+            if os.path.exists(os.path.join(path, name)):
+                return load_weights(os.path.join(path, name))
+        raise FileNotFoundError(f'No exported weights in {path}')
+
+    if path.endswith('.index.json'):
+        with open(path) as f:
+            weight_map = json.load(f)['weight_map']
+        directory = os.path.dirname(path)
+        shards = {file_name: load_safetensors(os.path.join(directory, file_name))
+                  for file_name in dict.fromkeys(weight_map.values())}
+        return {name: shards[file_name][name] for name, file_name in weight_map.items()}
+    if path.endswith('.safetensors'):
+        return load_safetensors(path)
+    return torch.load(path, map_location='cpu', mmap=True, weights_only=True)
 
 
 class ModelExporter:
+    def __init__(self):
+        # format -> {'files', 'bytes', 'write_time'} for the last export
+        self.write_stats = {}
+        
     def export(
         self,
         model,
         graph_data: Dict[str, Any],
         config: Dict[str, Any],
-        path: str = './exports'
+        path: str = './exports',
+        formats: Optional[List[str]] = None,
+        max_shard_mb: float = 1024
     ) -> Dict[str, str]:
         """
         Export model, graph data and config
         
+        Args:
+            formats: Weight formats from WEIGHT_FORMATS (default ['pt'])
+            max_shard_mb: Shard size limit for the 'sharded' format
+        
         Returns:
             Dictionary with exported file paths
         """
+        formats = formats or ['pt']
+        unknown = [fmt for fmt in formats if fmt not in WEIGHT_FORMATS]
+        if unknown:
+            raise ValueError(f'Unknown weight formats: {unknown}')
+        
         # Create export directory
         os.makedirs(path, exist_ok=True)
         
@@ -31,9 +186,28 @@ class ModelExporter:
         with open(graph_path, 'w') as f:
             json.dump(graph_data, f, indent=2)
         
-        # Export weights
-        weights_path = os.path.join(path, 'model.pt')
-        torch.save(model.state_dict(), weights_path)
+        # Export weights in each requested format
+        files = {'graph': graph_path}
+        self.write_stats = {}
+        state = model.state_dict()
+        for fmt in formats:
+            start = time.perf_counter()
+            if fmt == 'pt':
+                written = [os.path.join(path, 'model.pt')]
+                torch.save(state, written[0])
+                files['weights'] = written[0]
+            elif fmt == 'safetensors':
+                written = [os.path.join(path, 'model.safetensors')]
+                save_safetensors(state, written[0])
+                files['safetensors'] = written[0]
+            else:
+                written = save_sharded(state, path, int(max_shard_mb * 1024 * 1024))
+                files['shard_index'] = written[-1]
+            self.write_stats[fmt] = {
+                'files': written,
+                'bytes': sum(os.path.getsize(p) for p in written),
+                'write_time': round(time.perf_counter() - start, 4)
+            }
         
         # Export config
         config_path = os.path.join(path, 'config.json')
@@ -51,10 +225,7 @@ class ModelExporter:
             f.write(f"Batch Size: {config.get('batch_size', 64)}\n")
             f.write(f"Total Nodes: {len(graph_data.get('nodes', []))}\n")
             f.write(f"Total Connections: {len(graph_data.get('edges', []))}\n")
+            f.write(f"Weight Formats: {', '.join(formats)}\n")
         
-        return {
-            'graph': graph_path,
-            'weights': weights_path,
-            'config': config_path,
-            'metadata': metadata_path
-        }
+        files.update(config=config_path, metadata=metadata_path)
+        return files
@@ -75,44 +75,45 @@ NODE_SCHEMAS = {
     
     # Convolutional
     NodeType.CONV1D: {
-        'params': ['in_channels', 'out_channels', 'kernel_size', 'stride', 'padding'],
+        'params': ['in_channels', 'out_channels', 'kernel_size', 'stride', 'padding', 'dilation'],
         'required': ['in_channels', 'out_channels', 'kernel_size'],
-        'defaults': {'stride': 1, 'padding': 0},
+        'defaults': {'stride': 1, 'padding': 0, 'dilation': 1},
         'inputs': 1,
         'outputs': 1
     },
     NodeType.CONV2D: {
-        'params': ['in_channels', 'out_channels', 'kernel_size', 'stride', 'padding'],
+        'params': ['in_channels', 'out_channels', 'kernel_size', 'stride', 'padding', 'dilation'],
         'required': ['in_channels', 'out_channels', 'kernel_size'],
-        'defaults': {'stride': 1, 'padding': 0},
+        'defaults': {'stride': 1, 'padding': 0, 'dilation': 1},
         'inputs': 1,
         'outputs': 1
     },
     NodeType.CONV3D: {
-        'params': ['in_channels', 'out_channels', 'kernel_size', 'stride', 'padding'],
+        'params': ['in_channels', 'out_channels', 'kernel_size', 'stride', 'padding', 'dilation'],
         'required': ['in_channels', 'out_channels', 'kernel_size'],
-        'defaults': {'stride': 1, 'padding': 0},
+        'defaults': {'stride': 1, 'padding': 0, 'dilation': 1},
         'inputs': 1,
         'outputs': 1
     },
     NodeType.CONVTRANSPOSE2D: {
-        'params': ['in_channels', 'out_channels', 'kernel_size', 'stride', 'padding'],
+        'params': ['in_channels', 'out_channels', 'kernel_size', 'stride', 'padding',
+                   'output_padding', 'dilation'],
         'required': ['in_channels', 'out_channels', 'kernel_size'],
-        'defaults': {'stride': 2, 'padding': 1},
+        'defaults': {'stride': 2, 'padding': 1, 'output_padding': 0, 'dilation': 1},
         'inputs': 1,
         'outputs': 1
     },
     NodeType.MAXPOOL2D: {
-        'params': ['kernel_size', 'stride', 'padding'],
+        'params': ['kernel_size', 'stride', 'padding', 'dilation', 'ceil_mode'],
         'required': ['kernel_size'],
-        'defaults': {'stride': 2, 'padding': 0},
+        'defaults': {'stride': 2, 'padding': 0, 'dilation': 1, 'ceil_mode': False},
         'inputs': 1,
         'outputs': 1
     },
     NodeType.AVGPOOL2D: {
-        'params': ['kernel_size', 'stride', 'padding'],
+        'params': ['kernel_size', 'stride', 'padding', 'ceil_mode'],
         'required': ['kernel_size'],
-        'defaults': {'stride': 2, 'padding': 0},
+        'defaults': {'stride': 2, 'padding': 0, 'ceil_mode': False},
         'inputs': 1,
         'outputs': 1
     },
@@ -278,48 +279,398 @@ NODE_SCHEMAS = {
 }
 
 
-def infer_output_shape(node_type: NodeType, input_shape: List[int], params: Dict[str, Any]) -> List[int]:
+def _ntuple(value, n: int, name: str) -> List[int]:
+    """Expand an int parameter (or a list of n ints) to n values"""
+    if isinstance(value, (list, tuple)):
+        if len(value) != n:
+            raise ValueError(f'{name} needs {n} values, got {list(value)}')
+        return list(value)
+    return [value] * n
+
+
+def _expect_rank(shape: List[int], ranks, layer: str):
+    if len(shape) not in ranks:
+        expected = ' or '.join(f'{r}-D' for r in ranks)
+        raise ValueError(f'{layer} expects a {expected} input [batch, ...], got {shape}')
+
+
+def _expect_dim(shape: List[int], axis: int, value: int, name: str):
+    if shape[axis] != value:
+        raise ValueError(f'{name}={value} does not match input dimension {shape[axis]} of {shape}')
+
+
+def _window_output(size: int, kernel: int, stride: int, padding: int, dilation: int = 1,
+                   ceil_mode: bool = False) -> int:
+    """Output length of a sliding window (convolution/pooling) along one axis"""
+    span = size + 2 * padding - dilation * (kernel - 1) - 1
+    if span < 0:
+        raise ValueError(
+            f'kernel {kernel} (dilation {dilation}) does not fit input size {size} with padding {padding}'
+        )
+    if not ceil_mode:
+        return span // stride + 1
+    out = -(-span // stride) + 1
+    # The last window has to start inside the input or the left padding
+    if (out - 1) * stride >= size + padding:
+        out -= 1
+    return out
+
+
+def _same_shape(input_shapes: List[List[int]], params: Dict[str, Any]) -> List[int]:
+    # Shapes are never mutated, so pass-through layers share the list
+    return input_shapes[0]
+
+
+def _input_shape(input_shapes: List[List[int]], params: Dict[str, Any]) -> List[int]:
+    return params['shape']
+
+
+def _output_shape(input_shapes: List[List[int]], params: Dict[str, Any]) -> List[int]:
+    shape = input_shapes[0]
+    if 'numClasses' in params and params.get('outputType', 'classification') == 'classification':
+        _expect_dim(shape, -1, params['numClasses'], 'numClasses')
+    return list(shape)
+
+
+def _conv_shape(spatial_dims: int):
+    """Conv{1,2,3}d on [batch, channels, *spatial]"""
+    layer = f'Conv{spatial_dims}d'
+    
+    def rule(input_shapes: List[List[int]], params: Dict[str, Any]) -> List[int]:
+        shape = input_shapes[0]
+        _expect_rank(shape, (spatial_dims + 2,), layer)
+        _expect_dim(shape, 1, params['in_channels'], 'in_channels')
+        
+        kernel = _ntuple(params['kernel_size'], spatial_dims, 'kernel_size')
+        stride = _ntuple(params.get('stride', 1), spatial_dims, 'stride')
+        dilation = _ntuple(params.get('dilation', 1), spatial_dims, 'dilation')
+        padding = params.get('padding', 0)
+        
+        if padding == 'same':
+            if any(s != 1 for s in stride):
+                raise ValueError(f"{layer} padding='same' requires stride 1")
+            spatial = list(shape[2:])
+        else:
+            padding = [0] * spatial_dims if padding == 'valid' else _ntuple(padding, spatial_dims, 'padding')
+            spatial = [
+                _window_output(size, k, st, pad, d)
+                for size, k, st, pad, d in zip(shape[2:], kernel, stride, padding, dilation)
+            ]
+        
+        return [shape[0], params['out_channels'], *spatial]
+    
+    return rule
+
+
+def _convtranspose2d_shape(input_shapes: List[List[int]], params: Dict[str, Any]) -> List[int]:
+    # [batch, in_channels, H, W] -> [batch, out_channels, H', W']
+    shape = input_shapes[0]
+    _expect_rank(shape, (4,), 'ConvTranspose2d')
+    _expect_dim(shape, 1, params['in_channels'], 'in_channels')
+    
+    kernel = _ntuple(params['kernel_size'], 2, 'kernel_size')
+    stride = _ntuple(params.get('stride', 2), 2, 'stride')
+    padding = _ntuple(params.get('padding', 1), 2, 'padding')
+    dilation = _ntuple(params.get('dilation', 1), 2, 'dilation')
+    output_padding = _ntuple(params.get('output_padding', 0), 2, 'output_padding')
+    
+    spatial = []
+    for size, k, st, pad, d, extra in zip(shape[2:], kernel, stride, padding, dilation, output_padding):
+        if extra >= st and extra >= d:
+            raise ValueError('output_padding must be smaller than stride or dilation')
+        out = (size - 1) * st - 2 * pad + d * (k - 1) + extra + 1
+        if out <= 0:
+            raise ValueError(f'ConvTranspose2d output size {out} is not positive')
+        spatial.append(out)
+    
+    return [shape[0], params['out_channels'], *spatial]
+
+
+def _pool2d_shape(layer: str):
+    """MaxPool2d/AvgPool2d over the last two dimensions"""
+    def rule(input_shapes: List[List[int]], params: Dict[str, Any]) -> List[int]:
+        shape = input_shapes[0]
+        _expect_rank(shape, (3, 4), layer)
+        
+        kernel = _ntuple(params['kernel_size'], 2, 'kernel_size')
+        stride = _ntuple(params.get('stride', 2), 2, 'stride')
+        padding = _ntuple(params.get('padding', 0), 2, 'padding')
+        dilation = _ntuple(params.get('dilation', 1), 2, 'dilation') if layer == 'MaxPool2d' else [1, 1]
+        ceil_mode = params.get('ceil_mode', False)
+        
+        spatial = []
+        for size, k, st, pad, d in zip(shape[-2:], kernel, stride, padding, dilation):
+            if pad > (d * (k - 1) + 1) // 2:
+                raise ValueError(f'{layer} padding {pad} exceeds half the kernel size {k}')
+            spatial.append(_window_output(size, k, st, pad, d, ceil_mode))
+        
+        return [*shape[:-2], *spatial]
+    
+    return rule
+
+
+def _adaptiveavgpool2d_shape(input_shapes: List[List[int]], params: Dict[str, Any]) -> List[int]:
+    shape = input_shapes[0]
+    _expect_rank(shape, (3, 4), 'AdaptiveAvgPool2d')
+    output_size = _ntuple(params.get('output_size', 1), 2, 'output_size')
+    # None keeps that input dimension
+    spatial = [size if out is None else out for size, out in zip(shape[-2:], output_size)]
+    return [*shape[:-2], *spatial]
+
+
+def _linear_shape(input_shapes: List[List[int]], params: Dict[str, Any]) -> List[int]:
+    # [batch, ..., in_features] -> [batch, ..., out_features]
+    shape = input_shapes[0]
+    _expect_dim(shape, -1, params['in_features'], 'in_features')
+    return [*shape[:-1], params['out_features']]
+
+
+def _flatten_shape(input_shapes: List[List[int]], params: Dict[str, Any]) -> List[int]:
+    # [batch, ...] -> [batch, product of rest]
+    shape = input_shapes[0]
+    batch = shape[0]
+    flat_size = 1
+    for dim in shape[1:]:
+        flat_size *= dim
+    return [batch, flat_size]
+
+
+def _recurrent_shape(layer: str):
+    """LSTM/GRU/RNN, batch_first: [batch, seq, input_size] -> [batch, seq, hidden]"""
+    def rule(input_shapes: List[List[int]], params: Dict[str, Any]) -> List[int]:
+        shape = input_shapes[0]
+        _expect_rank(shape, (3,), layer)
+        _expect_dim(shape, -1, params['input_size'], 'input_size')
+        directions = 2 if params.get('bidirectional', False) else 1
+        return [shape[0], shape[1], params['hidden_size'] * directions]
+    
+    return rule
+
+
+def _batchnorm_shape(input_shapes: List[List[int]], params: Dict[str, Any]) -> List[int]:
+    # Built as BatchNorm1d: [batch, features] or [batch, features, length]
+    shape = input_shapes[0]
+    _expect_rank(shape, (2, 3), 'BatchNorm1d')
+    _expect_dim(shape, 1, params['num_features'], 'num_features')
+    return list(shape)
+
+
+def _layernorm_shape(input_shapes: List[List[int]], params: Dict[str, Any]) -> List[int]:
+    shape = input_shapes[0]
+    normalized = params['normalized_shape']
+    normalized = list(normalized) if isinstance(normalized, (list, tuple)) else [normalized]
+    if len(normalized) > len(shape) or list(shape[-len(normalized):]) != normalized:
+        raise ValueError(f'normalized_shape={normalized} does not match the trailing dimensions of {shape}')
+    return list(shape)
+
+
+def _groupnorm_shape(input_shapes: List[List[int]], params: Dict[str, Any]) -> List[int]:
+    shape = input_shapes[0]
+    if len(shape) < 2:
+        raise ValueError(f'GroupNorm expects [batch, channels, ...], got {shape}')
+    _expect_dim(shape, 1, params['num_channels'], 'num_channels')
+    if params['num_channels'] % params['num_groups'] != 0:
+        raise ValueError(f"num_channels={params['num_channels']} is not divisible by num_groups={params['num_groups']}")
+    return list(shape)
+
+
+def _instancenorm_shape(input_shapes: List[List[int]], params: Dict[str, Any]) -> List[int]:
+    # Built as InstanceNorm1d: [batch, features, length]
+    shape = input_shapes[0]
+    _expect_rank(shape, (3,), 'InstanceNorm1d')
+    _expect_dim(shape, 1, params['num_features'], 'num_features')
+    return list(shape)
+
+
+def _softmax_shape(input_shapes: List[List[int]], params: Dict[str, Any]) -> List[int]:
+    shape = input_shapes[0]
+    dim = params.get('dim', 1)
+    if not -len(shape) <= dim < len(shape):
+        raise ValueError(f'Softmax dim={dim} is out of range for {shape}')
+    return list(shape)
+
+
+def _reshape_shape(input_shapes: List[List[int]], params: Dict[str, Any]) -> List[int]:
+    # target_shape excludes the batch dimension; one entry may be -1
+    shape = input_shapes[0]
+    target = list(params['target_shape'])
+    size = 1
+    for dim in shape[1:]:
+        size *= dim
+    
+    known = 1
+    for dim in target:
+        if dim != -1:
+            known *= dim
+    unknown = target.count(-1)
+    
+    if unknown > 1:
+        raise ValueError('target_shape can contain at most one -1')
+    if unknown == 1:
+        if known == 0 or size % known != 0:
+            raise ValueError(f'Cannot reshape {shape[1:]} ({size} values) to {target}')
+        target[target.index(-1)] = size // known
+    elif known != size:
+        raise ValueError(f'Cannot reshape {shape[1:]} ({size} values) to {target}')
+    
+    return [shape[0], *target]
+
+
+def _concatenate_shape(input_shapes: List[List[int]], params: Dict[str, Any]) -> List[int]:
+    first = input_shapes[0]
+    rank = len(first)
+    dim = params.get('dim', 1)
+    if not -rank <= dim < rank:
+        raise ValueError(f'Concatenate dim={dim} is out of range for {first}')
+    dim %= rank
+    
+    total = 0
+    for shape in input_shapes:
+        if len(shape) != rank or any(a != b for i, (a, b) in enumerate(zip(shape, first)) if i != dim):
+            raise ValueError(
+                f'Cannot concatenate {list(map(list, input_shapes))} along dim {dim}'
+            )
+        total += shape[dim]
+    
+    return [*first[:dim], total, *first[dim + 1:]]
+
+
+def _broadcast_shape(input_shapes: List[List[int]], params: Dict[str, Any]) -> List[int]:
+    # Element-wise Add/Multiply follow PyTorch broadcasting
+    rank = max(len(shape) for shape in input_shapes)
+    result = [1] * rank
+    for shape in input_shapes:
+        for i, dim in enumerate(shape, start=rank - len(shape)):
+            if dim != result[i] and 1 not in (dim, result[i]):
+                raise ValueError(f'Cannot broadcast {list(map(list, input_shapes))}')
+            result[i] = max(result[i], dim) if 1 in (dim, result[i]) else dim
+    return result
+
+
+def _embedding_shape(input_shapes: List[List[int]], params: Dict[str, Any]) -> List[int]:
+    # Integer indices [batch, ...] -> [batch, ..., embedding_dim]
+    return [*input_shapes[0], params['embedding_dim']]
+
+
+def _attention_shape(input_shapes: List[List[int]], params: Dict[str, Any]) -> List[int]:
+    # Self-attention, batch_first: [batch, seq, embed_dim] -> same
+    shape = input_shapes[0]
+    _expect_rank(shape, (3,), 'MultiheadAttention')
+    _expect_dim(shape, -1, params['embed_dim'], 'embed_dim')
+    if params['embed_dim'] % params['num_heads'] != 0:
+        raise ValueError(f"embed_dim={params['embed_dim']} is not divisible by num_heads={params['num_heads']}")
+    return list(shape)
+
+
+# Shape rule per node type, looked up by dict rather than an if-chain of
+# enum comparisons (member access is slow on large graphs). Every rule
+# takes the shapes of all inputs, in edge order, each including the batch
+# dimension, and raises ValueError on a mismatch.
+SHAPE_RULES = {
+    NodeType.INPUT: _input_shape,
+    NodeType.OUTPUT: _output_shape,
+    
+    NodeType.CONV1D: _conv_shape(1),
+    NodeType.CONV2D: _conv_shape(2),
+    NodeType.CONV3D: _conv_shape(3),
+    NodeType.CONVTRANSPOSE2D: _convtranspose2d_shape,
+    NodeType.MAXPOOL2D: _pool2d_shape('MaxPool2d'),
+    NodeType.AVGPOOL2D: _pool2d_shape('AvgPool2d'),
+    NodeType.ADAPTIVEAVGPOOL2D: _adaptiveavgpool2d_shape,
+    
+    NodeType.LINEAR: _linear_shape,
+    NodeType.FLATTEN: _flatten_shape,
+    
+    NodeType.LSTM: _recurrent_shape('LSTM'),
+    NodeType.GRU: _recurrent_shape('GRU'),
+    NodeType.RNN: _recurrent_shape('RNN'),
+    
+    NodeType.BATCHNORM: _batchnorm_shape,
+    NodeType.LAYERNORM: _layernorm_shape,
+    NodeType.GROUPNORM: _groupnorm_shape,
+    NodeType.INSTANCENORM: _instancenorm_shape,
+    
+    NodeType.RELU: _same_shape,
+    NodeType.LEAKYRELU: _same_shape,
+    NodeType.SIGMOID: _same_shape,
+    NodeType.TANH: _same_shape,
+    NodeType.GELU: _same_shape,
+    NodeType.ELU: _same_shape,
+    NodeType.SILU: _same_shape,
+    NodeType.SOFTMAX: _softmax_shape,
+    
+    NodeType.DROPOUT: _same_shape,
+    NodeType.RESHAPE: _reshape_shape,
+    NodeType.CONCATENATE: _concatenate_shape,
+    NodeType.ADD: _broadcast_shape,
+    NodeType.MULTIPLY: _broadcast_shape,
+    NodeType.EMBEDDING: _embedding_shape,
+    
+    NodeType.MULTIHEADATTENTION: _attention_shape,
+}
+
+
+def infer_output_shape(
+    node_type: NodeType,
+    input_shapes: List[List[int]],
+    params: Dict[str, Any]
+) -> List[int]:
     """
     Infer output shape based on node type and parameters
     
     Args:
         node_type: Type of the node
-        input_shape: Input tensor shape [batch, ...]
+        input_shapes: Shapes of the node's inputs in edge order, each
+            [batch, ...] (empty for the Input node)
         params: Node parameters
     
     Returns:
         Output tensor shape
-    """
-    if node_type == NodeType.INPUT:
-        return params['shape']
-    
-    elif node_type == NodeType.LINEAR:
-        # [batch, in_features] -> [batch, out_features]
-        return [input_shape[0], params['out_features']]
-    
-    elif node_type == NodeType.CONV2D:
-        # [batch, in_channels, H, W] -> [batch, out_channels, H', W']
-        batch, _, h, w = input_shape
-        kernel = params['kernel_size']
-        stride = params.get('stride', 1)
-        padding = params.get('padding', 0)
-        
-        h_out = (h + 2 * padding - kernel) // stride + 1
-        w_out = (w + 2 * padding - kernel) // stride + 1
-        
-        return [batch, params['out_channels'], h_out, w_out]
-    
-    elif node_type == NodeType.FLATTEN:
-        # [batch, ...] -> [batch, product of rest]
-        batch = input_shape[0]
-        flat_size = 1
-        for dim in input_shape[1:]:
-            flat_size *= dim
-        return [batch, flat_size]
     
-    # All other nodes preserve shape (simplified for now)
-    else:
-        return input_shape
+    Raises:
+        ValueError: If the inputs are incompatible with the layer
+    """
+    return SHAPE_RULES[node_type](input_shapes, params)
+
+
+def _check_linear(params: Dict[str, Any]) -> List[str]:
+    errors = []
+    if 'in_features' in params and params['in_features'] <= 0:
+        errors.append("in_features must be positive")
+    if 'out_features' in params and params['out_features'] <= 0:
+        errors.append("out_features must be positive")
+    return errors
+
+
+def _positive(value) -> bool:
+    """int > 0, or a list of them (per-dimension kernel/stride values)"""
+    values = value if isinstance(value, (list, tuple)) else [value]
+    return all(isinstance(v, (int, float)) and v > 0 for v in values)
+
+
+def _check_conv(params: Dict[str, Any]) -> List[str]:
+    errors = []
+    for name in ('in_channels', 'out_channels', 'kernel_size', 'stride', 'dilation'):
+        if name in params and not _positive(params[name]):
+            errors.append(f"{name} must be positive")
+    return errors
+
+
+def _check_dropout(params: Dict[str, Any]) -> List[str]:
+    if 'p' in params and not (0 <= params['p'] < 1):
+        return ["dropout probability must be in [0, 1)"]
+    return []
+
+
+# Value checks beyond the required-parameter check
+PARAM_CHECKS = {
+    NodeType.LINEAR: _check_linear,
+    NodeType.CONV1D: _check_conv,
+    NodeType.CONV2D: _check_conv,
+    NodeType.CONV3D: _check_conv,
+    NodeType.CONVTRANSPOSE2D: _check_conv,
+    NodeType.DROPOUT: _check_dropout,
+}
 
 
 def validate_node_params(node_type: NodeType, params: Dict[str, Any]) -> List[str]:
@@ -342,22 +693,8 @@ def validate_node_params(node_type: NodeType, params: Dict[str, Any]) -> List[st
             errors.append(f"Missing required parameter: {param}")
     
     # Validate parameter values
-    if node_type == NodeType.LINEAR:
-        if 'in_features' in params and params['in_features'] <= 0:
-            errors.append("in_features must be positive")
-        if 'out_features' in params and params['out_features'] <= 0:
-            errors.append("out_features must be positive")
-    
-    elif node_type == NodeType.CONV2D:
-        if 'in_channels' in params and params['in_channels'] <= 0:
-            errors.append("in_channels must be positive")
-        if 'out_channels' in params and params['out_channels'] <= 0:
-            errors.append("out_channels must be positive")
-        if 'kernel_size' in params and params['kernel_size'] <= 0:
-            errors.append("kernel_size must be positive")
-    
-    elif node_type == NodeType.DROPOUT:
-        if 'p' in params and not (0 <= params['p'] < 1):
-            errors.append("dropout probability must be in [0, 1)")
+    check = PARAM_CHECKS.get(node_type)
+    if check:
+        errors.extend(check(params))
     
     return errors
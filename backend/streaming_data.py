@@ -0,0 +1,427 @@
+"""
+Streaming Data
+Datasets larger than memory, read in chunks from .npy, CSV or image folders
+
+Sources yield fixed-size chunks; StreamingBatchLoader shuffles within a
+bounded window and collates batches on a prefetch thread. Memory held at
+any time is one chunk, the shuffle window and the prefetched batches,
+independent of dataset size.
+"""
+
+import csv
+import os
+import queue
+import threading
+import numpy as np
+import torch
+from typing import Dict, List, Any, Optional, Tuple, Iterator
+from synthetic_data import infer_data_spec
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.webp')
+
+# (first sample index, data chunk, targets chunk)
+Chunk = Tuple[int, np.ndarray, np.ndarray]
+
+
+class NpySource:
+    """Memory-mapped .npy data/targets pair, read in contiguous chunks"""
+
+    def __init__(self, data_path: str, targets_path: str, chunk_size: int = 4096):
+        self.data = np.load(data_path, mmap_mode='r')
+        self.targets = np.load(targets_path, mmap_mode='r')
+        if len(self.data) != len(self.targets):
+            raise ValueError(f'{data_path} has {len(self.data)} samples but '
+                             f'{targets_path} has {len(self.targets)}')
+        self.chunk_size = chunk_size
+        self.sample_shape = list(self.data.shape[1:])
+        self.name = data_path
+
+    def __len__(self):
+        return len(self.data)
+
+    def chunk_starts(self, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """First sample of each chunk in read order (random when rng is given)"""
+        starts = np.arange(0, len(self.data), self.chunk_size)
+        return rng.permutation(starts) if rng is not None else starts
+
+    def chunks(self, rng: Optional[np.random.Generator] = None, shard=(0, 1)) -> Iterator[Chunk]:
+        """Chunks in file order, or in random chunk order when rng is given"""
+        for start in self.chunk_starts(rng)[shard[0]::shard[1]]:
+            end = start + self.chunk_size
+            yield int(start), np.asarray(self.data[start:end]), np.asarray(self.targets[start:end])
+
+
+class CsvSource:
+    """
+    Numeric CSV read chunk_size rows at a time
+
+    Every column except target_column (index, or name with a header) is
+    a feature, so samples are flat until reshaped to the Input shape.
+    """
+
+    def __init__(self, path: str, target_column=-1, header: bool = True, chunk_size: int = 4096):
+        self.path = path
+        self.header = header
+        self.chunk_size = chunk_size
+        self.name = path
+        with open(path, newline='') as f:
+            first = next(csv.reader(f))
+        if isinstance(target_column, str):
+            if not header:
+                raise ValueError('target_column can only be a name when the CSV has a header')
+            target_column = first.index(target_column)
+        self.target_column = target_column % len(first)
+        self.sample_shape = [len(first) - 1]
+        self._length = None
+
+    def __len__(self):
+        # One buffered pass counting newlines, done once
+        if self._length is None:
+            count = 0
+            last = b'\n'
+            with open(self.path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    count += block.count(b'\n')
+                    last = block[-1:]
+            count += last != b'\n'  # final row without a newline
+            self._length = count - int(self.header)
+        return self._length
+
+    def chunk_starts(self, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """First row of each chunk; always file order, a CSV cannot seek"""
+        return np.arange(0, len(self), self.chunk_size)
+
+    def chunks(self, rng: Optional[np.random.Generator] = None, shard=(0, 1)) -> Iterator[Chunk]:
+        """Chunks in file order (the shuffle window does the mixing)"""
+        rank, world_size = shard
+        with open(self.path, newline='') as f:
+            reader = csv.reader(f)
+            if self.header:
+                next(reader, None)
+            start = 0
+            rows = []
+            for row in reader:
+                if row:
+                    rows.append(row)
+                if len(rows) == self.chunk_size:
+                    # Other shards' rows are skipped without parsing
+                    if (start // self.chunk_size) % world_size == rank:
+                        yield self._parse(start, rows)
+                    start += len(rows)
+                    rows = []
+            if rows and (start // self.chunk_size) % world_size == rank:
+                yield self._parse(start, rows)
+
+    def _parse(self, start: int, rows: List[List[str]]) -> Chunk:
+        values = np.array(rows, dtype=np.float32)
+        targets = values[:, self.target_column].astype(np.int64)
+        return start, np.delete(values, self.target_column, axis=1), targets
+
+
+class ImageFolderSource:
+    """
+    root/<class>/<image> tree decoded and resized to the Input shape
+
+    Classes are the sorted subdirectory names. Only the file list is kept
+    in memory; images are decoded chunk_size at a time.
+    """
+
+    def __init__(self, root: str, sample_shape: List[int], chunk_size: int = 256):
+        if len(sample_shape) != 3 or sample_shape[0] not in (1, 3):
+            raise ValueError(f'Image folders need a [channels (1 or 3), height, width] '
+                             f'Input shape, got {sample_shape}')
+        self.root = root
+        self.name = root
+        self.chunk_size = chunk_size
+        self.sample_shape = list(sample_shape)
+        self.classes = sorted(d for d in os.listdir(root) if os.path.isdir(os.path.join(root, d)))
+        self.files = [
+            (os.path.join(root, name, file), label)
+            for label, name in enumerate(self.classes)
+            for file in sorted(os.listdir(os.path.join(root, name)))
+            if file.lower().endswith(IMAGE_EXTENSIONS)
+        ]
+
+    def __len__(self):
+        return len(self.files)
+
+    def chunk_starts(self, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """First file of each chunk in read order (random when rng is given)"""
+        starts = np.arange(0, len(self.files), self.chunk_size)
+        return rng.permutation(starts) if rng is not None else starts
+
+    def chunks(self, rng: Optional[np.random.Generator] = None, shard=(0, 1)) -> Iterator[Chunk]:
+        """Chunks of consecutive files, in random chunk order when rng is given"""
+        for start in self.chunk_starts(rng)[shard[0]::shard[1]]:
+            files = self.files[start:start + self.chunk_size]
+            data = np.stack([self._decode(path) for path, _ in files])
+            targets = np.array([label for _, label in files], dtype=np.int64)
+            yield int(start), data, targets
+
+    def _decode(self, path: str) -> np.ndarray:
+        from PIL import Image
+        channels, height, width = self.sample_shape
+        with Image.open(path) as image:
+            image = image.convert('L' if channels == 1 else 'RGB').resize((width, height))
+            pixels = np.asarray(image, dtype=np.float32) / 255.0
+        return pixels[None] if channels == 1 else pixels.transpose(2, 0, 1)
+
+
+class StreamingBatchLoader:
+    """
+    Batches from a chunked source with windowed shuffle and prefetch
+
+    Chunks are read in random order (for seekable sources), gathered
+    into a window of shuffle_buffer samples, permuted and cut into
+    batches. With holdout=(k, test), sample i belongs to the split only
+    if (i % k == 0) == test, which gives a stable train/test split of a
+    single source. Batches are built on a background thread, at most
+    prefetch ahead of the consumer.
+    """
+
+    def __init__(
+        self,
+        source,
+        batch_size: int = 64,
+        sample_shape: Optional[List[int]] = None,
+        num_classes: Optional[int] = None,
+        shuffle: bool = False,
+        shuffle_buffer: int = 10000,
+        prefetch: int = 4,
+        seed: int = 0,
+        holdout: Optional[Tuple[int, bool]] = None,
+        drop_last: bool = False,
+        index_input: bool = False
+    ):
+        self.source = source
+        self.batch_size = batch_size
+        self.sample_shape = list(sample_shape or source.sample_shape)
+        self.num_classes = num_classes
+        self.shuffle = shuffle
+        self.shuffle_buffer = max(shuffle_buffer, batch_size)
+        self.prefetch = prefetch
+        self.seed = seed
+        self.holdout = holdout
+        self.drop_last = drop_last
+        self.dtype = np.int64 if index_input else np.float32
+        self.shard_index = 0
+        self.num_shards = 1
+        self._epoch = 0
+
+    def shard(self, rank: int, world_size: int):
+        """
+        Read only every world_size-th chunk, starting at chunk rank
+
+        All shards draw the same chunk order per epoch (same seed), so
+        the shards partition the data. Shard sizes may differ by a chunk,
+        and with shuffle a shard's size can change from epoch to epoch.
+        """
+        self.shard_index = rank
+        self.num_shards = world_size
+        return self
+
+    def set_epoch(self, epoch: int):
+        """Epoch whose shuffle the next iteration uses (0-based, for resume)"""
+        self._epoch = epoch
+
+    def num_samples(self) -> int:
+        """Samples the next iteration yields (this shard's chunks when sharded)"""
+        n = len(self.source)
+        # The chunk order is the epoch rng's first draw, as in __iter__
+        rng = np.random.default_rng((self.seed, self._epoch)) if self.shuffle else None
+        starts = self.source.chunk_starts(rng)[self.shard_index::self.num_shards]
+        total = 0
+        for start in starts.tolist():
+            end = min(start + self.source.chunk_size, n)
+            if self.holdout is None:
+                total += end - start
+                continue
+            k, test = self.holdout
+            held_out = (end + k - 1) // k - (start + k - 1) // k
+            total += held_out if test else end - start - held_out
+        return total
+
+    def __len__(self):
+        n = self.num_samples()
+        if self.drop_last:
+            return n // self.batch_size
+        return (n + self.batch_size - 1) // self.batch_size
+
+    def __iter__(self):
+        rng = np.random.default_rng((self.seed, self._epoch)) if self.shuffle else None
+        self._epoch += 1
+        batches = self._batches(rng)
+        if self.prefetch <= 0:
+            yield from batches
+            return
+
+        ready = queue.Queue(maxsize=self.prefetch)
+        done = threading.Event()
+
+        def produce():
+            try:
+                for batch in batches:
+                    while not done.is_set():
+                        try:
+                            ready.put(batch, timeout=0.1)
+                            break
+                        except queue.Full:
+                            pass
+                    if done.is_set():
+                        return
+                item = None
+            except BaseException as e:
+                item = e
+            finally:
+                batches.close()
+            while not done.is_set():
+                try:
+                    ready.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+
+        producer = threading.Thread(target=produce, name='stream-prefetch', daemon=True)
+        producer.start()
+        try:
+            while True:
+                item = ready.get()
+                if item is None:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # Consumer stopped early (or finished): release the producer
+            done.set()
+            producer.join()
+
+    def _batches(self, rng: Optional[np.random.Generator]) -> Iterator[Tuple[torch.Tensor, torch.Tensor]]:
+        window_data: List[np.ndarray] = []
+        window_targets: List[np.ndarray] = []
+        held = 0
+        for start, data, targets in self.source.chunks(rng, (self.shard_index, self.num_shards)):
+            data, targets = self._select(start, data, targets)
+            if not len(targets):
+                continue
+            window_data.append(data)
+            window_targets.append(targets)
+            held += len(targets)
+            if held >= self.shuffle_buffer:
+                leftover = yield from self._emit(window_data, window_targets, rng, final=False)
+                window_data, window_targets = leftover
+                held = sum(len(t) for t in window_targets)
+        if held:
+            yield from self._emit(window_data, window_targets, rng, final=True)
+
+    def _emit(self, window_data, window_targets, rng, final: bool):
+        """Yield full batches from the window; keep the remainder unless final"""
+        data = np.concatenate(window_data)
+        targets = np.concatenate(window_targets)
+        if rng is not None:
+            order = rng.permutation(len(targets))
+            data, targets = data[order], targets[order]
+
+        end = len(targets) - len(targets) % self.batch_size
+        if final and not self.drop_last:
+            end = len(targets)
+        for i in range(0, end, self.batch_size):
+            yield (torch.from_numpy(np.ascontiguousarray(data[i:i + self.batch_size])),
+                   torch.from_numpy(np.ascontiguousarray(targets[i:i + self.batch_size])))
+        if end < len(targets) and not final:
+            return [data[end:]], [targets[end:]]
+        return [], []
+
+    def _select(self, start: int, data: np.ndarray, targets: np.ndarray):
+        """Apply the holdout split, Input shape and label checks to one chunk"""
+        if self.holdout is not None:
+            k, test = self.holdout
+            keep = (np.arange(start, start + len(targets)) % k == 0) == test
+            data, targets = data[keep], targets[keep]
+        if self.num_classes is not None and len(targets) and \
+                (targets.min() < 0 or targets.max() >= self.num_classes):
+            raise ValueError(f'{self.source.name}: labels must be in [0, {self.num_classes}), '
+                             f'found {int(targets.min())}..{int(targets.max())}')
+        data = data.reshape(len(data), *self.sample_shape)
+        return data.astype(self.dtype, copy=False), targets.astype(np.int64, copy=False)
+
+
+def open_source(kind: str, options: Dict[str, Any], sample_shape: List[int], test: bool = False):
+    """Source for one split, or None when the options name no separate test split"""
+    prefix = 'test_' if test else ''
+    if kind == 'npy':
+        if f'{prefix}data' not in options:
+            return None
+        return NpySource(options[f'{prefix}data'], options[f'{prefix}targets'],
+                         chunk_size=options.get('chunk_size', 4096))
+    if kind == 'csv':
+        if f'{prefix}path' not in options:
+            return None
+        return CsvSource(options[f'{prefix}path'], target_column=options.get('target_column', -1),
+                         header=options.get('header', True), chunk_size=options.get('chunk_size', 4096))
+    if kind == 'image_folder':
+        if f'{prefix}root' not in options:
+            return None
+        return ImageFolderSource(options[f'{prefix}root'], sample_shape,
+                                 chunk_size=options.get('chunk_size', 256))
+    raise ValueError(f'Unknown streaming source: {kind}')
+
+
+def check_sample_shape(source, expected: List[int]):
+    """
+    Match a source's samples against the Input node's shape
+
+    Samples must have the Input shape (minus its batch dimension); flat
+    CSV rows may instead have the same number of elements and are
+    reshaped.
+    """
+    actual = source.sample_shape
+    if actual == expected:
+        return
+    if isinstance(source, CsvSource) and int(np.prod(expected)) == actual[0]:
+        return
+    raise ValueError(f'Input node expects samples of shape {expected}, '
+                     f'but {source.name} provides {actual}')
+
+
+def streaming_loaders(
+    kind: str,
+    graph_data: Dict[str, Any],
+    options: Dict[str, Any],
+    batch_size: int = 64,
+    drop_last: bool = False
+) -> Tuple[StreamingBatchLoader, StreamingBatchLoader]:
+    """
+    Train/test loaders for a 'npy', 'csv' or 'image_folder' source
+
+    Without a test_* option, every validation_split-th sample (default
+    0.1, i.e. every 10th) of the training source is held out for testing.
+    """
+    spec = infer_data_spec(graph_data)
+    expected = spec['sample_shape']
+    train_source = open_source(kind, options, expected)
+    if train_source is None:
+        raise ValueError(f'{kind} dataset needs a training source')
+    check_sample_shape(train_source, expected)
+    test_source = open_source(kind, options, expected, test=True)
+
+    common = dict(
+        batch_size=batch_size,
+        sample_shape=expected,
+        num_classes=spec['num_classes'],
+        shuffle_buffer=options.get('shuffle_buffer', 10000),
+        prefetch=options.get('prefetch', 4),
+        seed=options.get('seed', 0),
+        index_input=spec['vocab_size'] is not None
+    )
+    if test_source is None:
+        k = max(2, round(1 / options.get('validation_split', 0.1)))
+        train_loader = StreamingBatchLoader(train_source, shuffle=True, holdout=(k, False),
+                                            drop_last=drop_last, **common)
+        test_loader = StreamingBatchLoader(train_source, holdout=(k, True), **common)
+    else:
+        check_sample_shape(test_source, expected)
+        train_loader = StreamingBatchLoader(train_source, shuffle=True, drop_last=drop_last, **common)
+        test_loader = StreamingBatchLoader(test_source, **common)
+    return train_loader, test_loader
@@ -0,0 +1,316 @@
+"""
+Sweep Runner
+Hyperparameter search over a process pool, one TrainingEngine per trial
+
+Trials run concurrently in spawned worker processes, each capped to a
+few intra-op threads so the pool does not oversubscribe the cores.
+Datasets already cached in the parent are moved to shared memory once
+and installed in every worker, and worker events are relayed to the
+frontend tagged with their trial_id. An optional trial scheduler (ASHA by
+default) sees every relayed epoch_end and prunes losing trials early.
+"""
+
+import io
+import itertools
+import math
+import os
+import random
+import threading
+import time
+import traceback
+import torch
+import torch.multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Callable, Optional
+import dataset_cache
+from checkpoint_manager import checkpoint_dir
+from model_builder import ModelBuilder
+from training_engine import TrainingEngine
+from trial_scheduler import create_scheduler
+from system_info import get_cpu_counts
+
+
+def _sample(spec, rng: random.Random):
+    """One random draw from a list of choices or a {'uniform'|'log_uniform'|'int': [lo, hi]} range"""
+    if isinstance(spec, list):
+        return rng.choice(spec)
+    if isinstance(spec, dict):
+        if 'uniform' in spec:
+            low, high = spec['uniform']
+            return rng.uniform(low, high)
+        if 'log_uniform' in spec:
+            low, high = spec['log_uniform']
+            return math.exp(rng.uniform(math.log(low), math.log(high)))
+        if 'int' in spec:
+            low, high = spec['int']
+            return rng.randint(low, high)
+    return spec
+
+
+def expand_trials(
+    space: Dict[str, Any],
+    method: str = 'grid',
+    num_trials: Optional[int] = None,
+    seed: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Parameter sets for a search space
+
+    Grid search takes the product of every list in space (scalars are
+    fixed values); random search draws num_trials sets, where a value may
+    also be a {'uniform'|'log_uniform'|'int': [low, high]} range.
+    """
+    if method == 'grid':
+        keys = list(space)
+        choices = [v if isinstance(v, list) else [v] for v in space.values()]
+        trials = [dict(zip(keys, combo)) for combo in itertools.product(*choices)]
+        return trials[:num_trials] if num_trials else trials
+    if method == 'random':
+        if not num_trials:
+            raise ValueError('Random search needs num_trials')
+        rng = random.Random(seed)
+        return [{key: _sample(spec, rng) for key, spec in space.items()} for _ in range(num_trials)]
+    raise ValueError(f'Unknown search method: {method}')
+
+
+def _trial_config(trial_id: int, base_config: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+    # Trial threads are capped by the pool; DataLoader workers would
+    # oversubscribe the cores again
+    config = {'num_workers': 0, **base_config, **params}
+    # Each trial checkpoints to its own directory
+    if config.get('checkpoint'):
+        options = config['checkpoint'] if isinstance(config['checkpoint'], dict) else {}
+        trial_dir = os.path.join(checkpoint_dir(config), f'trial-{trial_id}')
+        config['checkpoint'] = {**options, 'dir': trial_dir}
+    return config
+
+
+# Per-process state set by _init_worker
+_events = None
+_stop_flags = None
+
+
+def _init_worker(threads: int, events, stop_flags, shared_datasets):
+    global _events, _stop_flags
+    torch.set_num_threads(threads)
+    _events = events
+    _stop_flags = stop_flags
+    dataset_cache.install_memory_cache(shared_datasets)
+
+
+def _run_trial(trial_id: int, graph_data: Dict[str, Any], config: Dict[str, Any]) -> Dict[str, Any]:
+    """Worker body: train one trial, streaming its events to the parent"""
+    if _stop_flags[trial_id]:
+        return {'trial_id': trial_id, 'status': 'skipped', 'elapsed': 0.0}
+    engine = TrainingEngine()
+    done = threading.Event()
+
+    def watch_stop():
+        # Pruning decisions arrive right after epoch_end; react quickly
+        while not done.wait(0.05):
+            if _stop_flags[trial_id]:
+                engine.stop()
+                return
+    threading.Thread(target=watch_stop, daemon=True).start()
+
+    def on_epoch_end(epoch, loss, accuracy):
+        _events.put(('epoch_end', {
+            'trial_id': trial_id,
+            'epoch': epoch,
+            'loss': float(loss),
+            'accuracy': float(accuracy),
+            **{k: round(v, 4) for k, v in engine.epoch_timing.items()}
+        }))
+
+    def on_batch_end(batch, total_batches, loss):
+        _events.put(('batch_end', {
+            'trial_id': trial_id,
+            'batch': batch,
+            'total_batches': total_batches,
+            'loss': float(loss)
+        }))
+
+    start = time.perf_counter()
+    try:
+        model, final_loss, final_accuracy = engine.train(
+            graph_data, config, on_epoch_end=on_epoch_end, on_batch_end=on_batch_end
+        )
+        buffer = io.BytesIO()
+        torch.save(model.state_dict(), buffer)
+        return {
+            'trial_id': trial_id,
+            'status': 'stopped' if engine.stop_requested else 'completed',
+            'final_loss': float(final_loss),
+            'final_accuracy': float(final_accuracy),
+            'elapsed': round(time.perf_counter() - start, 3),
+            'early_stopping': engine.scheduler_info,
+            'state': buffer.getvalue()
+        }
+    except Exception as e:
+        return {
+            'trial_id': trial_id,
+            'status': 'failed',
+            'error': str(e),
+            'traceback': traceback.format_exc(),
+            'elapsed': round(time.perf_counter() - start, 3)
+        }
+    finally:
+        done.set()
+
+
+class SweepRunner:
+    """
+    Runs every trial of a sweep and reports the best one
+
+    Exposes stop() and stop_requested like TrainingEngine, so a sweep is
+    submitted to JobManager as a single job.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        threads_per_trial: int = 1,
+        metric: str = 'accuracy',
+        scheduler=None
+    ):
+        if metric not in ('accuracy', 'loss'):
+            raise ValueError(f'Unknown sweep metric: {metric}')
+        cores = get_cpu_counts()['cores_physical']
+        self.threads_per_trial = max(1, threads_per_trial)
+        self.max_workers = max_workers or max(1, cores // self.threads_per_trial)
+        self.metric = metric
+        self.scheduler_spec = scheduler
+        self.scheduler = None
+        self.stop_requested = False
+        self.results: List[Dict[str, Any]] = []
+        self.best_state = None
+        self._stop_flags = None
+        self._pruned = set()
+
+    def run(
+        self,
+        graph_data: Dict[str, Any],
+        base_config: Dict[str, Any],
+        trials: List[Dict[str, Any]],
+        on_event: Optional[Callable] = None
+    ) -> Dict[str, Any]:
+        """
+        Train base_config updated with each parameter set in trials
+
+        Args:
+            on_event: Callback(event_type, data) for trial_start,
+                batch_end, epoch_end, trial_pruned and trial_complete -
+                every payload carries the trial index as trial_id
+
+        Returns:
+            {'trials': results in trial order (without weights),
+             'best': the best completed result or None}
+        """
+        emit = on_event or (lambda event_type, data: None)
+        ctx = mp.get_context('spawn')
+        events = ctx.Queue()
+        self._stop_flags = ctx.Array('b', len(trials))
+        if self.stop_requested:
+            self.stop()
+        max_epochs = max(params.get('epochs', base_config.get('epochs', 10)) for params in trials)
+        self.scheduler = create_scheduler(self.scheduler_spec, max_epochs, default='asha',
+                                          metric=self.metric)
+
+        # Dataset work done once here is shared with every worker
+        self._preload(base_config)
+        shared = dataset_cache.share_memory_cache()
+        relay = threading.Thread(target=self._relay, args=(events, emit), daemon=True)
+        relay.start()
+
+        workers = min(self.max_workers, len(trials)) or 1
+        futures = {}
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=ctx,
+                initializer=_init_worker,
+                initargs=(self.threads_per_trial, events, self._stop_flags, shared)
+            ) as pool:
+                for trial_id, params in enumerate(trials):
+                    config = _trial_config(trial_id, base_config, params)
+                    futures[trial_id] = pool.submit(_run_trial, trial_id, graph_data, config)
+                    emit('trial_start', {'trial_id': trial_id, 'params': params})
+
+                for trial_id, future in futures.items():
+                    result = future.result()
+                    result['params'] = trials[trial_id]
+                    if trial_id in self._pruned and result['status'] == 'stopped':
+                        result['status'] = 'pruned'
+                        result['early_stopping'] = self.scheduler.info(trial_id)
+                    self._record(result)
+                    emit('trial_complete', {k: v for k, v in result.items() if k != 'state'})
+        finally:
+            events.put(None)
+            relay.join()
+
+        best = self.best()
+        return {
+            'trials': [{k: v for k, v in r.items() if k != 'state'} for r in self.results],
+            'best': {k: v for k, v in best.items() if k != 'state'} if best else None
+        }
+
+    def best(self) -> Optional[Dict[str, Any]]:
+        """Best completed or pruned trial by the sweep metric"""
+        done = [r for r in self.results if r['status'] in ('completed', 'pruned')]
+        if not done:
+            return None
+        if self.metric == 'accuracy':
+            return max(done, key=lambda r: r['final_accuracy'])
+        return min(done, key=lambda r: r['final_loss'])
+
+    def best_model(self, graph_data: Dict[str, Any]) -> Optional[torch.nn.Module]:
+        """The best trial's model, rebuilt in this process"""
+        if self.best_state is None:
+            return None
+        model = ModelBuilder().build_model(graph_data)
+        model.load_state_dict(torch.load(io.BytesIO(self.best_state)))
+        return model
+
+    def _record(self, result: Dict[str, Any]):
+        # Only the best trial's weights are kept
+        self.results.append(result)
+        best = self.best()
+        for r in self.results:
+            if r is not best:
+                r.pop('state', None)
+        self.best_state = best.get('state') if best else None
+
+    def _preload(self, config: Dict[str, Any]):
+        # Only cached tensor datasets can be shared; other sources are
+        # generated or streamed per worker
+        dataset = config.get('dataset', 'mnist')
+        name = dataset.get('name', 'mnist') if isinstance(dataset, dict) else dataset
+        if name in dataset_cache.DATASET_LOADERS and config.get('data_mode', 'tensor') == 'tensor':
+            dataset_cache.get_dataset(name, train=True)
+            dataset_cache.get_dataset(name, train=False)
+
+    def _relay(self, events, emit):
+        while True:
+            item = events.get()
+            if item is None:
+                return
+            emit(*item)
+            event_type, data = item
+            if event_type == 'epoch_end' and self.scheduler is not None:
+                self._schedule(data, emit)
+
+    def _schedule(self, data, emit):
+        trial_id = data['trial_id']
+        if trial_id in self._pruned or self.stop_requested:
+            return
+        if not self.scheduler.on_epoch_end(trial_id, data['epoch'], data['loss'], data['accuracy']):
+            self._pruned.add(trial_id)
+            self._stop_flags[trial_id] = 1
+            emit('trial_pruned', {'trial_id': trial_id, 'epoch': data['epoch']})
+
+    def stop(self):
+        """Stop running trials at their next batch and skip pending ones"""
+        self.stop_requested = True
+        if self._stop_flags is not None:
+            for i in range(len(self._stop_flags)):
+                self._stop_flags[i] = 1
@@ -0,0 +1,161 @@
+"""
+Synthetic Data
+Deterministic random batches generated on the training device
+
+Shapes come from the graph: samples match the Input node's shape (minus
+its batch dimension) and labels cover the Output node's numClasses. Batch
+i of a split is always the same tensor for a given seed, so runs are
+reproducible, nothing is read from disk and nothing is held in memory
+beyond the batch being trained on.
+"""
+
+import torch
+from typing import Dict, List, Any, Optional, Tuple
+from schema import NodeType
+from graph_parser import GraphParser
+
+
+def infer_data_spec(graph_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Sample shape, token vocabulary and class count a graph expects
+
+    Returns:
+        {'sample_shape': [...], 'num_classes': int, 'vocab_size': int or
+        None} - vocab_size is set when the Input feeds an Embedding, whose
+        inputs must be token indices
+    """
+    parser = GraphParser()
+    validation = parser.validate(graph_data, use_cache=True)
+    if not validation['valid']:
+        raise ValueError(f"Invalid graph: {validation['errors']}")
+
+    nodes = parser.nodes
+    input_id = next(node_id for node_id, node in nodes.items() if node['type'] == NodeType.INPUT.value)
+    consumers = [nodes[edge['target']] for edge in parser.edges if edge['source'] == input_id]
+    vocab_size = None
+    for node in consumers:
+        if node['type'] == NodeType.EMBEDDING.value:
+            vocab_size = node['data']['params']['num_embeddings']
+
+    # An explicit numClasses wins; otherwise the last layer's width, as
+    # CrossEntropyLoss sees it
+    output_id = next((node_id for node_id, node in nodes.items()
+                      if node['type'] == NodeType.OUTPUT.value), parser.get_execution_order()[-1])
+    num_classes = nodes[output_id].get('data', {}).get('params', {}).get('numClasses')
+    if num_classes is None:
+        num_classes = parser.node_shapes[output_id][-1]
+
+    return {
+        'sample_shape': list(parser.node_shapes[input_id][1:]),
+        'num_classes': num_classes,
+        'vocab_size': vocab_size
+    }
+
+
+class SyntheticBatchLoader:
+    """
+    Batch loader producing random (data, targets) lazily per batch
+
+    Labels are the argmax of a fixed random projection of each sample,
+    so they are learnable and accuracy moves as the model trains. With
+    reuse_batch, one batch is generated up front and served every step,
+    which removes data cost entirely (pure compute throughput).
+    """
+
+    def __init__(
+        self,
+        sample_shape: List[int],
+        num_classes: int,
+        num_samples: int = 60000,
+        batch_size: int = 64,
+        seed: int = 0,
+        label_seed: int = 0,
+        vocab_size: Optional[int] = None,
+        drop_last: bool = False,
+        reuse_batch: bool = False,
+        device: Optional[torch.device] = None
+    ):
+        if num_classes < 1:
+            raise ValueError(f'num_classes must be positive, got {num_classes}')
+        self.sample_shape = list(sample_shape)
+        self.num_classes = num_classes
+        self.num_samples = num_samples
+        self.batch_size = batch_size
+        self.seed = seed
+        self.vocab_size = vocab_size
+        self.drop_last = drop_last
+        self.reuse_batch = reuse_batch
+        self.device = device or torch.device('cpu')
+        self._generator = torch.Generator(device=self.device)
+
+        features = 1
+        for dim in self.sample_shape:
+            features *= dim
+        # Splits share label_seed so train and test labels follow one rule
+        self._generator.manual_seed(label_seed)
+        self._projection = torch.randn(features, num_classes, generator=self._generator,
+                                       device=self.device)
+        self._fixed = self._make_batch(0, batch_size) if reuse_batch else None
+        self.shard_index = 0
+        self.num_shards = 1
+
+    def shard(self, rank: int, world_size: int):
+        """Serve only every world_size-th batch, starting at batch rank"""
+        self.shard_index = rank
+        self.num_shards = world_size
+        return self
+
+    def _total_batches(self) -> int:
+        if self.drop_last:
+            return self.num_samples // self.batch_size
+        return (self.num_samples + self.batch_size - 1) // self.batch_size
+
+    def __len__(self):
+        return len(range(self.shard_index, self._total_batches(), self.num_shards))
+
+    def __iter__(self):
+        for index in range(self.shard_index, self._total_batches(), self.num_shards):
+            if self._fixed is not None:
+                yield self._fixed
+                continue
+            size = min(self.batch_size, self.num_samples - index * self.batch_size)
+            yield self._make_batch(index, size)
+
+    def _make_batch(self, index: int, size: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        # Seeding per batch index makes batch i independent of iteration order
+        self._generator.manual_seed(hash((self.seed, index)) & 0x7FFFFFFFFFFFFFFF)
+        shape = (size, *self.sample_shape)
+        if self.vocab_size is not None:
+            data = torch.randint(0, self.vocab_size, shape, generator=self._generator, device=self.device)
+            scores = data.flatten(1).float() @ self._projection
+        else:
+            data = torch.randn(shape, generator=self._generator, device=self.device)
+            scores = data.flatten(1) @ self._projection
+        return data, scores.argmax(dim=1)
+
+
+def synthetic_loaders(
+    graph_data: Dict[str, Any],
+    batch_size: int = 64,
+    train_samples: int = 60000,
+    test_samples: int = 10000,
+    seed: int = 0,
+    drop_last: bool = False,
+    reuse_batch: bool = False,
+    device: Optional[torch.device] = None
+) -> Tuple[SyntheticBatchLoader, SyntheticBatchLoader]:
+    """Train/test loaders shaped for graph_data (test uses the next seed)"""
+    spec = infer_data_spec(graph_data)
+    common = dict(
+        sample_shape=spec['sample_shape'],
+        num_classes=spec['num_classes'],
+        vocab_size=spec['vocab_size'],
+        batch_size=batch_size,
+        reuse_batch=reuse_batch,
+        device=device
+    )
+    train_loader = SyntheticBatchLoader(num_samples=train_samples, seed=seed, label_seed=seed,
+                                        drop_last=drop_last, **common)
+    test_loader = SyntheticBatchLoader(num_samples=test_samples, seed=seed + 1, label_seed=seed,
+                                       **common)
+    return train_loader, test_loader
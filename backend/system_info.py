@@ -9,13 +9,22 @@ import torch
 from typing import Dict, Any
 
 
+def get_cpu_counts() -> Dict[str, int]:
+    """Get physical/logical core counts (cheap, unlike get_cpu_info)"""
+    logical = psutil.cpu_count(logical=True) or 1
+    physical = psutil.cpu_count(logical=False) or logical
+    return {
+        'cores_physical': physical,
+        'cores_logical': logical
+    }
+
+
 def get_cpu_info() -> Dict[str, Any]:
     """Get CPU information"""
     return {
         'processor': platform.processor(),
         'architecture': platform.machine(),
-        'cores_physical': psutil.cpu_count(logical=False),
-        'cores_logical': psutil.cpu_count(logical=True),
+        **get_cpu_counts(),
         'frequency_mhz': psutil.cpu_freq().current if psutil.cpu_freq() else 0,
         'frequency_max_mhz': psutil.cpu_freq().max if psutil.cpu_freq() else 0,
         'usage_percent': psutil.cpu_percent(interval=1)
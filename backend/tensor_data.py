@@ -0,0 +1,111 @@
+"""
+Tensor Data
+In-memory datasets served as batches by slicing resident tensors
+"""
+
+import torch
+from torch.utils.data import Sampler
+from torchvision import datasets
+from typing import Optional, Tuple
+
+
+MNIST_MEAN = 0.1307
+MNIST_STD = 0.3081
+
+
+def load_mnist_tensors(
+    root: str = './data',
+    train: bool = True,
+    normalize: bool = True
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Decode MNIST once into tensors
+
+    Reads the raw uint8 images directly (no PIL round-trip) and applies
+    ToTensor + Normalize as one vectorized op over the whole split.
+
+    Returns:
+        (data [N, 1, 28, 28], targets [N] int64) - data is float32 when
+        normalize is set, otherwise the raw uint8 pixels
+    """
+    raw = datasets.MNIST(root=root, train=train, download=True)
+    data = raw.data.unsqueeze(1)
+    if normalize:
+        data = data.float()
+        data.div_(255.0).sub_(MNIST_MEAN).div_(MNIST_STD)
+    return data, raw.targets.long()
+
+
+class TensorBatchLoader:
+    """
+    DataLoader replacement for datasets that fit in memory
+
+    Each epoch draws one permutation and yields batches by index slicing,
+    so there is no per-sample __getitem__, collate or worker overhead.
+    """
+
+    def __init__(
+        self,
+        data: torch.Tensor,
+        targets: torch.Tensor,
+        batch_size: int = 64,
+        shuffle: bool = False,
+        drop_last: bool = False,
+        device: Optional[torch.device] = None,
+        generator: Optional[torch.Generator] = None,
+        sampler: Optional[Sampler] = None
+    ):
+        if len(data) != len(targets):
+            raise ValueError(f'data has {len(data)} samples but targets has {len(targets)}')
+
+        if device is not None:
+            data, targets = data.to(device), targets.to(device)
+
+        self.data = data
+        self.targets = targets
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.generator = generator
+        # A sampler (e.g. DistributedSampler) picks the indices instead
+        self.sampler = sampler
+        self._epoch = 0
+
+    def set_epoch(self, epoch: int):
+        """Epoch the sampler is set to on the next iteration (for resume)"""
+        self._epoch = epoch
+
+    def __len__(self):
+        n = len(self.sampler) if self.sampler is not None else len(self.data)
+        if self.drop_last:
+            return n // self.batch_size
+        return (n + self.batch_size - 1) // self.batch_size
+
+    def __iter__(self):
+        if self.sampler is not None:
+            yield from self._iter_sampler()
+            return
+
+        n = len(self.data)
+        end = n - n % self.batch_size if self.drop_last else n
+
+        if not self.shuffle:
+            for start in range(0, end, self.batch_size):
+                yield self.data[start:start + self.batch_size], self.targets[start:start + self.batch_size]
+            return
+
+        perm = torch.randperm(n, generator=self.generator).to(self.data.device)
+        for start in range(0, end, self.batch_size):
+            idx = perm[start:start + self.batch_size]
+            yield self.data.index_select(0, idx), self.targets.index_select(0, idx)
+
+    def _iter_sampler(self):
+        if hasattr(self.sampler, 'set_epoch'):
+            self.sampler.set_epoch(self._epoch)
+        self._epoch += 1
+        indices = torch.tensor(list(self.sampler), dtype=torch.long, device=self.data.device)
+        n = len(indices)
+        end = n - n % self.batch_size if self.drop_last else n
+        for start in range(0, end, self.batch_size):
+            idx = indices[start:start + self.batch_size]
+            yield self.data.index_select(0, idx), self.targets.index_select(0, idx)
@@ -0,0 +1,45 @@
+"""
+Unit tests for benchmark_suite module
+"""
+
+import json
+import pytest
+from benchmark_suite import run_suite, compare_results, main
+
+
+def results(**values):
+    return {'results': {
+        name: {'value': value, 'unit': unit, 'higher_is_better': unit != 'ms'}
+        for name, (value, unit) in values.items()
+    }}
+
+
+def test_compare_flags_slowdowns_past_threshold():
+    """Test both lower-is-better and higher-is-better metrics are judged"""
+    baseline = results(validate_1k=(10.0, 'ms'), train_epoch=(1000.0, 'samples/s'),
+                       codegen=(5.0, 'ms'))
+    current = results(validate_1k=(13.0, 'ms'), train_epoch=(900.0, 'samples/s'),
+                      codegen=(4.0, 'ms'), events_json=(1.0, 'events/s'))
+
+    rows, regressions = compare_results(current, baseline, threshold=0.2)
+
+    assert regressions == ['validate_1k']
+    by_name = {row['name']: row for row in rows}
+    assert set(by_name) == {'validate_1k', 'train_epoch', 'codegen'}
+    assert by_name['codegen']['change'] == pytest.approx(0.25)
+    assert by_name['train_epoch']['change'] == pytest.approx(-0.1)
+
+
+def test_baseline_round_trip(tmp_path):
+    """Test a saved run compares cleanly against itself"""
+    path = tmp_path / 'baseline.json'
+    run = run_suite(['validate_10', 'events_json'], {'repeats': 1, 'events': 200})
+    path.write_text(json.dumps(run))
+
+    assert set(run['results']) == {'validate_10', 'events_json'}
+    assert main(['--quick', '--only', 'validate_10', '--baseline', str(path),
+                 '--threshold', '100']) == 0
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
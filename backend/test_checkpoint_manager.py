@@ -0,0 +1,117 @@
+"""
+Unit tests for checkpoint_manager module
+"""
+
+import os
+import numpy as np
+import pytest
+import torch
+from checkpoint_manager import CheckpointManager, find_checkpoint, list_checkpoints, load_checkpoint, snapshot
+from training_engine import TrainingEngine
+from graph_fixtures import chain_graph, make_node
+
+
+# Dropout draws from the RNG every batch, so resume must restore it exactly
+GRAPH = chain_graph(
+    make_node('input1', 'input', shape=[1, 20]),
+    make_node('linear1', 'linear', in_features=20, out_features=32),
+    make_node('dropout1', 'dropout', p=0.3),
+    make_node('linear2', 'linear', in_features=32, out_features=4),
+    make_node('output1', 'output', numClasses=4),
+)
+
+
+def test_snapshot_is_independent_of_training():
+    """Test a snapshot is unaffected by later in-place updates"""
+    state = {'w': torch.ones(3), 'nested': [{'step': torch.tensor(1.0)}], 'lr': 0.1}
+    copy = snapshot(state)
+    state['w'].add_(1)
+    state['nested'][0]['step'].add_(1)
+    assert torch.equal(copy['w'], torch.ones(3))
+    assert copy['nested'][0]['step'].item() == 1.0 and copy['lr'] == 0.1
+
+
+def test_retention_keeps_newest(tmp_path):
+    """Test only the newest keep_last checkpoints remain and are found"""
+    manager = CheckpointManager(str(tmp_path), keep_last=2)
+    for epoch in range(1, 5):
+        manager.save({'epoch': epoch, 'batch': 0, 'value': torch.tensor(epoch)})
+        manager.flush()
+    manager.close()
+
+    names = [os.path.basename(p) for p in list_checkpoints(str(tmp_path))]
+    assert names == ['ckpt-e0003-b0000000.pt', 'ckpt-e0004-b0000000.pt']
+    assert find_checkpoint(True, str(tmp_path)).endswith('ckpt-e0004-b0000000.pt')
+    assert load_checkpoint(find_checkpoint(str(tmp_path)))['value'].item() == 4
+    assert not any(name.endswith('.tmp') for name in os.listdir(tmp_path))
+    with pytest.raises(FileNotFoundError):
+        find_checkpoint(True, str(tmp_path / 'missing'))
+
+
+def test_runs_sharing_a_directory_keep_their_own_checkpoints(tmp_path):
+    """Test retention never deletes another run's files and resume finds the latest run"""
+    earlier = CheckpointManager(str(tmp_path), keep_last=2)
+    for epoch in (5, 6):
+        earlier.save({'epoch': epoch, 'batch': 0})
+        earlier.flush()
+    earlier.close()
+    for path in earlier.written:  # an hour old
+        os.utime(path, (os.path.getmtime(path) - 3600,) * 2)
+
+    manager = CheckpointManager(str(tmp_path), keep_last=2)
+    for epoch in (1, 2, 3):
+        manager.save({'epoch': epoch, 'batch': 0})
+        manager.flush()
+    manager.close()
+
+    names = sorted(os.path.basename(p) for p in list_checkpoints(str(tmp_path)))
+    assert names == ['ckpt-e0002-b0000000.pt', 'ckpt-e0003-b0000000.pt',
+                     'ckpt-e0005-b0000000.pt', 'ckpt-e0006-b0000000.pt']
+    assert os.path.exists(manager.info()['latest'])
+    assert find_checkpoint(True, str(tmp_path)) == manager.info()['latest']
+
+
+@pytest.fixture
+def npy_config(tmp_path):
+    rng = np.random.default_rng(0)
+    np.save(tmp_path / 'x.npy', rng.standard_normal((600, 20)).astype(np.float32))
+    np.save(tmp_path / 'y.npy', rng.integers(0, 4, 600))
+    return {
+        'epochs': 3,
+        'lr': 0.01,
+        'batch_size': 32,
+        'dataset': {'name': 'npy', 'data': str(tmp_path / 'x.npy'), 'targets': str(tmp_path / 'y.npy'),
+                    'chunk_size': 100, 'shuffle_buffer': 200}
+    }
+
+
+def test_resume_after_stop_matches_uninterrupted_run(tmp_path, npy_config):
+    """Test a run stopped mid-epoch and resumed ends with the same weights"""
+    torch.manual_seed(1)
+    reference, loss, accuracy = TrainingEngine().train(GRAPH, npy_config)
+
+    engine = TrainingEngine()
+    batches = []
+
+    def on_batch_end(batch, total_batches, batch_loss):
+        batches.append(batch)
+        if len(batches) == 25:  # in the second epoch
+            engine.stop()
+
+    config = {**npy_config, 'batch_event_interval': 1,
+              'checkpoint': {'dir': str(tmp_path / 'ckpt'), 'every_batches': 4, 'keep_last': 2}}
+    torch.manual_seed(1)
+    engine.train(GRAPH, config, on_batch_end=on_batch_end)
+    assert engine.checkpoint_info['written'] >= 2 and engine.checkpoint_info['error'] is None
+    latest = load_checkpoint(find_checkpoint(str(tmp_path / 'ckpt')))
+    assert (latest['epoch'], latest['batch']) == (2, batches[-1] + 1)
+
+    torch.manual_seed(99)  # resume restores the RNG itself
+    resumed, resumed_loss, resumed_accuracy = TrainingEngine().train(GRAPH, npy_config, resume=latest)
+    assert all(torch.equal(a, b) for a, b in zip(reference.state_dict().values(),
+                                                 resumed.state_dict().values()))
+    assert (resumed_loss, resumed_accuracy) == (loss, accuracy)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,141 @@
+"""
+Unit tests for cost_model module
+"""
+
+import copy
+import pytest
+import torch
+from torch.utils.flop_counter import FlopCounterMode
+from schema import NodeType
+from cost_model import PARAM_COUNTERS, count_node_params, node_cost
+from graph_parser import GraphParser
+from model_builder import ModelBuilder
+from validation_session import ValidationSession
+
+
+PARAM_CASES = [
+    ('conv1d', {'in_channels': 3, 'out_channels': 8, 'kernel_size': 5}),
+    ('conv2d', {'in_channels': 3, 'out_channels': 8, 'kernel_size': [3, 5]}),
+    ('conv3d', {'in_channels': 2, 'out_channels': 4, 'kernel_size': 3}),
+    ('convtranspose2d', {'in_channels': 4, 'out_channels': 2, 'kernel_size': 4}),
+    ('linear', {'in_features': 784, 'out_features': 10}),
+    ('lstm', {'input_size': 8, 'hidden_size': 6, 'num_layers': 2, 'bidirectional': True}),
+    ('gru', {'input_size': 8, 'hidden_size': 6, 'num_layers': 2}),
+    ('rnn', {'input_size': 8, 'hidden_size': 6}),
+    ('batchnorm', {'num_features': 6}),
+    ('layernorm', {'normalized_shape': [3, 4]}),
+    ('groupnorm', {'num_groups': 2, 'num_channels': 6}),
+    ('embedding', {'num_embeddings': 100, 'embedding_dim': 16}),
+    ('multiheadattention', {'embed_dim': 16, 'num_heads': 4}),
+]
+
+
+def test_every_parametric_type_is_counted():
+    """Test the counter table covers every layer built with weights"""
+    counted = {NodeType(node_type) for node_type, _ in PARAM_CASES}
+    assert counted == set(PARAM_COUNTERS)
+
+
+@pytest.mark.parametrize('node_type,params', PARAM_CASES)
+def test_param_count_matches_module(node_type, params):
+    """Test parameter counts against the module ModelBuilder builds"""
+    node_type = NodeType(node_type)
+    module = ModelBuilder().layer_map[node_type](params)
+    expected = sum(p.numel() for p in module.parameters())
+    
+    assert count_node_params(node_type, params) == expected
+
+
+@pytest.mark.parametrize('node_type,params,input_shape', [
+    ('linear', {'in_features': 64, 'out_features': 10}, [1, 64]),
+    ('conv1d', {'in_channels': 3, 'out_channels': 8, 'kernel_size': 5, 'stride': 2}, [1, 3, 50]),
+    ('conv2d', {'in_channels': 3, 'out_channels': 8, 'kernel_size': 3, 'padding': 1}, [1, 3, 16, 16]),
+    ('convtranspose2d', {'in_channels': 4, 'out_channels': 2, 'kernel_size': 4}, [1, 4, 7, 7]),
+])
+def test_macs_match_flop_counter(node_type, params, input_shape):
+    """Test MACs against torch's FLOP counter (which counts 2 per MAC)"""
+    node_type = NodeType(node_type)
+    module = ModelBuilder().layer_map[node_type](params)
+    x = torch.randn(input_shape)
+    
+    counter = FlopCounterMode(display=False)
+    with counter, torch.no_grad():
+        output = module(x)
+    
+    cost = node_cost(node_type, params, [input_shape], list(output.shape))
+    assert 2 * cost['macs'] == counter.get_total_flops()
+
+
+def create_cnn_graph():
+    def node(node_id, node_type, **params):
+        return {'id': node_id, 'type': node_type, 'data': {'params': params}}
+    
+    return {
+        'nodes': [
+            node('input1', 'input', shape=[1, 1, 28, 28]),
+            node('conv1', 'conv2d', in_channels=1, out_channels=8, kernel_size=3),
+            node('relu1', 'relu'),
+            node('pool1', 'maxpool2d', kernel_size=2),
+            node('flatten1', 'flatten'),
+            node('linear1', 'linear', in_features=8 * 13 * 13, out_features=10)
+        ],
+        'edges': [
+            {'source': 'input1', 'target': 'conv1'},
+            {'source': 'conv1', 'target': 'relu1'},
+            {'source': 'relu1', 'target': 'pool1'},
+            {'source': 'pool1', 'target': 'flatten1'},
+            {'source': 'flatten1', 'target': 'linear1'}
+        ]
+    }
+
+
+def test_validate_cost_report():
+    """Test the report scales with batch size and dtype"""
+    graph = create_cnn_graph()
+    
+    result = GraphParser().validate(graph, cost_options={'batch_size': 32})
+    cost = result['cost']
+    total = cost['total']
+    
+    assert total['params'] == result['total_params'] == 80 + 1352 * 10 + 10
+    assert total['macs'] == 32 * (8 * 26 * 26 * 9 + 1352 * 10)
+    assert total['macs'] == sum(n['macs'] for n in cost['nodes'].values())
+    assert cost['nodes']['conv1']['output_shape'] == [32, 8, 26, 26]
+    # Flatten is a view, so it adds no activation memory
+    assert cost['nodes']['flatten1']['activation_bytes'] == 0
+    assert total['backward_bytes'] > total['activation_bytes'] + total['gradient_bytes']
+    
+    half = GraphParser().validate(graph, cost_options={'batch_size': 32, 'dtype': 'float16'})['cost']
+    assert half['total']['activation_bytes'] * 2 == total['activation_bytes']
+    
+    # Without cost_options validation stays cheap and returns no report
+    assert 'cost' not in GraphParser().validate(graph)
+
+
+def test_memory_limit_picks_batch_size():
+    """Test max_batch_size fits under the limit and the next size does not"""
+    graph = create_cnn_graph()
+    cost = GraphParser().validate(graph, cost_options={'memory_limit_mb': 64})['cost']
+    best = cost['max_batch_size']
+    
+    fits = GraphParser().validate(graph, cost_options={'batch_size': best})['cost']
+    over = GraphParser().validate(graph, cost_options={'batch_size': best + 1})['cost']
+    assert fits['total']['training_bytes'] <= 64 * 1024 ** 2 < over['total']['training_bytes']
+
+
+def test_session_cost_matches_full_validation():
+    """Test the incremental session keeps costs in step with edits"""
+    session = ValidationSession()
+    graph = create_cnn_graph()
+    session.validate(graph)
+    
+    edited = copy.deepcopy(graph)
+    edited['nodes'][1]['data']['params'].update(out_channels=4)
+    edited['nodes'][5]['data']['params'].update(in_features=4 * 13 * 13)
+    
+    options = {'batch_size': 16}
+    assert session.validate(edited, options)['cost'] == GraphParser().validate(edited, options)['cost']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,63 @@
+"""
+Unit tests for dataset_cache module
+"""
+
+import pytest
+import torch
+import dataset_cache
+
+
+@pytest.fixture
+def fake_dataset(monkeypatch):
+    calls = []
+
+    def loader(root, train, transform):
+        calls.append((train, transform))
+        return torch.arange(12).float().reshape(6, 2), torch.arange(6)
+
+    monkeypatch.setitem(dataset_cache.DATASET_LOADERS, 'fake', loader)
+    dataset_cache.clear_memory_cache()
+    yield calls
+    dataset_cache.clear_memory_cache()
+
+
+def test_memory_hit_skips_loader(fake_dataset, tmp_path):
+    """Test that a second request in the same process reuses the tensors"""
+    first = dataset_cache.get_dataset('fake', cache_dir=str(tmp_path))
+    second = dataset_cache.get_dataset('fake', cache_dir=str(tmp_path))
+
+    assert len(fake_dataset) == 1
+    assert first[0] is second[0]
+
+
+def test_snapshot_reloaded_with_mmap(fake_dataset, tmp_path):
+    """Test that a cold cache opens the on-disk snapshot instead of loading"""
+    data, targets = dataset_cache.get_dataset('fake', cache_dir=str(tmp_path))
+    dataset_cache.clear_memory_cache()
+
+    before = dataset_cache.cache_info()['disk_hits']
+    mapped, mapped_targets = dataset_cache.get_dataset('fake', cache_dir=str(tmp_path))
+
+    assert len(fake_dataset) == 1
+    assert dataset_cache.cache_info()['disk_hits'] == before + 1
+    assert torch.equal(mapped, data)
+    assert torch.equal(mapped_targets, targets)
+
+
+def test_splits_cached_separately(fake_dataset, tmp_path):
+    """Test that train/test splits and transforms are separate cache keys"""
+    dataset_cache.get_dataset('fake', train=True, cache_dir=str(tmp_path))
+    dataset_cache.get_dataset('fake', train=False, cache_dir=str(tmp_path))
+    dataset_cache.get_dataset('fake', train=False, transform='raw', cache_dir=str(tmp_path))
+
+    assert fake_dataset == [(True, 'normalize'), (False, 'normalize'), (False, 'raw')]
+
+
+def test_unknown_dataset():
+    """Test that unknown dataset names are rejected"""
+    with pytest.raises(ValueError):
+        dataset_cache.get_dataset('imagenet')
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,83 @@
+"""
+Unit tests for distributed_trainer module
+"""
+
+import pytest
+import torch
+from torch.utils.data import DataLoader, TensorDataset
+from distributed_trainer import DistributedTrainer, distributed_options, shard_loader
+from synthetic_data import SyntheticBatchLoader
+from tensor_data import TensorBatchLoader
+from graph_fixtures import mlp_graph
+
+
+GRAPH = mlp_graph()
+
+
+def test_options_split_cores():
+    """Test distributed options accept a worker count or a dict"""
+    assert distributed_options({'distributed': {'world_size': 3, 'threads_per_worker': 2}}) == \
+        {'world_size': 3, 'threads_per_worker': 2}
+    assert distributed_options({'distributed': 4})['world_size'] == 4
+
+
+def test_tensor_shards_partition_the_data():
+    """Test DistributedSampler shards cover every sample once per epoch"""
+    data = torch.arange(100).float().unsqueeze(1)
+    loader = TensorBatchLoader(data, torch.zeros(100, dtype=torch.long), batch_size=8, shuffle=True)
+    shards = [shard_loader(loader, rank, 4) for rank in range(4)]
+
+    seen = [int(x) for shard in shards for batch, _ in shard for x in batch[:, 0]]
+    assert sorted(seen) == list(range(100))
+    assert all(len(shard) == 4 for shard in shards)  # 25 samples each
+
+
+def test_dataloader_and_synthetic_shards():
+    """Test DataLoaders get a DistributedSampler and synthetic loaders split batches"""
+    dataset = TensorDataset(torch.arange(10).float(), torch.zeros(10, dtype=torch.long))
+    sharded = shard_loader(DataLoader(dataset, batch_size=2, shuffle=True), 1, 2)
+    assert len(list(sharded)) == 3  # 5 of 10 samples
+
+    loader = SyntheticBatchLoader([3], num_classes=2, num_samples=70, batch_size=10)
+    full = [batch for batch, _ in loader]
+    halves = [[batch for batch, _ in shard_loader(loader, rank, 2)] for rank in range(2)]
+    assert len(loader) == 7 and [len(h) for h in halves] == [4, 3]
+    assert all(torch.equal(a, b) for a, b in zip(halves[0], full[0::2]))
+
+
+def test_dataloader_shards_reshuffle_every_epoch():
+    """Test a sharded DataLoader sees a new order each epoch, like TensorBatchLoader"""
+    dataset = TensorDataset(torch.arange(64).float(), torch.zeros(64, dtype=torch.long))
+    sharded = shard_loader(DataLoader(dataset, batch_size=8, shuffle=True), 0, 2)
+    first, second = ([int(x) for batch, _ in sharded for x in batch] for _ in range(2))
+    assert len(first) == len(second) == 32 and first != second
+
+
+def test_two_workers_train_as_one_stream():
+    """Test gloo DDP training emits one merged epoch_end stream and returns the weights"""
+    epochs = []
+    config = {
+        'epochs': 2,
+        'lr': 0.01,
+        'dataset': {'name': 'synthetic', 'train_samples': 2048, 'test_samples': 512}
+    }
+    trainer = DistributedTrainer(world_size=2, threads_per_worker=1)
+    model, loss, accuracy = trainer.train(GRAPH, config, on_epoch_end=lambda *e: epochs.append(e))
+
+    assert [e[0] for e in epochs] == [1, 2]
+    assert (loss, accuracy) == epochs[-1][1:]
+    assert accuracy > 0.5  # chance is 0.25
+    assert set(trainer.epoch_timing) == {'data_time', 'compute_time', 'eval_time'}
+    x = torch.randn(8, 20)
+    assert model(x).shape == (8, 4)
+
+
+
+@pytest.mark.parametrize('option', ['checkpoint', 'compile', 'profile'])
+def test_unsupported_options_are_rejected(option):
+    """Test options the workers do not implement fail before any worker starts"""
+    with pytest.raises(ValueError, match=f'{option} not supported'):
+        DistributedTrainer(world_size=2).train(GRAPH, {'epochs': 1, option: True})
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,77 @@
+"""
+Unit tests for event_channel module
+"""
+
+import io
+import json
+import pytest
+from event_channel import EventChannel, decode_frame
+
+
+def test_binary_frame_round_trip():
+    """Test that batch_end series and regular events decode in order"""
+    stream = io.BytesIO()
+    channel = EventChannel(stream, encoding='binary', flush_interval=10)
+    for i in range(5):
+        channel.send('batch_end', {'job_id': 'job-1', 'batch': i, 'loss': 0.5 / (i + 1)})
+    channel.send('epoch_end', {'job_id': 'job-1', 'epoch': 1})
+    channel.close()
+
+    events = decode_frame(stream.getvalue())
+
+    assert [e['event'] for e in events] == ['batch_end'] * 5 + ['epoch_end']
+    assert events[3]['data'] == {'job_id': 'job-1', 'batch': 3, 'loss': 0.125}
+    assert isinstance(events[3]['data']['batch'], int)
+
+
+def test_json_encoding_coalesces_lines():
+    """Test that the json encoding keeps one event per line"""
+    stream = io.StringIO()
+    channel = EventChannel(stream, encoding='json', flush_interval=10)
+    channel.send('batch_end', {'batch': 0, 'loss': 1.5})
+    channel.send('ready', {'message': 'ok'})
+    channel.close()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    assert lines == [
+        {'event': 'batch_end', 'data': {'batch': 0, 'loss': 1.5}},
+        {'event': 'ready', 'data': {'message': 'ok'}},
+    ]
+
+
+def test_non_numeric_batch_end_is_sent_plain():
+    """Test that batch_end events with non-numeric fields bypass the series without raising"""
+    stream = io.BytesIO()
+    channel = EventChannel(stream, encoding='binary', flush_interval=10)
+    channel.send('batch_end', {'job_id': 'job-1', 'batch': 0, 'loss': 1.0})
+    channel.send('batch_end', {'job_id': 'job-1', 'batch': 1, 'loss': None})
+    channel.send('batch_end', {'job_id': 'job-1', 'batch': 2, 'loss': 'nan', 'done': True})
+    channel.send('batch_end', {'job_id': 'job-1', 'batch': 3, 'loss': 0.5})
+    channel.close()
+
+    assert [e['data'] for e in decode_frame(stream.getvalue())] == [
+        {'job_id': 'job-1', 'batch': 0, 'loss': 1.0},
+        {'job_id': 'job-1', 'batch': 1, 'loss': None},
+        {'job_id': 'job-1', 'batch': 2, 'loss': 'nan', 'done': True},
+        {'job_id': 'job-1', 'batch': 3, 'loss': 0.5},
+    ]
+
+
+def test_backlog_is_downsampled():
+    """Test that a lagging consumer sheds batch_end rows, keeping the latest"""
+    stream = io.BytesIO()
+    channel = EventChannel(stream, encoding='binary', flush_interval=10, max_pending_rows=100)
+    for i in range(1000):
+        channel.send('batch_end', {'batch': i, 'loss': 1.0})
+    channel.close()
+
+    batches = [e['data']['batch'] for e in decode_frame(stream.getvalue())]
+
+    assert len(batches) <= 100
+    assert batches[-1] == 999
+    assert batches == sorted(batches)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,142 @@
+"""
+Unit tests for graph_cache module
+"""
+
+import copy
+import pytest
+import torch
+import graph_cache
+from graph_parser import GraphParser
+from code_generator import CodeGenerator
+from model_builder import ModelBuilder
+from graph_fixtures import make_node, mlp_graph
+
+
+def renamed(graph, prefix='n_'):
+    """Same graph with new ids, moved nodes and reversed node/edge lists"""
+    graph = copy.deepcopy(graph)
+    for i, n in enumerate(graph['nodes']):
+        n['id'] = prefix + n['id']
+        n['position'] = {'x': 10 * i, 'y': 5}
+    for edge in graph['edges']:
+        edge['source'] = prefix + edge['source']
+        edge['target'] = prefix + edge['target']
+    graph['nodes'].reverse()
+    graph['edges'].reverse()
+    return graph
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    graph_cache.clear_cache()
+    yield
+    graph_cache.clear_cache()
+
+
+def test_digest_ignores_ids_and_layout():
+    """Test renaming, moving and reordering nodes keeps the digest"""
+    graph = mlp_graph()
+    assert graph_cache.graph_key(graph).digest == graph_cache.graph_key(renamed(graph)).digest
+
+
+def test_digest_tracks_params_and_input_order():
+    """Test param edits and swapped Concatenate inputs change the digest"""
+    narrow, wide = graph_cache.graph_key(mlp_graph(hidden=32)), graph_cache.graph_key(mlp_graph(hidden=64))
+    assert narrow.digest != wide.digest
+
+    graph = {
+        'nodes': [
+            make_node('input1', 'input', shape=[1, 8]),
+            make_node('a', 'linear', in_features=8, out_features=3),
+            make_node('b', 'linear', in_features=8, out_features=5),
+            make_node('cat', 'concatenate', dim=1),
+        ],
+        'edges': [
+            {'source': 'input1', 'target': 'a'},
+            {'source': 'input1', 'target': 'b'},
+            {'source': 'a', 'target': 'cat'},
+            {'source': 'b', 'target': 'cat'},
+        ]
+    }
+    swapped = copy.deepcopy(graph)
+    swapped['edges'][2:] = swapped['edges'][:1:-1]
+    assert graph_cache.graph_key(graph).digest != graph_cache.graph_key(swapped).digest
+
+
+def test_validation_hit_translates_ids():
+    """Test a cached result serves a renamed graph with its own ids"""
+    first = GraphParser()
+    expected = first.validate(mlp_graph(), use_cache=True)
+    hits = graph_cache.cache_info()['validation']['hits']
+    parser = GraphParser()
+    result = parser.validate(renamed(mlp_graph()), use_cache=True)
+
+    assert graph_cache.cache_info()['validation']['hits'] == hits + 1
+    assert result == expected
+    assert parser.node_shapes['n_linear1'] == [1, 32]
+    assert parser.get_execution_order() == ['n_' + n for n in first.get_execution_order()]
+
+
+def test_invalid_graphs_are_not_cached():
+    """Test errors are recomputed, since they name node ids"""
+    graph = mlp_graph()
+    graph['nodes'][3]['data']['params']['in_features'] = 31
+    for _ in range(2):
+        assert not GraphParser().validate(graph, use_cache=True)['valid']
+    assert graph_cache.cache_info()['validation']['size'] == 0
+
+
+def test_lru_eviction(monkeypatch):
+    """Test the least recently used entry is dropped past the limit"""
+    monkeypatch.setitem(graph_cache.MAX_ENTRIES, 'code', 2)
+    generator = CodeGenerator()
+    for hidden in (8, 16, 8, 32):
+        generator.generate(mlp_graph(hidden=hidden))
+
+    info = graph_cache.cache_info()['code']
+    assert info['size'] == 2
+    assert graph_cache.lookup('code', graph_cache.graph_key(mlp_graph(hidden=8)).digest) is not None
+    assert graph_cache.lookup('code', graph_cache.graph_key(mlp_graph(hidden=16)).digest) is None
+
+
+def test_cached_build_matches_fresh_build():
+    """Test a template rebuild re-initializes weights exactly like a fresh build"""
+    graph = {
+        'nodes': [
+            make_node('input1', 'input', shape=[1, 6, 16]),
+            make_node('lstm1', 'lstm', input_size=16, hidden_size=16),
+            make_node('attn1', 'multiheadattention', embed_dim=16, num_heads=4),
+            make_node('norm1', 'layernorm', normalized_shape=16),
+            make_node('flatten1', 'flatten'),
+            make_node('linear1', 'linear', in_features=96, out_features=10),
+        ],
+        'edges': [
+            {'source': 'input1', 'target': 'lstm1'},
+            {'source': 'lstm1', 'target': 'attn1'},
+            {'source': 'attn1', 'target': 'norm1'},
+            {'source': 'norm1', 'target': 'flatten1'},
+            {'source': 'flatten1', 'target': 'linear1'},
+        ]
+    }
+    builder = ModelBuilder()
+    torch.manual_seed(0)
+    fresh = builder.build_model(graph)
+    torch.manual_seed(0)
+    cached = builder.build_model(graph)
+    hits = graph_cache.cache_info()['module']['hits']
+    cached_again = builder.build_model(graph)
+
+    assert graph_cache.cache_info()['module']['hits'] == hits + 1
+    assert cached is not fresh
+    fresh_state, cached_state = fresh.state_dict(), cached.state_dict()
+    assert list(fresh_state) == list(cached_state)
+    for name in fresh_state:
+        assert torch.equal(fresh_state[name], cached_state[name]), name
+    assert not torch.equal(cached.layers['linear1'].weight, cached_again.layers['linear1'].weight)
+
+    x = torch.randn(2, 6, 16)
+    assert torch.allclose(fresh(x), cached(x))
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -2,8 +2,9 @@
 Unit tests for graph_parser module
 """
 
+import time
 import pytest
-from graph_parser import GraphParser
+from graph_parser import GraphParser, IndexedGraph
 from schema import NodeType
 
 
@@ -93,6 +94,7 @@ def test_cycle_detection():
     
     assert result['valid'] == False
     assert any('cycle' in err.lower() for err in result['errors'])
+    assert any('linear1 -> linear2 -> linear1' in err for err in result['errors'])
 
 
 def test_invalid_node_params():
@@ -121,5 +123,103 @@ def test_invalid_node_params():
     assert result['valid'] == False
 
 
+def test_indexed_graph_adjacency():
+    """Test CSR adjacency keeps edge order and drops unknown endpoints"""
+    edges = [
+        {'source': 'a', 'target': 'c'},
+        {'source': 'b', 'target': 'c'},
+        {'source': 'a', 'target': 'b'},
+        {'source': 'a', 'target': 'missing'}
+    ]
+    nodes = [{'id': node_id, 'type': 'relu'} for node_id in ('a', 'b', 'c')]
+    graph = IndexedGraph(nodes, edges)
+    
+    assert graph.successors(0) == [2, 1]
+    assert graph.predecessors(2) == [0, 1]
+    assert graph.in_degree(1) == 1
+    assert graph.topological_order() == [0, 1, 2]
+    assert graph.edge_errors == ['Edge references unknown target node: missing']
+
+
+def test_unknown_edge_endpoint():
+    """Test dangling edges are reported instead of crashing validation"""
+    graph = {
+        'nodes': [
+            {'id': 'input1', 'type': 'input', 'data': {'params': {'shape': [1, 10]}}}
+        ],
+        'edges': [
+            {'source': 'input1', 'target': 'gone'}
+        ]
+    }
+    
+    parser = GraphParser()
+    result = parser.validate(graph)
+    
+    assert result['valid'] == False
+    assert 'Edge references unknown target node: gone' in result['errors']
+
+
+def deep_chain(num_nodes):
+    """input -> relu -> relu -> ... with num_nodes nodes in total"""
+    nodes = [{'id': 'input1', 'type': 'input', 'data': {'params': {'shape': [1, 16]}}}]
+    edges = []
+    prev = 'input1'
+    for i in range(num_nodes - 1):
+        nodes.append({'id': f'relu{i}', 'type': 'relu', 'data': {'params': {}}})
+        edges.append({'source': prev, 'target': f'relu{i}'})
+        prev = f'relu{i}'
+    return {'nodes': nodes, 'edges': edges}
+
+
+def test_deep_chain_stress():
+    """Test a 100k-node chain validates without recursion"""
+    graph = deep_chain(100000)
+    
+    parser = GraphParser()
+    result = parser.validate(graph)
+    
+    assert result['valid'] == True
+    assert parser.node_shapes['relu99998'] == [1, 16]
+
+
+def test_deep_chain_cycle_stress():
+    """Test a cycle closing deep inside a 100k-node chain is found and named"""
+    graph = deep_chain(100000)
+    graph['edges'].append({'source': 'relu99998', 'target': 'relu99990'})
+    
+    parser = GraphParser()
+    result = parser.validate(graph)
+    
+    cycle_errors = [err for err in result['errors'] if 'cycle' in err]
+    assert result['valid'] == False
+    assert cycle_errors == [
+        'Graph contains cycles (must be DAG): relu99990 -> relu99991 -> relu99992 -> '
+        'relu99993 -> relu99994 -> relu99995 -> relu99996 -> ... -> relu99998 -> relu99990 (9 nodes)'
+    ]
+
+
+def validation_cpu_time(graph, repeats=3):
+    """Best-of-N CPU seconds for one uncached validation"""
+    times = []
+    for _ in range(repeats):
+        start = time.process_time()
+        GraphParser().validate(graph)
+        times.append(time.process_time() - start)
+    return min(times)
+
+
+@pytest.mark.parametrize('cyclic', [False, True])
+def test_validation_scales_linearly(cyclic):
+    """Test validation work grows linearly with chain length (4x nodes well under 16x time)"""
+    def graph(num_nodes):
+        chain = deep_chain(num_nodes)
+        if cyclic:
+            chain['edges'].append({'source': f'relu{num_nodes - 2}', 'target': f'relu{num_nodes - 10}'})
+        return chain
+
+    small, large = validation_cpu_time(graph(10000)), validation_cpu_time(graph(40000))
+    assert large < 10 * small  # linear is ~4-5x (cache effects), quadratic ~16x
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
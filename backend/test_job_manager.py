@@ -0,0 +1,66 @@
+"""
+Unit tests for job_manager module
+"""
+
+import threading
+import pytest
+from job_manager import JobManager
+
+
+class FakeEngine:
+    """Engine stand-in that spins until stop() is called"""
+
+    def __init__(self):
+        self.stop_requested = False
+        self.started = threading.Event()
+
+    def stop(self):
+        self.stop_requested = True
+
+    def run(self, job):
+        self.started.set()
+        while not self.stop_requested:
+            job.progress['batch'] = job.progress.get('batch', 0) + 1
+
+
+def test_stop_running_job():
+    """Test that stop() reaches the engine and the job reports stopped"""
+    manager = JobManager()
+    engine = FakeEngine()
+    job = manager.submit(engine, engine.run)
+
+    assert engine.started.wait(timeout=5)
+    assert job.is_active()
+    assert manager.stop() == [job.job_id]
+
+    job.join(timeout=5)
+    assert job.status == 'stopped'
+    assert manager.active_jobs() == []
+
+
+def test_status_reports_jobs():
+    """Test status summaries for finished and failed jobs"""
+    manager = JobManager()
+
+    def fail(job):
+        raise RuntimeError('boom')
+
+    ok = manager.submit(FakeEngine(), lambda job: None)
+    bad = manager.submit(FakeEngine(), fail)
+    manager.wait(timeout=5)
+
+    statuses = {s['job_id']: s for s in manager.status()}
+    assert statuses[ok.job_id]['status'] == 'completed'
+    assert statuses[bad.job_id]['status'] == 'failed'
+    assert statuses[bad.job_id]['error'] == 'boom'
+    assert manager.status('missing') == []
+
+
+def test_stop_unknown_job():
+    """Test stopping an unknown job id is a no-op"""
+    manager = JobManager()
+    assert manager.stop('job-404') == []
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,98 @@
+"""
+Unit tests for layer_profiler module
+"""
+
+import json
+import pytest
+import torch
+import torch.nn as nn
+from model_builder import ModelBuilder
+from layer_profiler import LayerProfiler
+from graph_fixtures import chain_graph, make_node
+
+
+GRAPH = chain_graph(
+    make_node('input1', 'input', shape=[1, 64]),
+    make_node('big', 'linear', in_features=64, out_features=512),
+    make_node('relu1', 'relu'),
+    make_node('small', 'linear', in_features=512, out_features=10),
+    make_node('output1', 'output'),
+)
+
+
+def run_steps(model, profiler, steps):
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.01)
+    done = False
+    for _ in range(steps):
+        x, y = torch.randn(32, 64), torch.randint(0, 10, (32,))
+        optimizer.zero_grad()
+        nn.functional.cross_entropy(model(x), y).backward()
+        optimizer.step()
+        done = profiler.step()
+    return done
+
+
+def hook_count(model):
+    return sum(
+        len(m._forward_hooks) + len(m._forward_pre_hooks) + len(m._backward_hooks)
+        + len(m._backward_pre_hooks)
+        for m in model.modules()
+    )
+
+
+def test_report_covers_every_node():
+    """Test forward/backward times are recorded per node and hooks are removed"""
+    model = ModelBuilder().build_model(GRAPH)
+    types = {n['id']: n['type'] for n in GRAPH['nodes']}
+    profiler = LayerProfiler(model, num_batches=3, node_types=types).start()
+    assert hook_count(model) > 0
+
+    assert run_steps(model, profiler, 3)
+    report = profiler.finish()
+
+    assert hook_count(model) == 0
+    assert report['batches'] == 3
+    assert set(report['nodes']) == {'big', 'relu1', 'small'}
+    for node_id, stats in report['nodes'].items():
+        assert stats['calls'] == 3
+        assert stats['forward_ms'] > 0
+        assert stats['backward_ms'] > 0, node_id
+    assert report['nodes']['big']['type'] == 'linear'
+    assert report['nodes']['big']['activation_bytes'] == 32 * 512 * 4
+    assert report['nodes']['small']['param_bytes'] == (512 * 10 + 10) * 4
+    assert sum(n['share'] for n in report['nodes'].values()) == pytest.approx(1.0)
+
+
+def test_hook_trace_is_chrome_format(tmp_path):
+    """Test the hook-based trace lists one complete event per call"""
+    model = ModelBuilder().build_model(GRAPH)
+    path = tmp_path / 'trace.json'
+    profiler = LayerProfiler(model, num_batches=2, trace_path=str(path)).start()
+    run_steps(model, profiler, 2)
+    report = profiler.finish()
+
+    trace = json.loads(path.read_text())
+    events = trace['traceEvents']
+    assert report['trace_path'] == str(path)
+    assert len(events) == 2 * 3 * 2  # batches x layers x (forward, backward)
+    assert {e['ph'] for e in events} == {'X'}
+    assert {e['cat'] for e in events} == {'forward', 'backward'}
+
+
+def test_torch_profiler_labels_nodes(tmp_path):
+    """Test the torch.profiler path reports ops and names node ranges in the trace"""
+    model = ModelBuilder().build_model(GRAPH)
+    path = tmp_path / 'trace.json'
+    profiler = LayerProfiler(model, num_batches=1, use_torch_profiler=True,
+                             trace_path=str(path)).start()
+    run_steps(model, profiler, 1)
+    report = profiler.finish()
+
+    assert report['ops']
+    assert report['nodes']['big']['calls'] == 1
+    names = {e.get('name') for e in json.loads(path.read_text())['traceEvents']}
+    assert 'node:big' in names
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,58 @@
+"""
+Unit tests for memory_planner module
+"""
+
+import pytest
+import torch
+import torch.nn as nn
+from memory_planner import plan_micro_batch, probe_bytes_per_sample
+
+
+def test_accumulation_steps_split_batch():
+    """Test that accumulation_steps alone sets the micro-batch size"""
+    plan = plan_micro_batch(256, accumulation_steps=4)
+
+    assert plan['micro_batch_size'] == 64
+    assert plan['accumulation_steps'] == 4
+
+
+def test_memory_cap_limits_micro_batch():
+    """Test that the memory cap shrinks the micro-batch to fit"""
+    plan = plan_micro_batch(
+        256,
+        max_memory_mb=10,
+        fixed_bytes=2 * 1024 ** 2,
+        bytes_per_sample=1024 ** 2
+    )
+
+    assert plan['micro_batch_size'] == 8
+    assert plan['accumulation_steps'] == 32
+    assert plan['estimated_peak_mb'] <= 10
+
+
+def test_memory_cap_below_footprint():
+    """Test that a cap smaller than one sample is rejected"""
+    with pytest.raises(ValueError):
+        plan_micro_batch(64, max_memory_mb=1, fixed_bytes=2 * 1024 ** 2, bytes_per_sample=1)
+
+
+def test_probe_scales_with_width():
+    """Test that wider activations report more bytes per sample"""
+    torch.manual_seed(0)
+    criterion = nn.CrossEntropyLoss()
+    data = torch.randn(16, 32)
+    target = torch.randint(0, 4, (16,))
+
+    narrow = nn.Sequential(nn.Linear(32, 64), nn.ReLU(), nn.Linear(64, 4))
+    wide = nn.Sequential(nn.Linear(32, 1024), nn.ReLU(), nn.Linear(1024, 4))
+
+    narrow_bytes = probe_bytes_per_sample(narrow, criterion, data, target)
+    wide_bytes = probe_bytes_per_sample(wide, criterion, data, target)
+
+    assert narrow_bytes > 0
+    assert wide_bytes > 4 * narrow_bytes
+    assert narrow[0].weight.grad is None  # probe runs on a copy
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
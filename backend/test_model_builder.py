@@ -0,0 +1,102 @@
+"""
+Unit tests for model_builder module
+"""
+
+import pytest
+import torch
+from model_builder import ModelBuilder
+from graph_fixtures import make_node
+
+
+def test_residual_graph():
+    """Test that an Add node sums a branch with its skip connection"""
+    graph = {
+        'nodes': [
+            make_node('input1', 'input', shape=[1, 16]),
+            make_node('linear1', 'linear', in_features=16, out_features=16),
+            make_node('relu1', 'relu'),
+            make_node('add1', 'add'),
+            make_node('output1', 'output'),
+        ],
+        'edges': [
+            {'source': 'input1', 'target': 'linear1'},
+            {'source': 'linear1', 'target': 'relu1'},
+            {'source': 'relu1', 'target': 'add1'},
+            {'source': 'input1', 'target': 'add1'},
+            {'source': 'add1', 'target': 'output1'},
+        ]
+    }
+
+    model = ModelBuilder().build_model(graph)
+    x = torch.randn(4, 16)
+    linear = model.layers['linear1']
+
+    expected = torch.relu(linear(x)) + x
+    assert torch.allclose(model(x), expected)
+
+
+def test_concatenate_uses_edge_order():
+    """Test that Concatenate stacks its inputs in edge order"""
+    graph = {
+        'nodes': [
+            make_node('input1', 'input', shape=[1, 8]),
+            make_node('a', 'linear', in_features=8, out_features=3),
+            make_node('b', 'linear', in_features=8, out_features=5),
+            make_node('cat', 'concatenate', dim=1),
+        ],
+        'edges': [
+            {'source': 'input1', 'target': 'a'},
+            {'source': 'input1', 'target': 'b'},
+            {'source': 'b', 'target': 'cat'},
+            {'source': 'a', 'target': 'cat'},
+        ]
+    }
+
+    model = ModelBuilder().build_model(graph)
+    x = torch.randn(2, 8)
+    out = model(x)
+
+    assert out.shape == (2, 8)
+    assert torch.allclose(out[:, :5], model.layers['b'](x))
+
+
+def test_chain_reuses_buffer_slots():
+    """Test that a long chain reuses a single activation slot"""
+    nodes = [make_node('input1', 'input', shape=[1, 4])]
+    edges = []
+    prev = 'input1'
+    for i in range(50):
+        node_id = f'linear{i}'
+        nodes.append(make_node(node_id, 'linear', in_features=4, out_features=4))
+        edges.append({'source': prev, 'target': node_id})
+        prev = node_id
+
+    model = ModelBuilder().build_model({'nodes': nodes, 'edges': edges})
+
+    assert model.num_slots == 1
+    assert model(torch.randn(3, 4)).shape == (3, 4)
+
+
+def test_unreachable_branch_is_pruned():
+    """Test that nodes not feeding the Output node are not executed"""
+    graph = {
+        'nodes': [
+            make_node('input1', 'input', shape=[1, 4]),
+            make_node('used', 'linear', in_features=4, out_features=2),
+            make_node('dead', 'linear', in_features=4, out_features=2),
+            make_node('output1', 'output'),
+        ],
+        'edges': [
+            {'source': 'input1', 'target': 'used'},
+            {'source': 'input1', 'target': 'dead'},
+            {'source': 'used', 'target': 'output1'},
+        ]
+    }
+
+    model = ModelBuilder().build_model(graph)
+
+    assert [step.node_id for step in model.steps] == ['used']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,115 @@
+"""
+Unit tests for model_compiler module
+"""
+
+import pytest
+import torch
+from model_builder import ModelBuilder
+from model_compiler import compile_for_eval, compile_model
+from training_engine import TrainingEngine
+from graph_fixtures import chain_graph, make_node
+
+
+def build_residual_mlp():
+    graph = {
+        'nodes': [
+            make_node('input1', 'input', shape=[1, 16]),
+            make_node('linear1', 'linear', in_features=16, out_features=16),
+            make_node('bn1', 'batchnorm', num_features=16),
+            make_node('relu1', 'relu'),
+            make_node('add1', 'add'),
+            make_node('linear2', 'linear', in_features=16, out_features=4),
+        ],
+        'edges': [
+            {'source': 'input1', 'target': 'linear1'},
+            {'source': 'linear1', 'target': 'bn1'},
+            {'source': 'bn1', 'target': 'relu1'},
+            {'source': 'relu1', 'target': 'add1'},
+            {'source': 'input1', 'target': 'add1'},
+            {'source': 'add1', 'target': 'linear2'},
+        ]
+    }
+    return ModelBuilder().build_model(graph)
+
+
+def test_fx_matches_eager_and_shares_parameters():
+    """Test that the fx module computes the same output and trains model"""
+    torch.manual_seed(0)
+    model = build_residual_mlp()
+    compiled, info = compile_model(model, mode='fx')
+    x = torch.randn(8, 16)
+
+    assert info['fallback'] is None
+    assert torch.allclose(compiled(x), model(x), atol=1e-6)
+
+    compiled(x).sum().backward()
+    assert model.layers['linear1'].weight.grad is not None
+
+
+def test_batchnorm_folded_only_in_eval():
+    """Test that Linear+BatchNorm is folded in eval mode but not in training"""
+    torch.manual_seed(0)
+    model = build_residual_mlp()
+    _, train_info = compile_model(model, mode='fx')
+    assert train_info['fused'] == []  # Linear+activation is left to inductor
+
+    model.eval()
+    compiled, eval_info = compile_model(model, mode='fx')
+    x = torch.randn(8, 16)
+
+    assert any('bn1' in f for f in eval_info['fused'])
+    assert torch.allclose(compiled(x), model(x), atol=1e-5)
+
+
+def test_eval_module_folds_batchnorm_of_current_weights():
+    """Test that the eval module folds BatchNorm and matches the model in eval mode"""
+    torch.manual_seed(0)
+    model = build_residual_mlp()
+    model(torch.randn(32, 16)).sum().backward()  # move the running stats
+    eval_module, fused = compile_for_eval(model)
+    x = torch.randn(8, 16)
+
+    assert any('bn1' in f for f in fused) and not model.training
+    assert 'bn1' not in dict(eval_module.named_modules())
+    assert torch.allclose(eval_module(x), model(x), atol=1e-5)
+
+
+def test_compiled_training_reports_eval_folds():
+    """Test that a compiled training run evaluates with BatchNorm folded"""
+    graph = chain_graph(
+        make_node('input1', 'input', shape=[1, 20]),
+        make_node('linear1', 'linear', in_features=20, out_features=16),
+        make_node('bn1', 'batchnorm', num_features=16),
+        make_node('relu1', 'relu'),
+        make_node('linear2', 'linear', in_features=16, out_features=4),
+        make_node('output1', 'output', numClasses=4),
+    )
+    config = {'epochs': 1, 'compile': True,
+              'dataset': {'name': 'synthetic', 'train_samples': 256, 'test_samples': 64}}
+    engine = TrainingEngine()
+    engine.train(graph, config)
+    assert engine.compile_info['fused'] == ['layers_linear1+layers_bn1']
+
+
+def test_script_warmup_covers_training_without_side_effects():
+    """Test that warming up a training model runs backward but keeps BatchNorm stats and grads clean"""
+    torch.manual_seed(0)
+    model = build_residual_mlp()
+    bn = model.layers['bn1']
+    stats = (bn.running_mean.clone(), bn.running_var.clone(), bn.num_batches_tracked.clone())
+    compiled, info = compile_model(model, mode='script', example_input=torch.randn(8, 16))
+
+    assert info['fallback'] is None and compiled.training
+    assert torch.equal(bn.running_mean, stats[0]) and torch.equal(bn.running_var, stats[1])
+    assert torch.equal(bn.num_batches_tracked, stats[2])
+    assert all(p.grad is None for p in model.parameters())
+
+
+def test_unknown_mode():
+    """Test that an unknown compile mode is rejected"""
+    with pytest.raises(ValueError):
+        compile_model(build_residual_mlp(), mode='turbo')
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
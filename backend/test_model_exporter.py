@@ -0,0 +1,80 @@
+"""
+Unit tests for model_exporter module
+"""
+
+import json
+import os
+import struct
+import pytest
+import torch
+import torch.nn as nn
+from model_exporter import ModelExporter, load_safetensors, load_weights, save_safetensors
+
+
+def make_model():
+    torch.manual_seed(0)
+    return nn.Sequential(nn.Linear(20, 32), nn.BatchNorm1d(32), nn.Linear(32, 4))
+
+
+def assert_same_state(expected, actual):
+    assert set(expected) == set(actual)
+    for name, tensor in expected.items():
+        assert actual[name].dtype == tensor.dtype
+        assert torch.equal(actual[name], tensor)
+
+
+def test_export_all_formats_round_trip(tmp_path):
+    """Test every weight format reloads the same state dict"""
+    model = make_model()
+    exporter = ModelExporter()
+    files = exporter.export(model, {'nodes': [], 'edges': []}, {'lr': 0.01}, str(tmp_path),
+                            formats=['pt', 'safetensors', 'sharded'], max_shard_mb=0.002)
+
+    for key in ('graph', 'weights', 'safetensors', 'shard_index', 'config', 'metadata'):
+        assert os.path.exists(files[key])
+    for fmt in ('weights', 'safetensors', 'shard_index'):
+        assert_same_state(model.state_dict(), load_weights(files[fmt]))
+
+    stats = exporter.write_stats
+    assert set(stats) == {'pt', 'safetensors', 'sharded'}
+    assert len(stats['sharded']['files']) > 2  # several shards plus the index
+    assert stats['safetensors']['bytes'] == os.path.getsize(files['safetensors'])
+    # A directory loads its most specific format (the shard index here)
+    assert_same_state(model.state_dict(), load_weights(str(tmp_path)))
+
+
+def test_default_export_keeps_model_pt(tmp_path):
+    """Test the default export writes only model.pt and unknown formats are rejected"""
+    files = ModelExporter().export(make_model(), {'nodes': [], 'edges': []}, {}, str(tmp_path))
+    assert os.path.basename(files['weights']) == 'model.pt'
+    assert not os.path.exists(tmp_path / 'model.safetensors')
+    with pytest.raises(ValueError):
+        ModelExporter().export(make_model(), {}, {}, str(tmp_path), formats=['onnx'])
+
+
+def test_safetensors_layout_and_mmap(tmp_path):
+    """Test the file follows the safetensors layout and loads without copying"""
+    path = str(tmp_path / 'w.safetensors')
+    tensors = {'mask': torch.tensor([True, False, True]), 'w': torch.randn(3, 5),
+               'half': torch.randn(7).to(torch.bfloat16), 'step': torch.tensor(4)}
+    size = save_safetensors(tensors, path)
+    assert size == os.path.getsize(path)
+
+    with open(path, 'rb') as f:
+        header_size = struct.unpack('<Q', f.read(8))[0]
+        header = json.loads(f.read(header_size))
+    assert header_size % 8 == 0
+    assert header['w'] == {'dtype': 'F32', 'shape': [3, 5], 'data_offsets': [8, 68]}
+    assert header['mask']['dtype'] == 'BOOL' and header['half']['dtype'] == 'BF16'
+
+    loaded = load_safetensors(path)
+    assert_same_state(tensors, loaded)
+    storages = {tensor.untyped_storage().data_ptr() for tensor in loaded.values()}
+    assert len(storages) == 1  # every tensor is a view of the one mapping
+
+    loaded['w'].zero_()  # private mapping: the file is unchanged
+    assert torch.equal(load_safetensors(path)['w'], tensors['w'])
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,116 @@
+"""
+Unit tests for schema module
+"""
+
+import pytest
+import torch
+from schema import NodeType, SHAPE_RULES, infer_output_shape
+from graph_parser import GraphParser
+from model_builder import ModelBuilder
+
+
+# (node type, params, input shapes) - inferred shapes are checked against
+# the module ModelBuilder actually builds
+MODULE_CASES = [
+    ('conv1d', {'in_channels': 3, 'out_channels': 8, 'kernel_size': 5, 'stride': 2, 'padding': 1}, [[2, 3, 50]]),
+    ('conv2d', {'in_channels': 1, 'out_channels': 4, 'kernel_size': 3}, [[2, 1, 28, 28]]),
+    ('conv2d', {'in_channels': 1, 'out_channels': 4, 'kernel_size': [3, 5], 'stride': [1, 2],
+                'padding': [1, 0], 'dilation': 2}, [[2, 1, 28, 31]]),
+    ('conv2d', {'in_channels': 2, 'out_channels': 4, 'kernel_size': 3, 'padding': 'same'}, [[1, 2, 9, 9]]),
+    ('conv3d', {'in_channels': 1, 'out_channels': 2, 'kernel_size': 3, 'stride': 2}, [[1, 1, 9, 10, 11]]),
+    ('convtranspose2d', {'in_channels': 4, 'out_channels': 2, 'kernel_size': 4}, [[1, 4, 7, 7]]),
+    ('convtranspose2d', {'in_channels': 4, 'out_channels': 2, 'kernel_size': 3, 'stride': 2,
+                         'padding': 1, 'output_padding': 1}, [[1, 4, 7, 7]]),
+    ('maxpool2d', {'kernel_size': 2}, [[2, 3, 28, 28]]),
+    ('maxpool2d', {'kernel_size': 3, 'stride': 2, 'padding': 1, 'ceil_mode': True}, [[2, 3, 10, 10]]),
+    ('maxpool2d', {'kernel_size': 2, 'dilation': 2, 'stride': 1}, [[1, 3, 9, 9]]),
+    ('avgpool2d', {'kernel_size': 3, 'stride': 2, 'ceil_mode': True}, [[2, 3, 10, 10]]),
+    ('adaptiveavgpool2d', {'output_size': [3, 4]}, [[2, 3, 10, 10]]),
+    ('linear', {'in_features': 16, 'out_features': 4}, [[2, 5, 16]]),
+    ('flatten', {}, [[2, 3, 4, 5]]),
+    ('lstm', {'input_size': 8, 'hidden_size': 6, 'bidirectional': True}, [[2, 7, 8]]),
+    ('gru', {'input_size': 8, 'hidden_size': 6, 'num_layers': 2}, [[2, 7, 8]]),
+    ('rnn', {'input_size': 8, 'hidden_size': 6}, [[2, 7, 8]]),
+    ('batchnorm', {'num_features': 6}, [[4, 6, 3]]),
+    ('layernorm', {'normalized_shape': [3, 4]}, [[2, 5, 3, 4]]),
+    ('groupnorm', {'num_groups': 2, 'num_channels': 6}, [[2, 6, 5, 5]]),
+    ('instancenorm', {'num_features': 6}, [[2, 6, 10]]),
+    ('softmax', {'dim': -1}, [[2, 10]]),
+    ('reshape', {'target_shape': [4, -1]}, [[2, 3, 8]]),
+    ('concatenate', {'dim': 1}, [[2, 3, 5], [2, 4, 5]]),
+    ('concatenate', {'dim': -1}, [[2, 3, 5], [2, 3, 1]]),
+    ('add', {}, [[2, 3, 5], [3, 1], [5]]),
+    ('multiply', {}, [[2, 1, 5], [2, 4, 1]]),
+    ('embedding', {'num_embeddings': 100, 'embedding_dim': 16}, [[2, 12]]),
+    ('multiheadattention', {'embed_dim': 16, 'num_heads': 4}, [[2, 7, 16]]),
+]
+
+
+@pytest.mark.parametrize('node_type,params,input_shapes', MODULE_CASES)
+def test_shape_matches_module(node_type, params, input_shapes):
+    """Test inferred shapes against a forward pass of the real module"""
+    node_type = NodeType(node_type)
+    module = ModelBuilder().layer_map[node_type](params).eval()
+    if node_type == NodeType.EMBEDDING:
+        inputs = [torch.randint(0, params['num_embeddings'], shape) for shape in input_shapes]
+    else:
+        inputs = [torch.randn(shape) for shape in input_shapes]
+    
+    with torch.no_grad():
+        expected = list(module(*inputs).shape)
+    
+    assert infer_output_shape(node_type, input_shapes, params) == expected
+
+
+def test_every_node_type_has_a_rule():
+    """Test no node type falls back to an implicit shape"""
+    assert set(SHAPE_RULES) == set(NodeType)
+
+
+@pytest.mark.parametrize('node_type,params,input_shapes,message', [
+    ('conv2d', {'in_channels': 3, 'out_channels': 4, 'kernel_size': 3}, [[1, 1, 28, 28]], 'in_channels=3'),
+    ('conv2d', {'in_channels': 1, 'out_channels': 4, 'kernel_size': 3}, [[1, 784]], '4-D'),
+    ('conv2d', {'in_channels': 1, 'out_channels': 4, 'kernel_size': 7}, [[1, 1, 5, 5]], 'does not fit'),
+    ('maxpool2d', {'kernel_size': 2, 'padding': 2}, [[1, 1, 8, 8]], 'half the kernel'),
+    ('linear', {'in_features': 100, 'out_features': 10}, [[1, 784]], 'in_features=100'),
+    ('lstm', {'input_size': 8, 'hidden_size': 4}, [[2, 8]], '3-D'),
+    ('reshape', {'target_shape': [5, 5]}, [[1, 784]], 'Cannot reshape'),
+    ('concatenate', {'dim': 1}, [[2, 3, 5], [2, 3, 6]], 'Cannot concatenate'),
+    ('add', {}, [[2, 3], [2, 4]], 'Cannot broadcast'),
+    ('multiheadattention', {'embed_dim': 10, 'num_heads': 3}, [[2, 7, 10]], 'divisible'),
+])
+def test_shape_errors(node_type, params, input_shapes, message):
+    """Test incompatible inputs are rejected with a readable reason"""
+    with pytest.raises(ValueError, match=message):
+        infer_output_shape(NodeType(node_type), input_shapes, params)
+
+
+def test_mismatch_fails_validation():
+    """Test a conv -> linear size mismatch is caught at validate time"""
+    def node(node_id, node_type, **params):
+        return {'id': node_id, 'type': node_type, 'data': {'params': params}}
+    
+    graph = {
+        'nodes': [
+            node('input1', 'input', shape=[1, 1, 28, 28]),
+            node('conv1', 'conv2d', in_channels=1, out_channels=8, kernel_size=3),
+            node('pool1', 'maxpool2d', kernel_size=2),
+            node('flatten1', 'flatten'),
+            node('linear1', 'linear', in_features=8 * 14 * 14, out_features=10)
+        ],
+        'edges': [
+            {'source': 'input1', 'target': 'conv1'},
+            {'source': 'conv1', 'target': 'pool1'},
+            {'source': 'pool1', 'target': 'flatten1'},
+            {'source': 'flatten1', 'target': 'linear1'}
+        ]
+    }
+    
+    result = GraphParser().validate(graph)
+    
+    assert result['valid'] == False
+    assert any('in_features=1568' in err and '1352' in err for err in result['errors'])
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,160 @@
+"""
+Unit tests for streaming_data module
+"""
+
+import threading
+import numpy as np
+import pytest
+import torch
+from streaming_data import (
+    NpySource, CsvSource, ImageFolderSource, StreamingBatchLoader, streaming_loaders
+)
+from training_engine import TrainingEngine
+from graph_fixtures import chain_graph, make_node
+
+
+def flat_graph(shape, features, classes=3):
+    return chain_graph(
+        make_node('input1', 'input', shape=[1, *shape]),
+        make_node('flatten1', 'flatten'),
+        make_node('linear1', 'linear', in_features=features, out_features=classes),
+        make_node('output1', 'output', numClasses=classes),
+    )
+
+
+@pytest.fixture
+def npy_files(tmp_path):
+    """1000 samples of shape [1, 2, 2]; every element of sample i equals i"""
+    n = 1000
+    data = np.repeat(np.arange(n, dtype=np.float32), 4).reshape(n, 1, 2, 2)
+    targets = np.arange(n) % 3
+    np.save(tmp_path / 'x.npy', data)
+    np.save(tmp_path / 'y.npy', targets)
+    return str(tmp_path / 'x.npy'), str(tmp_path / 'y.npy')
+
+
+def sample_ids(loader):
+    return [int(v) for data, _ in loader for v in data[:, 0, 0, 0]]
+
+
+def test_holdout_splits_cover_every_sample_once(npy_files):
+    """Test train/test holdout partitions the source and shuffles only train"""
+    options = {'data': npy_files[0], 'targets': npy_files[1], 'chunk_size': 64,
+               'shuffle_buffer': 128, 'validation_split': 0.1}
+    train_loader, test_loader = streaming_loaders('npy', flat_graph([1, 2, 2], 4), options,
+                                                  batch_size=32)
+    train_ids, test_ids = sample_ids(train_loader), sample_ids(test_loader)
+
+    assert sorted(train_ids + test_ids) == list(range(1000))
+    assert test_ids == list(range(0, 1000, 10))
+    assert train_ids != sorted(train_ids)
+    assert len(train_loader) == (900 + 31) // 32 and len(test_loader) == (100 + 31) // 32
+    assert sample_ids(train_loader) != train_ids  # new order each epoch
+
+
+def test_shuffle_is_seeded(npy_files):
+    """Test two loaders with the same seed produce the same order"""
+    def ids():
+        loader = StreamingBatchLoader(NpySource(*npy_files, chunk_size=50), batch_size=16,
+                                      shuffle=True, shuffle_buffer=200, seed=3)
+        return sample_ids(loader)
+    assert ids() == ids()
+
+
+def test_window_bounds_memory(npy_files):
+    """Test no more than the shuffle window plus one chunk is concatenated at once"""
+    loader = StreamingBatchLoader(NpySource(*npy_files, chunk_size=50), batch_size=16,
+                                  shuffle=True, shuffle_buffer=100, prefetch=0)
+    largest = []
+    emit = loader._emit
+
+    def tracking_emit(window_data, *args, **kwargs):
+        largest.append(sum(len(d) for d in window_data))
+        return (yield from emit(window_data, *args, **kwargs))
+    loader._emit = tracking_emit
+
+    assert len(sample_ids(loader)) == 1000
+    assert max(largest) < 100 + 50 + 16
+
+
+def test_early_break_stops_prefetch_thread(npy_files):
+    """Test abandoning an epoch releases the prefetch thread"""
+    loader = StreamingBatchLoader(NpySource(*npy_files, chunk_size=10), batch_size=4, prefetch=2)
+    for _ in loader:
+        break
+    assert not any(t.name == 'stream-prefetch' for t in threading.enumerate())
+
+
+@pytest.mark.parametrize('holdout', [None, (10, False), (10, True)])
+def test_sharded_length_counts_the_shards_chunks(npy_files, holdout):
+    """Test a shard's length matches what it yields when chunks do not divide evenly"""
+    source = NpySource(*npy_files, chunk_size=64)  # 15 full chunks and one of 40
+    shards = [StreamingBatchLoader(source, batch_size=16, shuffle=True, holdout=holdout,
+                                   prefetch=0).shard(rank, 3) for rank in range(3)]
+    for _ in range(3):
+        lengths = [shard.num_samples() for shard in shards]
+        batches = [len(shard) for shard in shards]
+        seen = [sample_ids(shard) for shard in shards]
+        assert lengths == [len(ids) for ids in seen]
+        assert batches == [(len(ids) + 15) // 16 for ids in seen]
+        assert sorted(sum(seen, [])) == sorted(sample_ids(StreamingBatchLoader(source, holdout=holdout)))
+
+
+def test_csv_rows_are_reshaped_to_input(tmp_path):
+    """Test flat CSV features fill the Input shape and a named target column works"""
+    path = tmp_path / 'train.csv'
+    rows = ['a,b,label,c,d'] + [f'{i},{i},{i % 3},{i},{i}' for i in range(50)]
+    path.write_text('\n'.join(rows))
+    source = CsvSource(str(path), target_column='label', chunk_size=8)
+    assert len(source) == 50
+
+    train_loader, test_loader = streaming_loaders(
+        'csv', flat_graph([1, 2, 2], 4), {'path': str(path), 'target_column': 'label', 'chunk_size': 8},
+        batch_size=10
+    )
+    data, targets = next(iter(test_loader))
+    assert data.shape == (5, 1, 2, 2) and data.dtype == torch.float32
+    assert torch.equal(targets, data[:, 0, 0, 0].long() % 3)
+
+
+def test_input_shape_mismatch_is_reported(npy_files):
+    """Test samples not matching the Input shape are rejected"""
+    with pytest.raises(ValueError, match=r'Input node expects samples of shape \[1, 3, 3\]'):
+        streaming_loaders('npy', flat_graph([1, 3, 3], 9), {'data': npy_files[0], 'targets': npy_files[1]})
+
+
+def test_labels_outside_num_classes_are_reported(npy_files):
+    """Test labels outside [0, num_classes) are rejected"""
+    loader = StreamingBatchLoader(NpySource(*npy_files), num_classes=2, prefetch=0)
+    with pytest.raises(ValueError, match='labels must be in'):
+        next(iter(loader))
+
+
+def test_image_folder_source(tmp_path):
+    """Test images are decoded, resized to the Input shape and labeled by folder"""
+    from PIL import Image
+    for label, color in (('cats', (255, 0, 0)), ('dogs', (0, 0, 255))):
+        (tmp_path / label).mkdir()
+        for i in range(3):
+            Image.new('RGB', (20, 12), color).save(tmp_path / label / f'{i}.png')
+
+    source = ImageFolderSource(str(tmp_path), [3, 8, 8], chunk_size=4)
+    loader = StreamingBatchLoader(source, batch_size=6)
+    data, targets = next(iter(loader))
+
+    assert source.classes == ['cats', 'dogs']
+    assert data.shape == (6, 3, 8, 8)
+    assert targets.tolist() == [0, 0, 0, 1, 1, 1]
+    assert torch.allclose(data[0, 0], torch.ones(8, 8)) and torch.allclose(data[5, 2], torch.ones(8, 8))
+
+
+def test_engine_trains_from_npy(npy_files):
+    """Test the npy source plugs into TrainingEngine"""
+    config = {'epochs': 1, 'batch_size': 50,
+              'dataset': {'name': 'npy', 'data': npy_files[0], 'targets': npy_files[1]}}
+    model, loss, accuracy = TrainingEngine().train(flat_graph([1, 2, 2], 4), config)
+    assert 0.0 <= accuracy <= 1.0
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
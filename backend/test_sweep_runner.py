@@ -0,0 +1,52 @@
+"""
+Unit tests for sweep_runner module
+"""
+
+import pytest
+import torch
+from sweep_runner import SweepRunner, expand_trials
+from graph_fixtures import mlp_graph
+
+
+GRAPH = mlp_graph()
+
+
+def test_grid_expands_product():
+    """Test grid search takes the product of list values and keeps scalars fixed"""
+    trials = expand_trials({'lr': [0.1, 0.01], 'optimizer': ['sgd', 'adam'], 'epochs': 1})
+    assert len(trials) == 4
+    assert {'lr': 0.01, 'optimizer': 'adam', 'epochs': 1} in trials
+
+
+def test_random_draws_are_seeded():
+    """Test random search draws reproducible trials within the given ranges"""
+    space = {'lr': {'log_uniform': [1e-4, 1e-1]}, 'batch_size': [32, 64], 'hidden': {'int': [8, 16]}}
+    trials = expand_trials(space, 'random', num_trials=5, seed=3)
+    assert trials == expand_trials(space, 'random', num_trials=5, seed=3)
+    assert all(1e-4 <= t['lr'] <= 1e-1 and t['batch_size'] in (32, 64) for t in trials)
+    with pytest.raises(ValueError):
+        expand_trials(space, 'random')
+
+
+def test_sweep_runs_trials_and_keeps_best():
+    """Test trials run in worker processes and stream events tagged with trial_id"""
+    events = []
+    config = {
+        'epochs': 1,
+        'dataset': {'name': 'synthetic', 'train_samples': 1024, 'test_samples': 256}
+    }
+    trials = expand_trials({'lr': [0.0, 0.01]})
+    runner = SweepRunner(max_workers=2)
+    summary = runner.run(GRAPH, config, trials, on_event=lambda t, d: events.append((t, d)))
+
+    assert [t['trial_id'] for t in summary['trials']] == [0, 1]
+    assert all(t['status'] == 'completed' and 'state' not in t for t in summary['trials'])
+    # lr=0 cannot learn, so the other trial wins
+    assert summary['best']['params'] == {'lr': 0.01}
+    epoch_events = [d for t, d in events if t == 'epoch_end']
+    assert sorted(d['trial_id'] for d in epoch_events) == [0, 1]
+    assert runner.best_model(GRAPH)(torch.randn(2, 20)).shape == (2, 4)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,88 @@
+"""
+Unit tests for synthetic_data module
+"""
+
+import pytest
+import torch
+from synthetic_data import SyntheticBatchLoader, infer_data_spec, synthetic_loaders
+from training_engine import TrainingEngine
+from graph_fixtures import chain_graph, make_node, mlp_graph
+
+
+def test_spec_follows_input_and_output_nodes():
+    """Test sample shape comes from Input and classes from Output numClasses"""
+    spec = infer_data_spec(mlp_graph(features=12, classes=3))
+    assert spec == {'sample_shape': [12], 'num_classes': 3, 'vocab_size': None}
+
+
+def test_embedding_input_gets_token_indices():
+    """Test a graph starting with Embedding is fed integer indices"""
+    graph = chain_graph(
+        make_node('input1', 'input', shape=[1, 8]),
+        make_node('emb', 'embedding', num_embeddings=50, embedding_dim=4),
+        make_node('flatten1', 'flatten'),
+        make_node('linear1', 'linear', in_features=32, out_features=5),
+    )
+    train_loader, _ = synthetic_loaders(graph, batch_size=16, train_samples=40)
+    data, targets = next(iter(train_loader))
+
+    assert data.dtype == torch.int64 and data.shape == (16, 8)
+    assert 0 <= data.min() and data.max() < 50
+    assert targets.max() < 5
+
+
+def test_output_without_num_classes_uses_its_width():
+    """Test an Output node without numClasses takes the class count from its inferred shape"""
+    graph = chain_graph(
+        make_node('input1', 'input', shape=[1, 8]),
+        make_node('linear1', 'linear', in_features=8, out_features=3),
+        make_node('output1', 'output'),
+    )
+    assert infer_data_spec(graph)['num_classes'] == 3
+
+    config = {'epochs': 1, 'dataset': {'name': 'synthetic', 'train_samples': 256, 'test_samples': 64}}
+    _, _, accuracy = TrainingEngine().train(graph, config)  # no out-of-range targets
+    assert 0.0 <= accuracy <= 1.0
+
+
+def test_batches_are_deterministic_and_lazy():
+    """Test batch i is reproducible, splits differ and the last batch is partial"""
+    loader = SyntheticBatchLoader([3, 4], num_classes=10, num_samples=100, batch_size=32, seed=7)
+    first = list(loader)
+    second = list(loader)
+
+    assert len(loader) == 4 and [len(t) for _, t in first] == [32, 32, 32, 4]
+    for (a, ta), (b, tb) in zip(first, second):
+        assert torch.equal(a, b) and torch.equal(ta, tb)
+    other = SyntheticBatchLoader([3, 4], num_classes=10, num_samples=100, batch_size=32, seed=8)
+    assert not torch.equal(next(iter(other))[0], first[0][0])
+
+
+def test_reuse_batch_serves_one_tensor():
+    """Test reuse_batch yields the same pre-generated batch every step"""
+    loader = SyntheticBatchLoader([5], num_classes=2, num_samples=64, batch_size=16, reuse_batch=True)
+    batches = list(loader)
+    assert len(batches) == 4
+    assert all(data is batches[0][0] for data, _ in batches)
+
+
+def test_engine_trains_offline_on_synthetic_data():
+    """Test the synthetic source trains without MNIST and its labels are learnable"""
+    torch.manual_seed(0)
+    config = {
+        'epochs': 3,
+        'lr': 0.01,
+        'dataset': {'name': 'synthetic', 'train_samples': 4096, 'test_samples': 1024}
+    }
+    _, _, accuracy = TrainingEngine().train(mlp_graph(hidden=64), config)
+    assert accuracy > 0.6  # chance is 0.25
+
+
+def test_unknown_dataset_is_rejected():
+    """Test an unknown dataset name is rejected"""
+    with pytest.raises(ValueError, match='Unknown dataset'):
+        TrainingEngine().train(mlp_graph(hidden=64), {'epochs': 1, 'dataset': 'nope'})
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
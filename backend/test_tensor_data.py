@@ -0,0 +1,42 @@
+"""
+Unit tests for tensor_data module
+"""
+
+import pytest
+import torch
+from tensor_data import TensorBatchLoader
+
+
+def test_shuffled_epoch_covers_every_sample_once():
+    """Test that a shuffled epoch is a permutation of the dataset"""
+    data = torch.arange(100).float().unsqueeze(1)
+    targets = torch.arange(100)
+    loader = TensorBatchLoader(data, targets, batch_size=32, shuffle=True,
+                               generator=torch.Generator().manual_seed(0))
+
+    batches = list(loader)
+    seen = torch.cat([t for _, t in batches])
+
+    assert len(batches) == len(loader) == 4
+    assert sorted(seen.tolist()) == list(range(100))
+    assert not torch.equal(seen, targets)
+    for x, t in batches:
+        assert torch.equal(x.squeeze(1).long(), t)
+
+
+def test_drop_last():
+    """Test that drop_last skips the final partial batch"""
+    loader = TensorBatchLoader(torch.zeros(100, 2), torch.zeros(100), batch_size=32, drop_last=True)
+
+    assert len(loader) == 3
+    assert [len(t) for _, t in loader] == [32, 32, 32]
+
+
+def test_length_mismatch():
+    """Test that data and targets must have the same length"""
+    with pytest.raises(ValueError):
+        TensorBatchLoader(torch.zeros(10, 2), torch.zeros(9))
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
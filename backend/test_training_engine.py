@@ -0,0 +1,170 @@
+"""
+Unit tests for training_engine module
+"""
+
+import math
+import pytest
+import torch
+import training_engine
+from graph_fixtures import chain_graph, make_node, mlp_graph
+from model_builder import ModelBuilder
+from tensor_data import TensorBatchLoader
+from training_engine import TrainingEngine
+
+
+SYNTHETIC = {'name': 'synthetic', 'train_samples': 256, 'test_samples': 64}
+
+
+def conv_graph():
+    return chain_graph(
+        make_node('input1', 'input', shape=[1, 3, 8, 8]),
+        make_node('conv1', 'conv2d', in_channels=3, out_channels=4, kernel_size=3, padding=1),
+        make_node('relu1', 'relu'),
+        make_node('flatten1', 'flatten'),
+        make_node('linear1', 'linear', in_features=256, out_features=4),
+        make_node('output1', 'output', numClasses=4),
+    )
+
+
+def test_cpu_amp_autocasts_to_bfloat16():
+    """Test amp: true on CPU autocasts the forward pass to bfloat16 without a GradScaler"""
+    engine = TrainingEngine()
+    engine.device = torch.device('cpu')
+    model = ModelBuilder().build_model(mlp_graph())
+    engine._setup_precision(model, {'amp': True})
+    assert engine.amp_dtype == torch.bfloat16 and engine.scaler is None
+
+    with engine._autocast():
+        output = model(torch.randn(8, 20))
+    assert output.dtype == torch.bfloat16
+
+    engine._setup_precision(model, {})
+    with engine._autocast():
+        assert model(torch.randn(8, 20)).dtype == torch.float32
+    with pytest.raises(ValueError):
+        engine._setup_precision(model, {'amp': 'int8'})
+
+
+@pytest.mark.filterwarnings('ignore::UserWarning')  # GradScaler without a CUDA device
+def test_fp16_uses_grad_scaler_only_on_cuda():
+    """Test float16 gets a GradScaler on CUDA and none on CPU"""
+    model = ModelBuilder().build_model(mlp_graph())
+    engine = TrainingEngine()
+    engine.device = torch.device('cpu')
+    engine._setup_precision(model, {'amp': 'fp16'})
+    assert engine.amp_dtype == torch.float16 and engine.scaler is None
+
+    engine.device = torch.device('cuda')
+    engine._setup_precision(model, {'amp': True})
+    assert engine.amp_dtype == torch.float16 and engine.scaler is not None
+
+
+def test_bf16_training_smoke():
+    """Test a CPU bf16 run trains and reports float metrics"""
+    torch.manual_seed(0)
+    engine = TrainingEngine()
+    engine.device = torch.device('cpu')
+    model, loss, accuracy = engine.train(mlp_graph(), {'epochs': 1, 'amp': 'bf16', 'dataset': SYNTHETIC})
+
+    assert engine.amp_dtype == torch.bfloat16
+    assert math.isfinite(loss) and 0.0 <= accuracy <= 1.0
+    assert all(p.dtype == torch.float32 for p in model.parameters())  # master weights stay fp32
+
+
+def test_channels_last_converts_model_and_inputs():
+    """Test channels_last applies to Conv2d models and their 4-D inputs only"""
+    engine = TrainingEngine()
+    engine.device = torch.device('cpu')
+    model, _, _ = engine.train(conv_graph(), {'epochs': 1, 'channels_last': True, 'dataset': SYNTHETIC})
+
+    assert engine.channels_last
+    assert model.layers['conv1'].weight.is_contiguous(memory_format=torch.channels_last)
+    data, _ = engine._to_device(torch.randn(2, 3, 8, 8), torch.zeros(2, dtype=torch.long))
+    assert data.is_contiguous(memory_format=torch.channels_last)
+
+    engine._setup_precision(ModelBuilder().build_model(mlp_graph()), {'channels_last': True})
+    assert not engine.channels_last  # no Conv2d, nothing to convert
+
+
+
+@pytest.mark.parametrize('cores, workers', [(16, 4), (6, 3), (1, 0)])
+def test_dataloader_workers_default_to_half_the_cores(monkeypatch, cores, workers):
+    """Test num_workers defaults to half the physical cores, capped at 4"""
+    monkeypatch.setattr(training_engine, 'get_cpu_counts',
+                        lambda: {'cores_physical': cores, 'cores_logical': 2 * cores})
+    engine = TrainingEngine()
+    engine.device = torch.device('cpu')
+    assert engine._dataloader_options({})['num_workers'] == workers
+
+
+def test_dataloader_options_follow_config():
+    """Test worker-only options are set with workers and omitted without them"""
+    engine = TrainingEngine()
+    engine.device = torch.device('cpu')
+    options = engine._dataloader_options({'num_workers': 2, 'prefetch_factor': 8,
+                                          'persistent_workers': False, 'drop_last': True})
+    assert options == {'num_workers': 2, 'pin_memory': False, 'drop_last': True,
+                       'prefetch_factor': 8, 'persistent_workers': False}
+    assert engine._dataloader_options({'num_workers': 2})['persistent_workers'] is True
+
+    options = engine._dataloader_options({'num_workers': 0, 'prefetch_factor': 8, 'pin_memory': True})
+    assert options == {'num_workers': 0, 'pin_memory': True, 'drop_last': False}
+
+    engine.device = torch.device('cuda')
+    assert engine._dataloader_options({'num_workers': 0})['pin_memory'] is True
+
+
+def test_epoch_timing_is_reported():
+    """Test every epoch_end sees data, compute and eval times for that epoch"""
+    engine = TrainingEngine()
+    timings = []
+    engine.train(mlp_graph(), {'epochs': 2, 'dataset': SYNTHETIC},
+                 on_epoch_end=lambda *e: timings.append(dict(engine.epoch_timing)))
+
+    assert len(timings) == 2
+    for timing in timings:
+        assert set(timing) == {'data_time', 'compute_time', 'eval_time'}
+        assert all(value >= 0.0 for value in timing.values()) and timing['compute_time'] > 0.0
+
+
+def epoch_setup(batches=10, batch_size=8):
+    torch.manual_seed(0)
+    engine = TrainingEngine()
+    engine.device = torch.device('cpu')
+    model = ModelBuilder().build_model(mlp_graph())
+    data, targets = torch.randn(batches * batch_size, 20), torch.randint(0, 4, (batches * batch_size,))
+    loader = TensorBatchLoader(data, targets, batch_size=batch_size)
+    return engine, model, loader
+
+
+def test_train_epoch_reads_the_loss_only_at_callbacks(monkeypatch):
+    """Test the loop calls .item() only for batch_end callbacks and the epoch mean"""
+    engine, model, loader = epoch_setup()
+    engine.batch_event_interval = 100  # longer than the epoch: one callback, at batch 0
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.01)  # Adam reads its step count
+    callbacks = []
+    reads = []
+    item = torch.Tensor.item
+    monkeypatch.setattr(torch.Tensor, 'item', lambda tensor: reads.append(1) or item(tensor))
+
+    engine._train_epoch(model, loader, optimizer, torch.nn.CrossEntropyLoss(),
+                        on_batch_end=lambda *args: callbacks.append(args))
+    monkeypatch.undo()
+
+    assert [args[0] for args in callbacks] == [0]
+    assert len(reads) == 2  # the callback's loss and the epoch sum
+
+
+def test_resumed_epoch_averages_the_batches_it_ran():
+    """Test the epoch loss of a resumed epoch is the mean over the batches it trained"""
+    engine, model, loader = epoch_setup()
+    criterion = torch.nn.CrossEntropyLoss()
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.0)  # weights stay put
+    with torch.no_grad():
+        expected = sum(criterion(model(data), target).item() for data, target in list(loader)[7:]) / 3
+
+    loss = engine._train_epoch(model, loader, optimizer, criterion, start_batch=7)
+    assert loss == pytest.approx(expected)
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,91 @@
+"""
+Unit tests for trial_scheduler module
+"""
+
+import pytest
+from trial_scheduler import ASHAScheduler, EarlyStopping, TrialScheduler, create_scheduler
+from training_engine import TrainingEngine
+from graph_fixtures import chain_graph, make_node
+
+
+GRAPH = chain_graph(
+    make_node('input1', 'input', shape=[1, 20]),
+    make_node('linear1', 'linear', in_features=20, out_features=4),
+    make_node('output1', 'output', numClasses=4),
+)
+
+
+def test_early_stopping_waits_for_patience():
+    """Test EarlyStopping stops only after patience epochs without min_delta improvement"""
+    scheduler = EarlyStopping(patience=2, min_delta=0.01)
+    losses = [1.0, 0.8, 0.795, 0.81]  # 0.795 is within min_delta
+    decisions = [scheduler.on_epoch_end(0, epoch, loss, 0.0) for epoch, loss in enumerate(losses, 1)]
+    assert decisions == [True, True, True, False]
+    assert scheduler.info(0) == {'scheduler': 'early_stopping', 'stopped_epoch': 4,
+                                 'best_epoch': 2, 'best_loss': 0.8}
+
+
+def test_early_stopping_tracks_trials_separately():
+    """Test each trial keeps its own best metric and patience"""
+    scheduler = EarlyStopping(patience=1, metric='accuracy')
+    assert scheduler.on_epoch_end(0, 1, 1.0, 0.5)
+    assert scheduler.on_epoch_end(1, 1, 1.0, 0.2)
+    assert scheduler.on_epoch_end(1, 2, 1.0, 0.3)
+    assert not scheduler.on_epoch_end(0, 2, 1.0, 0.4)
+
+
+def test_asha_prunes_below_rung_quantile():
+    """Test ASHA prunes trials outside the top 1/reduction_factor at a rung"""
+    scheduler = ASHAScheduler(max_epochs=9, grace_epochs=1, reduction_factor=3)
+    assert scheduler.rungs == [1, 3]
+    assert scheduler.on_epoch_end(0, 1, 0.5, 0.0)  # first at the rung always continues
+    assert not scheduler.on_epoch_end(1, 1, 0.9, 0.0)
+    assert scheduler.on_epoch_end(2, 1, 0.4, 0.0)
+    assert scheduler.on_epoch_end(1, 2, 0.1, 0.0)  # between rungs nothing is decided
+    assert scheduler.info(1) == {'scheduler': 'asha', 'stopped_epoch': 1}
+    assert scheduler.info(0) is None
+
+
+def test_create_scheduler_specs():
+    """Test scheduler specs map to the right scheduler and metric"""
+    assert create_scheduler(None, 10) is None
+    assert isinstance(create_scheduler(True, 10), EarlyStopping)
+    asha = create_scheduler({'reduction_factor': 2}, 8, default='asha', metric='accuracy')
+    assert isinstance(asha, ASHAScheduler) and asha.rungs == [1, 2, 4] and asha.metric == 'accuracy'
+    assert create_scheduler({'name': 'early_stopping', 'metric': 'loss'}, 5, metric='accuracy').metric == 'loss'
+    with pytest.raises(ValueError):
+        create_scheduler('hyperband', 10)
+
+
+def test_engine_stops_when_loss_plateaus():
+    """Test TrainingEngine ends the run early and still reports it as finished"""
+    epochs = []
+    engine = TrainingEngine()
+    config = {
+        'epochs': 10,
+        'lr': 0.0,  # nothing learns, so the test loss never improves
+        'early_stopping': {'patience': 2},
+        'dataset': {'name': 'synthetic', 'train_samples': 256, 'test_samples': 64}
+    }
+    engine.train(GRAPH, config, on_epoch_end=lambda *e: epochs.append(e[0]))
+
+    assert epochs == [1, 2, 3]
+    assert not engine.stop_requested
+    assert engine.scheduler_info['stopped_epoch'] == 3
+
+
+def test_engine_accepts_custom_scheduler():
+    """Test TrainingEngine stops when a custom scheduler says so"""
+    class StopAfterTwo(TrialScheduler):
+        def on_epoch_end(self, trial_id, epoch, loss, accuracy):
+            return epoch < 2
+
+    epochs = []
+    config = {'epochs': 5, 'dataset': {'name': 'synthetic', 'train_samples': 128, 'test_samples': 64}}
+    TrainingEngine().train(GRAPH, config, on_epoch_end=lambda *e: epochs.append(e[0]),
+                           scheduler=StopAfterTwo())
+    assert epochs == [1, 2]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,124 @@
+"""
+Unit tests for validation_session module
+"""
+
+import copy
+import random
+import pytest
+from graph_parser import GraphParser
+from validation_session import ValidationSession
+from graph_fixtures import make_node
+
+
+def chain_graph(depth=50, width=32):
+    """input -> flatten -> (linear -> relu) * depth"""
+    nodes = [make_node('input1', 'input', shape=[1, width]), make_node('flatten1', 'flatten')]
+    edges = [{'source': 'input1', 'target': 'flatten1'}]
+    prev = 'flatten1'
+    for i in range(depth):
+        nodes.append(make_node(f'linear{i}', 'linear', in_features=width, out_features=width))
+        nodes.append(make_node(f'relu{i}', 'relu'))
+        edges.append({'source': prev, 'target': f'linear{i}'})
+        edges.append({'source': f'linear{i}', 'target': f'relu{i}'})
+        prev = f'relu{i}'
+    return {'nodes': nodes, 'edges': edges}
+
+
+def assert_matches_full(session, graph):
+    result = session.validate(graph)
+    expected = GraphParser().validate(graph)
+    assert result['valid'] == expected['valid']
+    assert sorted(result['errors']) == sorted(expected['errors'])
+    assert result.get('total_params', 0) == expected.get('total_params', 0)
+    return result
+
+
+def test_moving_nodes_uses_fast_path():
+    """Test that a position-only change skips re-validation"""
+    session = ValidationSession()
+    graph = chain_graph()
+    assert session.validate(graph)['valid']
+
+    moved = copy.deepcopy(graph)
+    moved['nodes'][5]['position'] = {'x': 120, 'y': 40}
+    assert session.validate(moved)['valid']
+    assert session.stats['unchanged']
+
+
+def test_edit_only_reinfers_downstream_cone():
+    """Test that a parameter edit re-infers only the nodes downstream of it"""
+    session = ValidationSession()
+    graph = chain_graph(depth=50)
+    session.validate(graph)
+
+    # Near the end of the chain only a few nodes sit downstream
+    edited = copy.deepcopy(graph)
+    edited['nodes'][-2]['data']['params']['out_features'] = 16
+    assert_matches_full(session, edited)
+    assert session.stats['nodes_reinferred'] <= 3
+    assert not session.stats['order_rebuilt']
+
+
+def test_unchanged_shape_stops_propagation():
+    """Test that an edit keeping the output shape stops propagating"""
+    session = ValidationSession()
+    graph = chain_graph(depth=50)
+    session.validate(graph)
+
+    # Swapping an activation keeps the shape, so nothing downstream reruns
+    edited = copy.deepcopy(graph)
+    edited['nodes'][3]['type'] = 'sigmoid'
+    assert_matches_full(session, edited)
+    assert session.stats['nodes_reinferred'] == 1
+
+
+def test_cycle_is_reported_and_recovered():
+    """Test that a cycle is reported and the session recovers once it is removed"""
+    session = ValidationSession()
+    graph = chain_graph(depth=3)
+    session.validate(graph)
+
+    cyclic = copy.deepcopy(graph)
+    cyclic['edges'].append({'source': 'relu2', 'target': 'linear1'})
+    result = assert_matches_full(session, cyclic)
+    assert 'cycle' in ' '.join(result['errors']).lower()
+
+    assert assert_matches_full(session, graph)['valid']
+    assert session.stats['order_rebuilt']
+    order = session.get_execution_order()
+    assert order.index('linear0') < order.index('relu0') < order.index('linear1')
+
+
+def test_random_edits_match_full_validation():
+    """Test that random edits give the same result as a full validation"""
+    rng = random.Random(0)
+    session = ValidationSession()
+    graph = chain_graph(depth=8, width=16)
+    assert_matches_full(session, graph)
+
+    for step in range(200):
+        graph = copy.deepcopy(graph)
+        ids = [n['id'] for n in graph['nodes']]
+        action = rng.choice(['add_edge', 'remove_edge', 'add_node', 'remove_node', 'edit'])
+
+        if action == 'add_edge':
+            graph['edges'].append({'source': rng.choice(ids), 'target': rng.choice(ids)})
+        elif action == 'remove_edge' and graph['edges']:
+            graph['edges'].pop(rng.randrange(len(graph['edges'])))
+        elif action == 'add_node':
+            graph['nodes'].append(make_node(f'new{step}', rng.choice(['relu', 'linear', 'dropout']),
+                                       in_features=16, out_features=16, p=0.5))
+        elif action == 'remove_node' and len(ids) > 1:
+            # The editor drops a node's edges together with it
+            gone = graph['nodes'].pop(rng.randrange(1, len(ids)))['id']
+            graph['edges'] = [e for e in graph['edges'] if gone not in (e['source'], e['target'])]
+        else:
+            target = rng.choice(graph['nodes'])
+            if target['type'] == 'linear':
+                target['data']['params']['out_features'] = rng.choice([8, 16])
+
+        assert_matches_full(session, graph)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
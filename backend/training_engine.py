@@ -3,6 +3,8 @@ Training Engine
 Handles model training with MNIST dataset and real-time event streaming
 """
 
+import time
+import contextlib
 import torch
 import torch.nn as nn
 import torch.optim as optim
@@ -10,6 +12,59 @@ from torch.utils.data import DataLoader
 from torchvision import datasets, transforms
 from typing import Dict, Any, Callable, Optional
 from model_builder import ModelBuilder
+from model_compiler import compile_for_eval, compile_model
+from tensor_data import TensorBatchLoader
+from dataset_cache import get_dataset
+from system_info import get_cpu_counts
+from memory_planner import static_bytes, probe_bytes_per_sample, plan_micro_batch
+from layer_profiler import LayerProfiler
+from trial_scheduler import TrialScheduler, create_scheduler
+from checkpoint_manager import (CheckpointManager, checkpoint_dir, find_checkpoint, load_checkpoint,
+                                rng_state, set_rng_state, snapshot)
+from synthetic_data import synthetic_loaders
+from streaming_data import streaming_loaders
+
+
+def _mnist_source(engine, graph_data, config, options):
+    return engine._load_mnist_data(
+        batch_size=config.get('batch_size', 64),
+        data_mode=config.get('data_mode', 'tensor'),
+        loader_options=engine._dataloader_options(config)
+    )
+
+
+def _synthetic_source(engine, graph_data, config, options):
+    return synthetic_loaders(
+        graph_data,
+        batch_size=config.get('batch_size', 64),
+        train_samples=options.get('train_samples', 60000),
+        test_samples=options.get('test_samples', 10000),
+        seed=options.get('seed', 0),
+        drop_last=config.get('drop_last', False),
+        reuse_batch=options.get('reuse_batch', False),
+        device=engine.device
+    )
+
+
+def _streaming_source(kind: str):
+    def source(engine, graph_data, config, options):
+        return streaming_loaders(
+            kind, graph_data, options,
+            batch_size=config.get('batch_size', 64),
+            drop_last=config.get('drop_last', False)
+        )
+    return source
+
+
+# name -> source(engine, graph_data, config, options) returning
+# (train_loader, test_loader); options is config['dataset'] as a dict
+DATASET_SOURCES: Dict[str, Callable] = {
+    'mnist': _mnist_source,
+    'synthetic': _synthetic_source,
+    'npy': _streaming_source('npy'),
+    'csv': _streaming_source('csv'),
+    'image_folder': _streaming_source('image_folder'),
+}
 
 
 class TrainingEngine:
@@ -17,13 +72,29 @@ class TrainingEngine:
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         self.model = None
         self.stop_requested = False
+        self.compile_info = None
+        self.epoch_timing = {}
+        self.amp_dtype = None
+        self.scaler = None
+        self.channels_last = False
+        self.memory_plan = None
+        self.batch_event_interval = 100
+        self.profiler = None
+        self.profile_report = None
+        self.scheduler_info = None
+        self.checkpointer = None
+        self.checkpoint_info = None
+        self.checkpoint_every = None
         
     def train(
         self,
         graph_data: Dict[str, Any],
         config: Dict[str, Any],
         on_epoch_end: Optional[Callable] = None,
-        on_batch_end: Optional[Callable] = None
+        on_batch_end: Optional[Callable] = None,
+        on_profile_report: Optional[Callable] = None,
+        scheduler: Optional[TrialScheduler] = None,
+        resume=None
     ):
         """
         Train model with given configuration
@@ -33,6 +104,13 @@ class TrainingEngine:
             config: Training configuration
             on_epoch_end: Callback(epoch, loss, accuracy)
             on_batch_end: Callback(batch, total_batches, loss)
+            on_profile_report: Callback(report) once the batches requested by
+                config['profile'] are profiled (see LayerProfiler.report)
+            scheduler: Decides after each epoch whether to continue; built
+                from config['early_stopping'] when not given
+            resume: Checkpoint to continue from (loaded dict, file, or a
+                directory to take the newest from) - weights, optimizer,
+                RNG state and epoch/batch position
         
         Returns:
             (model, final_loss, final_accuracy)
@@ -42,42 +120,115 @@ class TrainingEngine:
         model = builder.build_model(graph_data)
         model = model.to(self.device)
         
+        # Precision / memory format
+        self._setup_precision(model, config)
+        if self.channels_last:
+            model = model.to(memory_format=torch.channels_last)
+        
         # Setup optimizer
         optimizer_name = config.get('optimizer', 'adam').lower()
-        lr = config.get('lr', 0.001)
-        
-        if optimizer_name == 'sgd':
-            optimizer = optim.SGD(model.parameters(), lr=lr)
-        elif optimizer_name == 'adam':
-            optimizer = optim.Adam(model.parameters(), lr=lr)
-        else:
-            optimizer = optim.Adam(model.parameters(), lr=lr)
+        optimizer = self._create_optimizer(model, config)
         
         # Loss function
         criterion = nn.CrossEntropyLoss()
         
-        # Load MNIST dataset
-        train_loader, test_loader = self._load_mnist_data(
-            batch_size=config.get('batch_size', 64)
-        )
+        # Load dataset (MNIST unless config['dataset'] names another source)
+        train_loader, test_loader = self._load_data(graph_data, config)
+        
+        # Optional compilation - the compiled module shares model's parameters
+        net = model
+        compile_mode = config.get('compile', False)
+        if compile_mode:
+            example_input, _ = next(iter(test_loader))
+            net, self.compile_info = compile_model(
+                model,
+                mode='fx' if compile_mode is True else compile_mode,
+                example_input=example_input.to(self.device)
+            )
+        
+        # Micro-batching: batch_size stays the optimizer-step batch
+        self.memory_plan = self._plan_memory(model, criterion, test_loader, optimizer_name, config)
+        
+        # Per-layer profiling of the first batches (no hooks otherwise)
+        self.profiler = self._setup_profiler(model, graph_data, config)
         
         # Training loop
+        self.batch_event_interval = max(1, int(config.get('batch_event_interval', 100)))
         epochs = config.get('epochs', 10)
         final_loss = 0.0
         final_accuracy = 0.0
+        scheduler = scheduler or create_scheduler(config.get('early_stopping'), epochs)
+        self.scheduler_info = None
+        
+        # Resume position: epoch to run and batches already done in it
+        start_epoch, start_batch = 1, 0
+        if resume is not None:
+            if isinstance(resume, str):
+                resume = load_checkpoint(find_checkpoint(resume))
+            start_epoch, start_batch = resume['epoch'], resume['batch']
+            final_loss, final_accuracy = resume['metrics']['loss'], resume['metrics']['accuracy']
+            self._restore_checkpoint(resume, model, optimizer, scheduler, train_loader)
+        
+        # Periodic checkpoints (config['checkpoint']), written in the background
+        self.checkpointer = self._setup_checkpoints(config)
+        self.checkpoint_info = None
+        position = {}
         
-        for epoch in range(1, epochs + 1):
+        def save_checkpoint():
+            self.checkpointer.save({
+                'graph_data': snapshot(graph_data),
+                'config': snapshot(config),
+                **position,
+                'model': snapshot(model.state_dict()),
+                'optimizer': snapshot(optimizer.state_dict()),
+                'scaler': self.scaler.state_dict() if self.scaler is not None else None,
+                'scheduler': scheduler.state_dict() if scheduler is not None else None,
+                'rng': rng_state(),
+                'metrics': {'loss': final_loss, 'accuracy': final_accuracy}
+            })
+        
+        def on_step(batches_done):
+            position['batch'] = batches_done
+            if self.checkpoint_every and batches_done % self.checkpoint_every == 0:
+                save_checkpoint()
+        
+        for epoch in range(start_epoch, epochs + 1):
             if self.stop_requested:
                 break
             
+            # The RNG state at epoch start reproduces the loader's shuffle
+            resuming = resume is not None and epoch == start_epoch
+            if resuming:
+                set_rng_state(resume['epoch_rng'])
+            position.update(epoch=epoch, batch=start_batch if resuming else 0, epoch_rng=rng_state())
+            
             # Train
             train_loss = self._train_epoch(
-                model, train_loader, optimizer, criterion,
-                on_batch_end=on_batch_end
+                net, train_loader, optimizer, criterion,
+                on_batch_end=on_batch_end,
+                start_batch=position['batch'],
+                start_rng=resume['rng'] if resuming and start_batch else None,
+                on_step=on_step if self.checkpointer is not None else None
             )
             
-            # Evaluate
-            test_loss, accuracy = self._evaluate(model, test_loader, criterion)
+            # An epoch shorter than the requested batches ends profiling too
+            if self.profiler is not None:
+                self._finish_profile()
+            if self.profile_report is not None and on_profile_report:
+                on_profile_report(self.profile_report)
+                on_profile_report = None
+            
+            # A stop mid-epoch keeps the metrics of the last full epoch
+            if self.stop_requested:
+                break
+            
+            # Evaluate (compiled runs fold BatchNorm into this epoch's weights)
+            eval_start = time.perf_counter()
+            eval_net = net
+            if compile_mode:
+                eval_net, self.compile_info['fused'] = compile_for_eval(model)
+            test_loss, accuracy = self._evaluate(eval_net, test_loader, criterion)
+            self.epoch_timing['eval_time'] = time.perf_counter() - eval_start
             
             final_loss = test_loss
             final_accuracy = accuracy
@@ -85,12 +236,237 @@ class TrainingEngine:
             # Callback
             if on_epoch_end:
                 on_epoch_end(epoch, test_loss, accuracy)
+            
+            # Early stop: the run completes with this epoch's metrics
+            proceed = scheduler is None or scheduler.on_epoch_end(0, epoch, test_loss, accuracy)
+            
+            if self.checkpointer is not None:
+                position.update(epoch=epoch + 1, batch=0, epoch_rng=rng_state())
+                save_checkpoint()
+            if not proceed:
+                break
         
+        if self.checkpointer is not None:
+            # A stopped run can be resumed from the batch it stopped at
+            if self.stop_requested and position:
+                save_checkpoint()
+            self.checkpointer.close()
+            self.checkpoint_info = self.checkpointer.info()
+        if scheduler is not None:
+            self.scheduler_info = scheduler.info(0)
         self.model = model
         return model, final_loss, final_accuracy
     
-    def _load_mnist_data(self, batch_size: int = 64):
-        """Load MNIST dataset"""
+    def _create_optimizer(self, model: nn.Module, config: Dict[str, Any]) -> optim.Optimizer:
+        """SGD or Adam (the default) at config['lr']"""
+        optimizer_name = config.get('optimizer', 'adam').lower()
+        lr = config.get('lr', 0.001)
+        
+        if optimizer_name == 'sgd':
+            return optim.SGD(model.parameters(), lr=lr)
+        return optim.Adam(model.parameters(), lr=lr)
+    
+    def _setup_profiler(self, model, graph_data, config) -> Optional[LayerProfiler]:
+        """
+        LayerProfiler for config['profile']: true, or a dict with batches
+        (default 20), torch_profiler (bool) and trace_path (Chrome trace)
+        """
+        self.profile_report = None
+        options = config.get('profile', False)
+        if not options:
+            return None
+        if not isinstance(options, dict):
+            options = {}
+        return LayerProfiler(
+            model,
+            num_batches=options.get('batches', 20),
+            node_types={n['id']: n['type'] for n in graph_data.get('nodes', [])},
+            use_torch_profiler=bool(options.get('torch_profiler', False)),
+            trace_path=options.get('trace_path')
+        ).start()
+    
+    def _finish_profile(self):
+        """Detach the profiler and keep its report"""
+        self.profile_report = self.profiler.finish()
+        self.profiler = None
+
+    def _setup_checkpoints(self, config: Dict[str, Any]) -> Optional[CheckpointManager]:
+        """
+        CheckpointManager for config['checkpoint']: true, or a dict with dir,
+        keep_last (default 3) and every_batches (default: epoch ends only)
+        """
+        options = config.get('checkpoint', False)
+        if not options:
+            return None
+        if not isinstance(options, dict):
+            options = {}
+        self.checkpoint_every = options.get('every_batches')
+        return CheckpointManager(checkpoint_dir(config), keep_last=options.get('keep_last', 3))
+
+    def _restore_checkpoint(self, checkpoint, model, optimizer, scheduler, train_loader):
+        """Load weights and training state saved by a previous run"""
+        model.load_state_dict(checkpoint['model'])
+        optimizer.load_state_dict(checkpoint['optimizer'])
+        if self.scaler is not None and checkpoint.get('scaler'):
+            self.scaler.load_state_dict(checkpoint['scaler'])
+        if scheduler is not None and checkpoint.get('scheduler'):
+            scheduler.load_state_dict(checkpoint['scheduler'])
+        # Loaders that reseed per epoch must pick up at the same epoch
+        if hasattr(train_loader, 'set_epoch'):
+            train_loader.set_epoch(checkpoint['epoch'] - 1)
+
+    def _setup_precision(self, model: nn.Module, config: Dict[str, Any]):
+        """
+        Configure mixed precision and channels_last from config
+        
+        amp: true picks bfloat16 on CPU and float16 (with GradScaler) on
+        CUDA; 'bf16'/'fp16' force a dtype. channels_last only applies to
+        models containing Conv2d layers.
+        """
+        amp = config.get('amp', False)
+        if amp is True:
+            amp = 'fp16' if self.device.type == 'cuda' else 'bf16'
+        if amp not in (False, None, 'bf16', 'fp16'):
+            raise ValueError(f'Unknown amp mode: {amp}')
+        
+        self.amp_dtype = {'bf16': torch.bfloat16, 'fp16': torch.float16}.get(amp)
+        # float16 gradients underflow without loss scaling
+        self.scaler = None
+        if self.amp_dtype == torch.float16 and self.device.type == 'cuda':
+            self.scaler = torch.amp.GradScaler('cuda')
+        
+        self.channels_last = bool(config.get('channels_last', False)) and any(
+            isinstance(m, nn.Conv2d) for m in model.modules()
+        )
+    
+    def _autocast(self):
+        """Autocast context for forward/loss (a no-op when amp is off)"""
+        if self.amp_dtype is None:
+            return contextlib.nullcontext()
+        return torch.autocast(device_type=self.device.type, dtype=self.amp_dtype)
+    
+    def _to_device(self, data, target):
+        """Move a batch to the training device in the model's memory format"""
+        if self.channels_last and data.dim() == 4:
+            data = data.to(self.device, memory_format=torch.channels_last, non_blocking=True)
+        else:
+            data = data.to(self.device, non_blocking=True)
+        return data, target.to(self.device, non_blocking=True)
+    
+    def _plan_memory(self, model, criterion, sample_loader, optimizer_name, config):
+        """
+        Pick the micro-batch size from accumulation_steps / max_memory_mb
+        
+        With max_memory_mb set, activation memory per sample is probed on a
+        copy of the model and the largest micro-batch that fits is used.
+        """
+        batch_size = config.get('batch_size', 64)
+        max_memory_mb = config.get('max_memory_mb')
+        
+        fixed = 0
+        per_sample = 0.0
+        if max_memory_mb is not None:
+            data, target = self._to_device(*next(iter(sample_loader)))
+            fixed = static_bytes(model, optimizer_name)
+            per_sample = probe_bytes_per_sample(model, criterion, data, target, self._autocast)
+        
+        return plan_micro_batch(
+            batch_size,
+            accumulation_steps=config.get('accumulation_steps', 1),
+            max_memory_mb=max_memory_mb,
+            fixed_bytes=fixed,
+            bytes_per_sample=per_sample
+        )
+    
+    def _micro_batches(self, data, target):
+        """Split a loader batch into micro-batches per the memory plan"""
+        micro = self.memory_plan['micro_batch_size'] if self.memory_plan else len(target)
+        if micro >= len(target):
+            return [(data, target)]
+        return list(zip(data.split(micro), target.split(micro)))
+    
+    def _dataloader_options(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        DataLoader settings from config, with defaults sized to the machine
+        
+        Workers default to half the physical cores (capped at 4) so the
+        remaining cores stay available for intra-op compute threads.
+        """
+        cores = get_cpu_counts()['cores_physical']
+        num_workers = config.get('num_workers')
+        if num_workers is None:
+            num_workers = min(4, cores // 2)
+        
+        options = {
+            'num_workers': num_workers,
+            'pin_memory': config.get('pin_memory', self.device.type == 'cuda'),
+            'drop_last': config.get('drop_last', False)
+        }
+        # Worker-only options are rejected by DataLoader when num_workers == 0
+        if num_workers > 0:
+            options['prefetch_factor'] = config.get('prefetch_factor', 2)
+            options['persistent_workers'] = config.get('persistent_workers', True)
+        return options
+    
+    def _load_data(self, graph_data: Dict[str, Any], config: Dict[str, Any]):
+        """
+        Train/test loaders from DATASET_SOURCES
+        
+        config['dataset'] is a source name or a dict with 'name' plus the
+        source's options, e.g. {'name': 'synthetic', 'train_samples': 10000,
+        'seed': 0, 'reuse_batch': False}.
+        """
+        options = config.get('dataset', 'mnist')
+        if not isinstance(options, dict):
+            options = {'name': options}
+        name = options.get('name', 'mnist')
+        if name not in DATASET_SOURCES:
+            raise ValueError(f'Unknown dataset: {name}')
+        return DATASET_SOURCES[name](self, graph_data, config, options)
+    
+    def _load_mnist_data(
+        self,
+        batch_size: int = 64,
+        data_mode: str = 'tensor',
+        loader_options: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Load MNIST dataset
+        
+        Args:
+            batch_size: Samples per batch
+            data_mode: 'tensor' keeps the decoded split in memory (on the
+                training device) and slices batches from it; 'dataloader'
+                uses torchvision transforms through a DataLoader
+            loader_options: DataLoader keyword arguments (see
+                _dataloader_options); only drop_last applies in tensor mode
+        """
+        loader_options = dict(loader_options or {})
+        drop_last = loader_options.pop('drop_last', False)
+        
+        if data_mode == 'tensor':
+            # Shared across train commands; snapshotted to disk for new processes
+            train_data, train_targets = get_dataset('mnist', train=True)
+            test_data, test_targets = get_dataset('mnist', train=False)
+            
+            train_loader = TensorBatchLoader(
+                train_data, train_targets,
+                batch_size=batch_size,
+                shuffle=True,
+                drop_last=drop_last,
+                device=self.device
+            )
+            test_loader = TensorBatchLoader(
+                test_data, test_targets,
+                batch_size=batch_size,
+                shuffle=False,
+                device=self.device
+            )
+            return train_loader, test_loader
+        
+        if data_mode != 'dataloader':
+            raise ValueError(f'Unknown data_mode: {data_mode}')
+        
         transform = transforms.Compose([
             transforms.ToTensor(),
             transforms.Normalize((0.1307,), (0.3081,))
@@ -113,13 +489,16 @@ class TrainingEngine:
         train_loader = DataLoader(
             train_dataset,
             batch_size=batch_size,
-            shuffle=True
+            shuffle=True,
+            drop_last=drop_last,
+            **loader_options
         )
         
         test_loader = DataLoader(
             test_dataset,
             batch_size=batch_size,
-            shuffle=False
+            shuffle=False,
+            **loader_options
         )
         
         return train_loader, test_loader
@@ -130,53 +509,119 @@ class TrainingEngine:
         train_loader,
         optimizer,
         criterion,
-        on_batch_end: Optional[Callable] = None
+        on_batch_end: Optional[Callable] = None,
+        start_batch: int = 0,
+        start_rng: Optional[Dict[str, Any]] = None,
+        on_step: Optional[Callable] = None
     ) -> float:
-        """Train for one epoch"""
+        """
+        Train for one epoch
+        
+        Per-batch losses stay on the device and are summed once at epoch
+        end; the host only reads a loss at the on_batch_end interval, so the
+        loop does not force a device sync per batch.
+        
+        A resumed epoch skips its first start_batch batches and restores
+        start_rng before the next one; on_step(batches_done) runs after
+        every optimizer step.
+        """
         model.train()
-        total_loss = 0.0
+        batch_losses = []
         total_batches = len(train_loader)
         
+        # Time blocked on the loader vs. time spent in the training step
+        data_time = 0.0
+        compute_time = 0.0
+        fetch_start = time.perf_counter()
+        
         for batch_idx, (data, target) in enumerate(train_loader):
             if self.stop_requested:
                 break
+            if batch_idx < start_batch:
+                fetch_start = time.perf_counter()
+                continue
+            if start_rng is not None:
+                set_rng_state(start_rng)
+                start_rng = None
             
-            data, target = data.to(self.device), target.to(self.device)
+            data, target = self._to_device(data, target)
+            compute_start = time.perf_counter()
+            data_time += compute_start - fetch_start
             
+            # Gradients of micro-batches accumulate; weighting each mean loss
+            # by its share of the batch reproduces the full-batch gradient
             optimizer.zero_grad()
-            output = model(data)
-            loss = criterion(output, target)
-            loss.backward()
-            optimizer.step()
+            micro_batches = self._micro_batches(data, target)
+            loss = None
+            for micro_data, micro_target in micro_batches:
+                with self._autocast():
+                    output = model(micro_data)
+                    micro_loss = criterion(output, micro_target)
+                if len(micro_batches) > 1:
+                    micro_loss = micro_loss * (len(micro_target) / len(target))
+                
+                if self.scaler is not None:
+                    self.scaler.scale(micro_loss).backward()
+                else:
+                    micro_loss.backward()
+                loss = micro_loss.detach() if loss is None else loss + micro_loss.detach()
             
-            total_loss += loss.item()
+            if self.scaler is not None:
+                self.scaler.step(optimizer)
+                self.scaler.update()
+            else:
+                optimizer.step()
             
-            # Callback every 100 batches
-            if on_batch_end and batch_idx % 100 == 0:
+            batch_losses.append(loss)
+            
+            if self.profiler is not None and self.profiler.step():
+                self._finish_profile()
+            
+            # Callback every batch_event_interval batches (100 by default)
+            if on_batch_end and batch_idx % self.batch_event_interval == 0:
                 on_batch_end(batch_idx, total_batches, loss.item())
+            if on_step is not None:
+                on_step(batch_idx + 1)
+            
+            fetch_start = time.perf_counter()
+            compute_time += fetch_start - compute_start
         
-        return total_loss / len(train_loader)
+        self.epoch_timing = {
+            'data_time': data_time,
+            'compute_time': compute_time
+        }
+        
+        if not batch_losses:
+            return 0.0
+        # A resumed or stopped epoch ran fewer than len(train_loader) batches
+        return torch.stack(batch_losses).sum().item() / len(batch_losses)
     
     def _evaluate(self, model, test_loader, criterion) -> tuple:
-        """Evaluate model on test set"""
+        """Evaluate model on test set (sums stay on the device until the end)"""
         model.eval()
-        test_loss = 0.0
-        correct = 0
+        losses = []
+        corrects = []
         total = 0
         
         with torch.no_grad():
             for data, target in test_loader:
-                data, target = data.to(self.device), target.to(self.device)
-                output = model(data)
+                if self.stop_requested:
+                    break
                 
-                test_loss += criterion(output, target).item()
+                data, target = self._to_device(data, target)
+                with self._autocast():
+                    output = model(data)
+                    loss = criterion(output, target)
                 
-                pred = output.argmax(dim=1, keepdim=True)
-                correct += pred.eq(target.view_as(pred)).sum().item()
+                losses.append(loss)
+                corrects.append((output.argmax(dim=1) == target).sum())
                 total += target.size(0)
         
-        test_loss /= len(test_loader)
-        accuracy = correct / total
+        if not losses:
+            return 0.0, 0.0
+        
+        test_loss = torch.stack(losses).float().sum().item() / len(test_loader)
+        accuracy = torch.stack(corrects).sum().item() / total
         
         return test_loss, accuracy
     
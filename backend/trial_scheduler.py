@@ -0,0 +1,172 @@
+"""
+Trial Scheduler
+Decides after each epoch whether a training run keeps going
+
+A scheduler sees every trial's test metrics through on_epoch_end and
+returns False to cut a trial short. EarlyStopping stops a run whose
+metric has not improved for `patience` epochs; ASHAScheduler
+(asynchronous successive halving) stops sweep trials that fall outside
+the top 1/reduction_factor of the trials that reached the same epoch.
+"""
+
+import copy
+import numpy as np
+from typing import Dict, List, Any, Optional
+
+
+class TrialScheduler:
+    """
+    Base scheduler: never stops a trial
+
+    Subclasses override on_epoch_end. Scores are oriented so that higher
+    is better: accuracy as is, loss negated.
+    """
+
+    def __init__(self, metric: str = 'loss'):
+        if metric not in ('loss', 'accuracy'):
+            raise ValueError(f'Unknown scheduler metric: {metric}')
+        self.metric = metric
+
+    def on_epoch_end(self, trial_id: int, epoch: int, loss: float, accuracy: float) -> bool:
+        """Record a trial's epoch; False means stop the trial now"""
+        return True
+
+    def info(self, trial_id: int) -> Optional[Dict[str, Any]]:
+        """What the scheduler decided about a trial (None if nothing)"""
+        return None
+
+    def state_dict(self) -> Dict[str, Any]:
+        """Per-trial decision state, for checkpoints"""
+        return copy.deepcopy({key: value for key, value in vars(self).items() if key.startswith('_')})
+
+    def load_state_dict(self, state: Dict[str, Any]):
+        self.__dict__.update(copy.deepcopy(state))
+
+    def _score(self, loss: float, accuracy: float) -> float:
+        return accuracy if self.metric == 'accuracy' else -loss
+
+
+class EarlyStopping(TrialScheduler):
+    """Stop a trial after `patience` epochs without a min_delta improvement"""
+
+    def __init__(self, patience: int = 3, min_delta: float = 0.0, metric: str = 'loss'):
+        super().__init__(metric)
+        if patience < 1:
+            raise ValueError(f'patience must be at least 1, got {patience}')
+        self.patience = patience
+        self.min_delta = min_delta
+        self._trials: Dict[int, Dict[str, Any]] = {}
+
+    def on_epoch_end(self, trial_id, epoch, loss, accuracy):
+        score = self._score(loss, accuracy)
+        state = self._trials.setdefault(trial_id, {'best': None, 'best_epoch': 0, 'bad_epochs': 0,
+                                                   'stopped_epoch': None})
+        if state['best'] is None or score > state['best'] + self.min_delta:
+            state.update(best=score, best_epoch=epoch, bad_epochs=0)
+            return True
+        state['bad_epochs'] += 1
+        if state['bad_epochs'] >= self.patience:
+            state['stopped_epoch'] = epoch
+            return False
+        return True
+
+    def info(self, trial_id):
+        state = self._trials.get(trial_id)
+        if state is None:
+            return None
+        best = state['best'] if self.metric == 'accuracy' else -state['best']
+        return {
+            'scheduler': 'early_stopping',
+            'stopped_epoch': state['stopped_epoch'],
+            'best_epoch': state['best_epoch'],
+            f'best_{self.metric}': best
+        }
+
+
+class ASHAScheduler(TrialScheduler):
+    """
+    Asynchronous successive halving across concurrent trials
+
+    Rungs sit at grace_epochs * reduction_factor**k epochs below
+    max_epochs. A trial reaching a rung continues only if its score is
+    at least the (1 - 1/reduction_factor) quantile of the scores recorded
+    at that rung so far, so roughly 1/reduction_factor of the trials
+    survive each rung. Decisions never wait for other trials; the first
+    trials at a rung always continue.
+    """
+
+    def __init__(
+        self,
+        max_epochs: int,
+        grace_epochs: int = 1,
+        reduction_factor: int = 3,
+        metric: str = 'loss'
+    ):
+        super().__init__(metric)
+        if grace_epochs < 1 or reduction_factor < 2:
+            raise ValueError('ASHA needs grace_epochs >= 1 and reduction_factor >= 2')
+        self.reduction_factor = reduction_factor
+        self.rungs: List[int] = []
+        rung = grace_epochs
+        while rung < max_epochs:
+            self.rungs.append(rung)
+            rung *= reduction_factor
+        self._recorded: Dict[int, List[float]] = {rung: [] for rung in self.rungs}
+        self._stopped: Dict[int, int] = {}
+
+    def on_epoch_end(self, trial_id, epoch, loss, accuracy):
+        if epoch not in self._recorded:
+            return True
+        score = self._score(loss, accuracy)
+        recorded = self._recorded[epoch]
+        recorded.append(score)
+        cutoff = np.percentile(recorded, (1 - 1 / self.reduction_factor) * 100)
+        if score < cutoff:
+            self._stopped[trial_id] = epoch
+            return False
+        return True
+
+    def info(self, trial_id):
+        if trial_id not in self._stopped:
+            return None
+        return {'scheduler': 'asha', 'stopped_epoch': self._stopped[trial_id]}
+
+
+# name -> factory(max_epochs, options) returning a TrialScheduler
+SCHEDULERS = {
+    'early_stopping': lambda max_epochs, options: EarlyStopping(
+        patience=options.get('patience', 3),
+        min_delta=options.get('min_delta', 0.0),
+        metric=options.get('metric', 'loss')
+    ),
+    'asha': lambda max_epochs, options: ASHAScheduler(
+        max_epochs,
+        grace_epochs=options.get('grace_epochs', 1),
+        reduction_factor=options.get('reduction_factor', 3),
+        metric=options.get('metric', 'loss')
+    ),
+}
+
+
+def create_scheduler(spec, max_epochs: int, default: str = 'early_stopping',
+                     metric: Optional[str] = None) -> Optional[TrialScheduler]:
+    """
+    Scheduler for a config value
+
+    spec is falsy (no scheduler), true (the default scheduler), a name
+    from SCHEDULERS, or a dict with 'name' and the scheduler's options.
+    metric fills in the options' metric when they do not set one.
+    """
+    if not spec:
+        return None
+    if spec is True:
+        options = {'name': default}
+    elif isinstance(spec, str):
+        options = {'name': spec}
+    else:
+        options = {'name': default, **spec}
+    if metric and 'metric' not in options:
+        options['metric'] = metric
+    if options['name'] not in SCHEDULERS:
+        raise ValueError(f"Unknown scheduler: {options['name']}")
+    return SCHEDULERS[options['name']](max_epochs, options)
@@ -0,0 +1,394 @@
+"""
+Validation Session
+Incremental graph validation for a graph that is edited one step at a time
+
+The UI sends the whole graph on every edit. A session keeps what it
+learned from the previous graph and diffs against it:
+    - nodes whose type/params did not change keep their validation result
+    - the topological order is patched per added edge (Pearce-Kelly) and
+      only rebuilt after the graph was cyclic
+    - shapes are re-inferred from the changed nodes downstream, stopping
+      wherever a recomputed shape matches the cached one
+
+Moving a node (positions only) hits the unchanged-graph fast path.
+Results match GraphParser.validate.
+"""
+
+import heapq
+from collections import Counter
+from typing import Dict, List, Any, Optional, Tuple
+from schema import NodeType
+from graph_parser import (
+    GraphParser, IndexedGraph, NODE_TYPES, node_params, infer_node_shape,
+    connection_error, cycle_error
+)
+from cost_model import count_node_params, node_cost, summarize_costs
+
+
+def _node_key(node: Dict[str, Any]) -> Tuple[Any, Dict[str, Any]]:
+    """Everything validation depends on (positions and labels excluded)"""
+    # Compared with ==, never hashed; the copy guards against later edits
+    return node.get('type'), dict(node_params(node))
+
+
+class ValidationSession:
+    """Stateful validator; feed it successive versions of one graph"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Forget the previous graph; the next validate starts from scratch"""
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.keys: Dict[str, Tuple[Any, Dict[str, Any]]] = {}
+        self.node_index: Dict[str, int] = {}
+        self.edge_pairs: List[Tuple[Any, Any]] = []
+        self.preds: Dict[str, List[str]] = {}
+        self.succs: Dict[str, List[str]] = {}
+        self.valid_pairs: Counter = Counter()
+
+        self.node_errors: Dict[str, List[str]] = {}
+        self.conn_errors: Dict[str, str] = {}
+        self.bad_types = set()
+        self.input_ids = set()
+
+        self.node_shapes: Dict[str, List[int]] = {}
+        self.shape_errors: Dict[str, str] = {}
+        # Per-sample costs, refreshed together with the node's shape
+        self.node_costs: Dict[str, Dict[str, int]] = {}
+        self.shapes_dirty = True
+
+        self.param_counts: Dict[str, int] = {}
+        self.total_params = 0
+
+        # Topological order with None holes left by removed nodes
+        self.order: Optional[List[Optional[str]]] = None
+        self.pos: Dict[str, int] = {}
+
+        self.last_result: Optional[Dict[str, Any]] = None
+        self.stats: Dict[str, Any] = {}
+
+    def validate(
+        self,
+        graph_data: Dict[str, Any],
+        cost_options: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Validate the next version of the graph
+
+        Returns:
+            Same dict as GraphParser.validate (cost_options likewise)
+        """
+        nodes = graph_data.get('nodes', [])
+        edges = graph_data.get('edges', [])
+
+        if not nodes:
+            self.reset()
+            return {'valid': False, 'errors': ['Graph has no nodes']}
+
+        id_errors = []
+        new_nodes, new_keys, node_index = {}, {}, {}
+        for node in nodes:
+            node_id = node.get('id')
+            if not node_id:
+                id_errors.append('Node missing id')
+                continue
+            new_nodes[node_id] = node
+            new_keys[node_id] = _node_key(node)
+            node_index[node_id] = len(node_index)
+        edge_pairs = [(e.get('source'), e.get('target')) for e in edges]
+
+        if (self.last_result is not None and not id_errors
+                and new_keys == self.keys and edge_pairs == self.edge_pairs):
+            self.nodes = new_nodes
+            self.stats = {'unchanged': True, 'order_rebuilt': False, 'nodes_reinferred': 0}
+            return self._result(cost_options)
+
+        removed = [n for n in self.keys if n not in new_keys]
+        added = [n for n in new_keys if n not in self.keys]
+        changed = [n for n in new_keys if n in self.keys and self.keys[n] != new_keys[n]]
+
+        # Adjacency over edges whose endpoints both exist
+        edge_errors = []
+        preds = {n: [] for n in new_nodes}
+        succs = {n: [] for n in new_nodes}
+        valid_pairs = []
+        for source, target in edge_pairs:
+            if source not in new_nodes:
+                edge_errors.append(f'Edge references unknown source node: {source}')
+                continue
+            if target not in new_nodes:
+                edge_errors.append(f'Edge references unknown target node: {target}')
+                continue
+            preds[target].append(source)
+            succs[source].append(target)
+            valid_pairs.append((source, target))
+
+        rewired = [n for n in new_nodes if preds[n] != self.preds.get(n)]
+        new_pair_counts = Counter(valid_pairs)
+        added_pairs = list((new_pair_counts - self.valid_pairs).elements())
+
+        self.nodes, self.keys, self.node_index = new_nodes, new_keys, node_index
+        self.edge_pairs, self.preds, self.succs = edge_pairs, preds, succs
+        self.valid_pairs = new_pair_counts
+
+        for node_id in removed:
+            for table in (self.node_errors, self.conn_errors, self.node_shapes,
+                          self.shape_errors, self.node_costs):
+                table.pop(node_id, None)
+            self.bad_types.discard(node_id)
+            self.input_ids.discard(node_id)
+            self.total_params -= self.param_counts.pop(node_id, 0)
+
+        for node_id in added + changed:
+            self._update_node(node_id)
+
+        for node_id in set(added + changed + rewired):
+            self._update_connections(node_id)
+
+        order_rebuilt = self._update_order(removed, added, added_pairs)
+        cyclic = self.order is None
+
+        reinferred = 0
+        if cyclic:
+            self.shapes_dirty = True
+        else:
+            seeds = list(new_nodes) if self.shapes_dirty else set(added + changed + rewired)
+            reinferred = self._propagate_shapes(seeds)
+            self.shapes_dirty = False
+
+        errors = list(id_errors)
+        for node_id in sorted(self.node_errors, key=node_index.__getitem__):
+            errors.extend(self.node_errors[node_id])
+        if not self.input_ids:
+            errors.append('Graph must have at least one Input node')
+        elif len(self.input_ids) > 1:
+            errors.append('Graph can only have one Input node')
+        errors.extend(edge_errors)
+        for node_id in sorted(self.conn_errors, key=node_index.__getitem__):
+            errors.append(self.conn_errors[node_id])
+        if cyclic:
+            errors.append(cycle_error(self._find_cycle()))
+
+        if not errors:
+            for node_id in sorted(self.shape_errors, key=self.pos.__getitem__):
+                errors.append(self.shape_errors[node_id])
+
+        self.last_result = {
+            'valid': len(errors) == 0,
+            'errors': errors,
+            'total_params': self.total_params if not errors else 0
+        }
+        self.stats = {
+            'unchanged': False,
+            'order_rebuilt': order_rebuilt,
+            'nodes_reinferred': reinferred
+        }
+        return self._result(cost_options)
+
+    def _result(self, cost_options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        result = dict(self.last_result, errors=list(self.last_result['errors']))
+        if result['valid'] and cost_options is not None:
+            batch_size = cost_options.get('batch_size')
+            if not batch_size:
+                input_id = next(iter(self.input_ids))
+                batch_size = self.node_shapes[input_id][0]
+            order = [n for n in self.get_execution_order() if n in self.node_costs]
+            result['cost'] = summarize_costs(
+                {n: self.node_costs[n] for n in order}, self.node_shapes, batch_size,
+                dtype=cost_options.get('dtype', 'float32'),
+                memory_limit_mb=cost_options.get('memory_limit_mb')
+            )
+        return result
+
+    def get_execution_order(self) -> List[str]:
+        """Topological order of the last validated graph ([] if cyclic)"""
+        if self.order is None:
+            return []
+        return [n for n in self.order if n is not None]
+
+    def _find_cycle(self) -> List[str]:
+        """Same cycle GraphParser reports; only needed while the graph is cyclic"""
+        edges = [{'source': source, 'target': target} for source, target in self.edge_pairs]
+        graph = IndexedGraph(list(self.nodes.values()), edges)
+        return [graph.node_ids[i] for i in graph.find_cycle()]
+
+    def _update_node(self, node_id: str):
+        """Re-run per-node checks for an added or edited node"""
+        node = self.nodes[node_id]
+        errors = GraphParser()._validate_node(node)
+        if errors:
+            self.node_errors[node_id] = errors
+        else:
+            self.node_errors.pop(node_id, None)
+
+        node_type = NODE_TYPES.get(node.get('type'))
+        if node_type is None:
+            self.bad_types.add(node_id)
+        else:
+            self.bad_types.discard(node_id)
+
+        if node_type == NodeType.INPUT:
+            self.input_ids.add(node_id)
+        else:
+            self.input_ids.discard(node_id)
+
+        self.total_params -= self.param_counts.pop(node_id, 0)
+        if node_type is not None:
+            try:
+                count = count_node_params(node_type, node_params(node))
+            except (TypeError, ValueError):
+                count = 0  # Malformed params are already reported above
+            self.param_counts[node_id] = count
+            self.total_params += count
+
+    def _update_connections(self, node_id: str):
+        self.conn_errors.pop(node_id, None)
+        if node_id in self.bad_types:
+            return
+        error = connection_error(node_id, NODE_TYPES[self.nodes[node_id]['type']],
+                                 len(self.preds[node_id]))
+        if error:
+            self.conn_errors[node_id] = error
+
+    def _update_order(self, removed, added, added_pairs) -> bool:
+        """
+        Keep self.order topologically sorted for the new edge set
+
+        Returns:
+            True if the order had to be rebuilt from scratch
+        """
+        if self.order is None:
+            self._rebuild_order()
+            return True
+
+        for node_id in removed:
+            self.order[self.pos.pop(node_id)] = None
+        for node_id in added:
+            self.pos[node_id] = len(self.order)
+            self.order.append(node_id)
+
+        for source, target in added_pairs:
+            if self.pos[source] >= self.pos[target] and not self._reorder(source, target):
+                self.order = None
+                self.pos = {}
+                return False
+
+        if len(self.order) > 2 * len(self.pos):
+            self._compact_order()
+        return False
+
+    def _rebuild_order(self):
+        """Kahn's algorithm over the whole graph"""
+        in_degree = {n: len(p) for n, p in self.preds.items()}
+        ready = [n for n, degree in in_degree.items() if degree == 0]
+        order = []
+        while ready:
+            node_id = ready.pop()
+            order.append(node_id)
+            for neighbor in self.succs[node_id]:
+                in_degree[neighbor] -= 1
+                if in_degree[neighbor] == 0:
+                    ready.append(neighbor)
+
+        if len(order) != len(self.nodes):
+            self.order, self.pos = None, {}
+        else:
+            self.order = order
+            self.pos = {n: i for i, n in enumerate(order)}
+
+    def _compact_order(self):
+        self.order = [n for n in self.order if n is not None]
+        self.pos = {n: i for i, n in enumerate(self.order)}
+
+    def _reorder(self, source: str, target: str) -> bool:
+        """
+        Pearce-Kelly update for a new edge source -> target that points
+        backwards in the current order; only nodes positioned between the
+        two endpoints are visited.
+
+        Returns:
+            False if the edge closes a cycle
+        """
+        pos = self.pos
+        lower, upper = pos[target], pos[source]
+
+        forward, stack = {target}, [target]
+        while stack:
+            for neighbor in self.succs[stack.pop()]:
+                if neighbor == source:
+                    return False
+                if neighbor not in forward and pos[neighbor] < upper:
+                    forward.add(neighbor)
+                    stack.append(neighbor)
+
+        backward, stack = {source}, [source]
+        while stack:
+            for neighbor in self.preds[stack.pop()]:
+                if neighbor not in backward and pos[neighbor] > lower:
+                    backward.add(neighbor)
+                    stack.append(neighbor)
+
+        moved = sorted(backward, key=pos.__getitem__) + sorted(forward, key=pos.__getitem__)
+        slots = sorted(pos[n] for n in moved)
+        for slot, node_id in zip(slots, moved):
+            self.order[slot] = node_id
+            pos[node_id] = slot
+        return True
+
+    def _update_cost(self, node_id: str, input_shapes, shape):
+        node = self.nodes[node_id]
+        try:
+            self.node_costs[node_id] = node_cost(
+                NODE_TYPES[node['type']], node_params(node), input_shapes, shape
+            )
+        except (KeyError, TypeError, ValueError):
+            # Params that fail validation; no report is produced until fixed
+            self.node_costs.pop(node_id, None)
+
+    def _propagate_shapes(self, seeds) -> int:
+        """
+        Re-infer shapes in topological order starting from seeds; a node's
+        successors are only revisited when its shape actually changed
+
+        Returns:
+            Number of nodes whose shape was recomputed
+        """
+        pos = self.pos
+        heap = [(pos[n], n) for n in seeds]
+        heapq.heapify(heap)
+        queued = set(seeds)
+        count = 0
+
+        while heap:
+            _, node_id = heapq.heappop(heap)
+            count += 1
+            old_shape = self.node_shapes.get(node_id)
+
+            if node_id in self.bad_types:
+                shape, error = None, None
+            else:
+                node = self.nodes[node_id]
+                input_shapes = [self.node_shapes.get(p) for p in self.preds[node_id]]
+                shape, error = infer_node_shape(
+                    node_id, NODE_TYPES[node['type']], node_params(node), input_shapes
+                )
+
+            if shape is None:
+                self.node_shapes.pop(node_id, None)
+                self.node_costs.pop(node_id, None)
+            else:
+                self.node_shapes[node_id] = shape
+                self._update_cost(node_id, input_shapes, shape)
+            if error:
+                self.shape_errors[node_id] = error
+            else:
+                self.shape_errors.pop(node_id, None)
+
+            if shape != old_shape:
+                for neighbor in self.succs[node_id]:
+                    if neighbor not in queued:
+                        queued.add(neighbor)
+                        heapq.heappush(heap, (pos[neighbor], neighbor))
+
+        return count
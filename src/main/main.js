@@ -78,7 +78,6 @@ ipcMain.on('python-command', (event, command) => {
 
 ipcMain.on('stop-training', () => {
     if (pythonBridge) {
-        pythonBridge.stop();
-        pythonBridge.start();
+        pythonBridge.sendCommand({ command: 'stop' });
     }
 });
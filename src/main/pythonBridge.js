@@ -2,23 +2,28 @@ const { spawn } = require('child_process');
 const path = require('path');
 const EventEmitter = require('events');
 
+// Binary frame: 'TFEV' | u32 header_len | u32 blob_len | header JSON | blob
+// (see backend/event_channel.py)
+const FRAME_MAGIC = Buffer.from('TFEV');
+const FRAME_PREFIX_SIZE = 12;
+
 class PythonBridge extends EventEmitter {
     constructor() {
         super();
         this.process = null;
-        this.buffer = '';
+        this.buffer = Buffer.alloc(0);
     }
 
     start() {
         const pythonPath = 'python';
         const scriptPath = path.join(__dirname, '../../backend/main.py');
 
-        this.process = spawn(pythonPath, ['-u', scriptPath], {
+        this.process = spawn(pythonPath, ['-u', scriptPath, '--transport', 'binary'], {
             stdio: ['pipe', 'pipe', 'pipe']
         });
 
         this.process.stdout.on('data', (data) => {
-            this.buffer += data.toString();
+            this.buffer = Buffer.concat([this.buffer, data]);
             this.processBuffer();
         });
 
@@ -39,21 +44,55 @@ class PythonBridge extends EventEmitter {
     }
 
     processBuffer() {
-        const lines = this.buffer.split('\n');
-        this.buffer = lines.pop() || '';
-
-        for (const line of lines) {
-            if (line.trim()) {
-                try {
-                    const event = JSON.parse(line);
-                    this.emit('event', event);
-                } catch (e) {
-                    console.error('Failed to parse JSON:', line);
+        while (this.buffer.length >= FRAME_PREFIX_SIZE) {
+            const start = this.buffer.indexOf(FRAME_MAGIC);
+            if (start === -1) {
+                // Keep a possible partial magic at the end
+                this.buffer = this.buffer.subarray(this.buffer.length - FRAME_MAGIC.length + 1);
+                return;
+            }
+            if (start > 0) {
+                console.error('Skipping non-frame output:', this.buffer.toString('utf8', 0, start));
+                this.buffer = this.buffer.subarray(start);
+                continue;
+            }
+
+            const headerLen = this.buffer.readUInt32LE(4);
+            const blobLen = this.buffer.readUInt32LE(8);
+            const frameLen = FRAME_PREFIX_SIZE + headerLen + blobLen;
+            if (this.buffer.length < frameLen) {
+                return;
+            }
+
+            const headerEnd = FRAME_PREFIX_SIZE + headerLen;
+            const blob = this.buffer.subarray(headerEnd, frameLen);
+            let header = null;
+            try {
+                header = JSON.parse(this.buffer.toString('utf8', FRAME_PREFIX_SIZE, headerEnd));
+            } catch (e) {
+                console.error('Failed to parse frame header');
+            }
+            this.buffer = this.buffer.subarray(frameLen);
+
+            if (header) {
+                for (const item of header.items) {
+                    this.emit('event', item.series ? this.decodeSeries(item, blob) : item);
                 }
             }
         }
     }
 
+    decodeSeries(item, blob) {
+        // One event per series: {job_id, count, dropped, <field>: Float64Array}
+        const data = { job_id: item.job_id, count: item.length, dropped: item.dropped };
+        item.fields.forEach((field, i) => {
+            const start = blob.byteOffset + item.offset + i * item.length * 8;
+            // slice() copies into a fresh, 8-byte aligned ArrayBuffer
+            data[field] = new Float64Array(blob.buffer.slice(start, start + item.length * 8));
+        });
+        return { event: `${item.series}_series`, data };
+    }
+
     sendCommand(command) {
         if (this.process && this.process.stdin.writable) {
             const commandStr = JSON.stringify(command) + '\n';
@@ -38,6 +38,11 @@ function App() {
 
             case 'validation_success':
                 addLog(`Graph validated: ${data.node_count} nodes, ${data.total_params} params`, 'success');
+                if (data.cost) {
+                    const { total, batch_size } = data.cost;
+                    addLog(`Estimated cost at batch ${batch_size}: ${(total.flops / 1e9).toFixed(3)} GFLOPs, ` +
+                        `${(total.training_bytes / 1024 ** 2).toFixed(1)} MB for a training step`, 'info');
+                }
                 setModelInfo({ totalParams: data.total_params });
                 break;
 
@@ -65,6 +70,11 @@ function App() {
                 addLog(`Training complete! Final accuracy: ${(data.final_accuracy * 100).toFixed(2)}%`, 'success');
                 break;
 
+            case 'training_stopped':
+                setIsTraining(false);
+                addLog(`Training stopped. Last accuracy: ${(data.final_accuracy * 100).toFixed(2)}%`, 'warning');
+                break;
+
             case 'code_generated':
                 addLog('Code generated successfully', 'success');
                 break;
@@ -104,8 +114,7 @@ function App() {
 
     const handleStop = useCallback(() => {
         window.electronAPI.send('stop-training');
-        setIsTraining(false);
-        addLog('Training stopped', 'warning');
+        addLog('Stopping training...', 'warning');
     }, []);
 
     const handleExport = useCallback(() => {